@@ -0,0 +1,85 @@
+"""
+Micro-benchmark of the Birthday parser against the strptime path it replaced.
+
+Usage:
+    python benchmarks/bench_birthday_parser.py [number of values, 100 000 by default]
+"""
+import os
+import random
+import sys
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.runner import best_time
+from colorama import Fore, Style
+
+from keeperbot.AddressBook import Birthday
+
+
+def strptime_birthday(value: str):
+    """The previous Birthday.validate: strptime and the bounds computed for every value."""
+    try:
+        date = datetime.strptime(value, Birthday.BIRTHDAY_FORMAT)
+    except ValueError:
+        raise ValueError(
+            f"{Fore.RED}Invalid date format. Use 'DD.MM.YYYY'.{Style.RESET_ALL}"
+        )
+
+    current_date = datetime.now()
+    min_date = current_date.replace(year=current_date.year - 100)
+    max_date = current_date
+
+    if date < min_date or date > max_date:
+        raise ValueError(
+            f"{Fore.RED}Invalid date. Date must be between {min_date.strftime(Birthday.BIRTHDAY_FORMAT)} and {max_date.strftime(Birthday.BIRTHDAY_FORMAT)}.{Style.RESET_ALL}"
+        )
+    return date.date()
+
+
+def build_values(size: int, seed: int = 42) -> list[str]:
+    """Build canonical birthdays mixed with invalid, out of range and non-canonical ones."""
+    rnd = random.Random(seed)
+    this_year = datetime.now().year
+    values = []
+    for _ in range(size):
+        day, month, year = rnd.randint(1, 31), rnd.randint(1, 12), rnd.randint(this_year - 110, this_year + 5)
+        kind = rnd.random()
+        if kind < 0.02:
+            values.append(f"{day}.{month}.{year}")
+        elif kind < 0.04:
+            values.append(f"{day:02d}/{month:02d}/{year}")
+        else:
+            values.append(f"{day:02d}.{month:02d}.{year}")
+    return values
+
+
+def run(parse, values: list[str]) -> list:
+    """Parse every value, keeping the date or the error message."""
+    results = []
+    for value in values:
+        try:
+            results.append(parse(value))
+        except ValueError as error:
+            results.append(str(error))
+    return results
+
+
+def measure(func, size: int, repeat: int = 5) -> float:
+    """Return the best throughput of several runs in values per second."""
+    return size / best_time(func, repeat)
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    values = build_values(size)
+    assert run(Birthday.parse, values) == run(strptime_birthday, values), "the parsers disagree"
+
+    before = measure(lambda: run(strptime_birthday, values), size)
+    after = measure(lambda: run(Birthday.parse, values), size)
+    print(f"strptime:    {before:12,.0f} values/s")
+    print(f"fast path:   {after:12,.0f} values/s ({after / before:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
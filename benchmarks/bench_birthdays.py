@@ -0,0 +1,55 @@
+"""
+Benchmark of the vectorized birthday analytics against the scalar path.
+
+Usage:
+    python benchmarks/bench_birthdays.py [number of contacts, 1 000 000 by default]
+"""
+import sys
+import os
+import time
+from datetime import date
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generator import generate_book
+from benchmarks.runner import best_time as measure
+
+
+def build_book(size: int, seed: int = 42):
+    """Build an address book where every contact has a birthday and nothing else but a phone."""
+    return generate_book(size, seed, birthday_ratio=1.0, email_ratio=0, address_ratio=0, notes_per_contact=0)
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    start = time.perf_counter()
+    book = build_book(size)
+    print(f"Built {size} contacts in {time.perf_counter() - start:.2f} s")
+
+    analytics = book.birthday_analytics
+    today = date.today()
+    start = time.perf_counter()
+    analytics.upcoming(0, today)
+    print(f"Built the birthday column in {time.perf_counter() - start:.3f} s")
+
+    for n_days in (0, 7, 30):
+        vectorized = analytics.upcoming(n_days, today)
+        scalar = book.scan_upcoming_birthdays(n_days, today)
+        assert vectorized == scalar, f"Results differ for {n_days} days"
+        scalar_time = measure(lambda: book.scan_upcoming_birthdays(n_days, today), repeat=1)
+        vector_time = measure(lambda: analytics.upcoming(n_days, today))
+        print(
+            f"upcoming {n_days:>2} days: {len(scalar):>7} contacts, scalar {scalar_time * 1000:9.1f} ms, "
+            f"vectorized {vector_time * 1000:7.1f} ms, x{scalar_time / vector_time:.0f}"
+        )
+
+    for name, func in (
+        ("age distribution", lambda: analytics.age_distribution(10, today)),
+        ("birthdays per month", analytics.birthdays_per_month),
+        ("turning a round age", lambda: analytics.turning_round_age(10, today)),
+    ):
+        print(f"{name}: {measure(func) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Latency of completing contact names, note titles and tags from the prefix index.
+
+Usage:
+    python benchmarks/bench_completion.py [number of contacts, 500 000 by default]
+"""
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prompt_toolkit.completion import CompleteEvent
+from prompt_toolkit.document import Document
+
+from benchmarks.generator import NOTE_WORDS, generate_book
+from keeperbot.bot_completer import BotCompleter
+
+
+def measure(completer: BotCompleter, inputs: list[str]) -> list[float]:
+    """Return the latency of every completion in milliseconds."""
+    latencies = []
+    for text in inputs:
+        start = time.perf_counter()
+        list(completer.get_completions(Document(text), CompleteEvent()))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return sorted(latencies)
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    rnd = random.Random(7)
+    start = time.perf_counter()
+    book = generate_book(size)
+    print(f"Built {size} contacts in {time.perf_counter() - start:.1f} s")
+
+    completer = BotCompleter(book)
+    start = time.perf_counter()
+    book.complete("name", "")
+    print(f"First completion (sorts the index): {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    letters = string.ascii_lowercase
+    inputs = [
+        *(f"show phones {''.join(rnd.choices(letters, k=rnd.randint(0, 3)))}" for _ in range(1000)),
+        *(f"find notes-by-tag tag{rnd.randint(0, 99)}" for _ in range(1000)),
+        *(f"add tags {rnd.choice(NOTE_WORDS)[:rnd.randint(1, 3)].title()}" for _ in range(1000)),
+    ]
+    latencies = measure(completer, inputs)
+    print(f"Completion: p50 {latencies[len(latencies) // 2]:.3f} ms, p99 {latencies[len(latencies) * 99 // 100]:.3f} ms, max {latencies[-1]:.3f} ms")
+
+    # Edits keep the sorted index up to date incrementally
+    records = list(book.values())
+    start = time.perf_counter()
+    for record in rnd.sample(records, 1000):
+        record.add_note(f"Extra {record.name.value}", "text", ["extra"])
+    print(f"1000 note edits: {(time.perf_counter() - start) * 1000:.0f} ms")
+    latencies = measure(completer, inputs)
+    print(f"After edits: p50 {latencies[len(latencies) // 2]:.3f} ms, p99 {latencies[len(latencies) * 99 // 100]:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Memory benchmark: bytes per contact for bare records and for a full address book.
+
+Usage:
+    python benchmarks/bench_memory.py [number of contacts, 100 000 by default]
+"""
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generator import generate_records
+from keeperbot.AddressBook import AddressBook
+
+
+def build_records(size: int) -> list:
+    """Build contacts where every field is filled, with a tagged note each."""
+    return generate_records(size, birthday_ratio=1.0, email_ratio=1.0, address_ratio=1.0, notes_per_contact=1.0)
+
+
+def measure(func, size: int) -> float:
+    """Return the bytes allocated by func per contact while its result is alive."""
+    gc.collect()
+    tracemalloc.start()
+    result = func(size)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current / size
+
+
+def build_book(size: int) -> AddressBook:
+    """Build an address book with all indexes from the contacts."""
+    book = AddressBook()
+    for record in build_records(size):
+        book.add_record(record)
+    return book
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"Records:      {measure(build_records, size):8.0f} bytes per contact")
+    print(f"Address book: {measure(build_book, size):8.0f} bytes per contact")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Per-keystroke cost of the bottom toolbar: the compiled command trie against
+building the command spec on every keystroke.
+
+Usage:
+    python benchmarks/bench_toolbar.py [number of repetitions, 2 000 by default]
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keeperbot.bot_cmd import BotCmd
+
+TYPED = [
+    "show all --limit 20",
+    "search-by email @gmail.com",
+    "find notes-by-tag work",
+    "edit tag old new",
+    "add contact John Smith",
+]
+
+
+def spec_format(command, args):
+    """The previous lookup: the spec dict is rebuilt for every call."""
+    commands = BotCmd.get_commands()
+    if command in commands:
+        cmd_details = commands[command]
+        if args and args[0] in cmd_details["subcommands"]:
+            return f"{command} {cmd_details['subcommands'][args[0]]['format']}"
+        return f"{command} {cmd_details['format']}"
+    return None
+
+
+def keystrokes() -> list[list[str]]:
+    """Return the split buffer after every keystroke of the typed commands."""
+    return [text[:end].split() for text in TYPED for end in range(1, len(text) + 1)]
+
+
+def measure(lookup, buffers: list, repeat: int) -> float:
+    """Return the average time per keystroke in microseconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for parts in buffers:
+            lookup(parts[0], parts[1:])
+    return (time.perf_counter() - start) / (repeat * len(buffers)) * 1e6
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    buffers = keystrokes()
+    assert all(spec_format(p[0], p[1:]) == BotCmd.get_command_format(p[0], p[1:]) for p in buffers)
+    print(f"spec per keystroke: {measure(spec_format, buffers, repeat):8.2f} us")
+    print(f"trie per keystroke: {measure(BotCmd.get_command_format, buffers, repeat):8.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Throughput of the batch validation API against validating the values one by one.
+
+Usage:
+    python benchmarks/bench_validation.py [number of values, 100 000 by default]
+"""
+import os
+import random
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.runner import best_time
+from keeperbot.AddressBook import Birthday, Email, Phone
+from keeperbot.AddressBook.addressbook_errors import InvalidEmailError
+
+
+def build_values(size: int, seed: int = 42) -> dict:
+    """Build phones, emails and birthdays with about one invalid value in ten."""
+    rnd = random.Random(seed)
+    phones, emails, birthdays = [], [], []
+    for i in range(size):
+        broken = rnd.random() < 0.1
+        phones.append(f"+380 (66) {i:07d}" if not broken else f"066-{i}")
+        emails.append(f"contact{i}@example.com" if not broken else f"contact{i}@example")
+        birthdays.append(f"{rnd.randint(1, 28):02d}.{rnd.randint(1, 12):02d}.{rnd.randint(1930, 2020)}" if not broken else "31.02.1990")
+    return {"phone": phones, "email": emails, "birthday": birthdays}
+
+
+def one_by_one(cls, values: list) -> list:
+    """Validate the values by creating a field for every value."""
+    results = []
+    for value in values:
+        try:
+            results.append(cls(value).value)
+        except (ValueError, InvalidEmailError):
+            results.append(None)
+    return results
+
+
+def measure(func, size: int, repeat: int = 3) -> float:
+    """Return the best throughput of several runs in values per second."""
+    return size / best_time(func, repeat)
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    values = build_values(size)
+    fields = {"phone": Phone, "email": Email, "birthday": Birthday}
+
+    print(f"{'field':<10}{'one by one':>16}{'validate_many':>16}")
+    for name, cls in fields.items():
+        batch = cls.validate_many(values[name]).values
+        assert batch == one_by_one(cls, values[name]), f"{name}: the batch API disagrees with the constructor"
+        single = measure(lambda: one_by_one(cls, values[name]), size)
+        many = measure(lambda: cls.validate_many(values[name]), size)
+        print(f"{name:<10}{single:>12,.0f} v/s{many:>12,.0f} v/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Deterministic generator of realistic address books for the benchmarks.
+
+The same size and seed always produce the same book, so results of different
+runs and releases are comparable.
+"""
+import os
+import random
+import sys
+from datetime import date, timedelta
+from itertools import accumulate
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keeperbot.AddressBook import AddressBook, Record
+
+FIRST_NAMES = (
+    "Olena", "Andrii", "Maria", "Taras", "Iryna", "Dmytro", "Sofia", "Oleksandr", "Anna", "Mykola",
+    "Kateryna", "Bohdan", "Yulia", "Serhii", "Natalia", "Ivan", "Oksana", "Petro", "Daria", "Maksym",
+    "John", "Emma", "Liam", "Olivia", "Noah", "Ava", "James", "Mia", "Lucas", "Chloe",
+)
+LAST_NAMES = (
+    "Shevchenko", "Kovalenko", "Bondarenko", "Tkachenko", "Kravchenko", "Oliinyk", "Melnyk", "Boyko",
+    "Smith", "Johnson", "Brown", "Garcia", "Miller", "Davis", "Wilson", "Martin", "Lee", "Walker",
+)
+DOMAINS = (
+    ("gmail.com", 40), ("ukr.net", 15), ("outlook.com", 12), ("yahoo.com", 8),
+    ("i.ua", 5), ("corp.example.com", 10), ("mail.example.org", 10),
+)
+COUNTRY_CODES = (("380", 70), ("48", 10), ("49", 10), ("1", 10))
+STREETS = ("Khreshchatyk", "Baker Street", "Shevchenka", "Main Street", "Franka", "Park Lane")
+NOTE_WORDS = (
+    "call", "back", "meeting", "project", "birthday", "gift", "invoice", "trip", "dinner",
+    "review", "contract", "family", "doctor", "school", "deadline", "coffee", "report",
+)
+# Birthdays stay valid (not older than 100 years) for decades
+BIRTHDAY_RANGE = (date(1950, 1, 1), date(2005, 12, 31))
+
+
+def zipf_weights(count: int, exponent: float = 1.1) -> list[float]:
+    """
+    Return the cumulative weights of a Zipf distribution over count ranks.
+
+    Args:
+        count (int): The number of ranks.
+        exponent (float, optional): The skew; larger values favor the first ranks. Defaults to 1.1.
+
+    Returns:
+        list: The cumulative weights for random.choices.
+    """
+    return list(accumulate(1 / rank ** exponent for rank in range(1, count + 1)))
+
+
+def _weighted(pairs) -> tuple:
+    """Split (value, weight) pairs into values and cumulative weights."""
+    values, weights = zip(*pairs)
+    return values, list(accumulate(weights))
+
+
+def generate_records(
+    size: int,
+    seed: int = 42,
+    tags: int = 1000,
+    birthday_ratio: float = 0.7,
+    email_ratio: float = 0.8,
+    address_ratio: float = 0.4,
+    notes_per_contact: float = 0.8,
+) -> list[Record]:
+    """
+    Generate contacts with realistic field coverage.
+
+    Names repeat like real first and last names (a number keeps them unique),
+    phones are E.164 numbers, emails are derived from the names, and note tags
+    follow a Zipf distribution: a few tags are everywhere, most are rare.
+
+    Args:
+        size (int): The number of contacts.
+        seed (int, optional): The random seed. Defaults to 42.
+        tags (int, optional): The number of distinct tags. Defaults to 1000.
+        birthday_ratio (float, optional): The share of contacts with a birthday. Defaults to 0.7.
+        email_ratio (float, optional): The share of contacts with an email. Defaults to 0.8.
+        address_ratio (float, optional): The share of contacts with an address. Defaults to 0.4.
+        notes_per_contact (float, optional): The average number of notes. Defaults to 0.8.
+
+    Returns:
+        list: The records.
+    """
+    rnd = random.Random(seed)
+    domains, domain_weights = _weighted(DOMAINS)
+    codes, code_weights = _weighted(COUNTRY_CODES)
+    tag_names = [f"tag{rank}" for rank in range(tags)]
+    tag_weights = zipf_weights(tags)
+    first_day, last_day = BIRTHDAY_RANGE
+    days = (last_day - first_day).days
+
+    records = []
+    for i in range(size):
+        first, last = rnd.choice(FIRST_NAMES), rnd.choice(LAST_NAMES)
+        record = Record(f"{first} {last} {i}")
+
+        for _ in range(rnd.choices((1, 2, 3), cum_weights=(70, 95, 100))[0]):
+            code = rnd.choices(codes, cum_weights=code_weights)[0]
+            # Phone numbers must have 12 digits at least, country code included
+            record.add_phone(f"+{code}{rnd.randrange(10 ** (11 - len(code)), 10 ** (12 - len(code)))}")
+        if rnd.random() < email_ratio:
+            domain = rnd.choices(domains, cum_weights=domain_weights)[0]
+            record.add_email(f"{first.lower()}.{last.lower()}{i}@{domain}")
+        if rnd.random() < birthday_ratio:
+            born = first_day + timedelta(days=rnd.randrange(days))
+            record.add_birthday(born.strftime("%d.%m.%Y"))
+        if rnd.random() < address_ratio:
+            record.add_address(f"{rnd.choice(STREETS)}, {rnd.randint(1, 200)}")
+
+        notes = int(notes_per_contact) + (rnd.random() < notes_per_contact % 1)
+        for n in range(notes):
+            words = rnd.choices(NOTE_WORDS, k=rnd.randint(3, 12))
+            note_tags = set(rnd.choices(tag_names, cum_weights=tag_weights, k=rnd.randint(0, 3)))
+            record.add_note(f"{words[0].title()} {i}.{n}", " ".join(words), sorted(note_tags))
+        records.append(record)
+    return records
+
+
+def generate_book(size: int, seed: int = 42, **profile) -> AddressBook:
+    """
+    Generate an address book with all indexes.
+
+    Args:
+        size (int): The number of contacts.
+        seed (int, optional): The random seed. Defaults to 42.
+        **profile: The field coverage, see generate_records.
+
+    Returns:
+        AddressBook: The book.
+    """
+    book = AddressBook()
+    for record in generate_records(size, seed, **profile):
+        book.add_record(record)
+    return book
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    for record in generate_records(size):
+        print(record)
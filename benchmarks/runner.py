@@ -0,0 +1,203 @@
+"""
+Timing, result files and baseline comparison for the benchmark suite.
+"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keeperbot import __version__
+
+# name -> setup(context) that prepares the data and returns the function to time
+CASES: dict[str, Callable] = {}
+
+
+def case(name: str):
+    """
+    Register a benchmark case.
+
+    The decorated setup function gets the context of the run (e.g. the book)
+    and returns a function without arguments; only that function is timed.
+    Cases that change the book must leave it as they found it.
+
+    Args:
+        name (str): The case name, e.g. book.find_contact.
+    """
+
+    def register(setup: Callable) -> Callable:
+        CASES[name] = setup
+        return setup
+
+    return register
+
+
+def best_time(func: Callable, repeat: int = 5) -> float:
+    """
+    Return the best time of several runs in seconds.
+
+    Args:
+        func (Callable): The function to time.
+        repeat (int, optional): The number of runs. Defaults to 5.
+
+    Returns:
+        float: The fastest run.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def time_calls(func: Callable, repeat: int = 5, min_time: float = 0.05) -> dict:
+    """
+    Time the function per call, calling it often enough for a stable timer reading.
+
+    Args:
+        func (Callable): The function to time.
+        repeat (int, optional): The number of timed rounds. Defaults to 5.
+        min_time (float, optional): The minimum duration of a round in seconds. Defaults to 0.05.
+
+    Returns:
+        dict: The calls per round and the median and best time per call in microseconds.
+    """
+    # Calibrate: double the calls until a round takes long enough
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2
+
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        rounds.append((time.perf_counter() - start) / number * 1e6)
+    return {"number": number, "median_us": statistics.median(rounds), "best_us": min(rounds)}
+
+
+def run_cases(context: dict, names: list[str] = None, repeat: int = 5, min_time: float = 0.05, log=print) -> dict:
+    """
+    Run the registered cases.
+
+    Args:
+        context (dict): Passed to every setup function.
+        names (list, optional): The cases to run. Defaults to all.
+        repeat (int, optional): The number of timed rounds per case. Defaults to 5.
+        min_time (float, optional): The minimum duration of a round in seconds. Defaults to 0.05.
+        log (Callable, optional): Prints the progress. Defaults to print.
+
+    Returns:
+        dict: case name -> timing, see time_calls.
+    """
+    results = {}
+    for name in names or CASES:
+        func = CASES[name](context)
+        results[name] = time_calls(func, repeat, min_time)
+        log(f"{name:<40}{results[name]['median_us']:>14,.2f} us")
+    return results
+
+
+def _commit() -> str:
+    """Return the current git commit, if the suite runs in a checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(filename: str, results: dict, **meta) -> None:
+    """
+    Write the results with the environment they were measured in.
+
+    Args:
+        filename (str): The JSON file.
+        results (dict): The results of run_cases.
+        **meta: Extra fields, e.g. the book size and seed.
+    """
+    data = {
+        "meta": {
+            "version": __version__,
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            **meta,
+        },
+        "results": results,
+    }
+    with open(filename, "w", encoding="utf-8") as file:
+        json.dump(data, file, indent=2)
+
+
+# Meta fields that must match for the timings to be comparable: they change the workload
+WORKLOAD_META = ("size", "seed")
+
+
+def compare(results: dict, baseline_file: str, threshold: float = 0.2, log=print, **meta) -> list[str]:
+    """
+    Compare the results with a stored baseline.
+
+    The best rounds are compared: they are the least disturbed by other processes.
+
+    Args:
+        results (dict): The results of run_cases.
+        baseline_file (str): A file written by write_results.
+        threshold (float, optional): The slowdown that counts as a regression. Defaults to 0.2 (20 %).
+        log (Callable, optional): Prints the comparison. Defaults to print.
+        **meta: The fields the results were measured with, e.g. the book size and seed,
+            as passed to write_results.
+
+    Returns:
+        list: The names of the regressed cases.
+
+    Raises:
+        ValueError: If the baseline was measured on another workload (WORKLOAD_META).
+    """
+    with open(baseline_file, encoding="utf-8") as file:
+        baseline = json.load(file)
+
+    before_meta = baseline.get("meta", {})
+    for key in WORKLOAD_META:
+        if key in meta and key in before_meta and meta[key] != before_meta[key]:
+            raise ValueError(
+                f"{baseline_file} was measured with {key} {before_meta[key]}, this run with {meta[key]}"
+            )
+    python = meta.get("python", platform.python_version())
+    if before_meta.get("python") not in (None, python):
+        log(f"\nWarning: {baseline_file} was measured with Python {before_meta['python']}, this run with {python}")
+    log(
+        f"\nBaseline: {baseline_file} ({before_meta.get('version')}, {before_meta.get('commit')}, "
+        f"size {before_meta.get('size')})"
+    )
+    log(f"{'case':<40}{'baseline, us':>14}{'now, us':>14}{'change':>10}")
+    regressions = []
+    for name, timing in results.items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            log(f"{name:<40}{'-':>14}{timing['best_us']:>14,.2f}{'new':>10}")
+            continue
+        change = timing["best_us"] / before["best_us"] - 1
+        mark = ""
+        if change > threshold:
+            regressions.append(name)
+            mark = "  REGRESSION"
+        log(f"{name:<40}{before['best_us']:>14,.2f}{timing['best_us']:>14,.2f}{change:>+10.1%}{mark}")
+    return regressions
@@ -0,0 +1,296 @@
+"""
+Benchmark suite of the address book operations, persistence and table rendering.
+
+Every case runs against the same generated book, the results are written to
+a JSON file and can be compared with a stored baseline.
+
+Usage:
+    python benchmarks/suite.py [--size 10000] [--seed 42] [--filter book.]
+                               [--output results.json] [--baseline benchmarks/baseline.json]
+                               [--threshold 0.2]
+
+The exit code is 1 if a case is slower than the baseline by more than the threshold
+and 2 if the baseline was measured with another size or seed.
+"""
+import argparse
+import os
+import pickle
+import random
+import sys
+import tempfile
+import time
+from itertools import cycle, islice
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generator import generate_book
+from benchmarks.runner import CASES, case, compare, run_cases, write_results
+from keeperbot.AddressBook import Birthday, Email, Phone, Record
+from keeperbot.helpers import StreamingTable
+from keeperbot.helpers.saver import write_atomic
+
+HEADERS = ["Name", "Phone", "Email", "Birthday", "Address", "Notes", "Tag", "Owner"]
+
+
+# Record operations; they change a contact of the book, so the indexes are updated too
+
+@case("record.add_remove_phone")
+def record_add_remove_phone(ctx):
+    record = ctx["record"]
+
+    def run():
+        record.add_phone("+380991234567")
+        record.remove_phone("+380991234567")
+
+    return run
+
+
+@case("record.edit_phone")
+def record_edit_phone(ctx):
+    record = ctx["record"]
+    old = record.phones[0].value
+
+    def run():
+        record.edit_phone(old, "+380991234567")
+        record.edit_phone("+380991234567", old)
+
+    return run
+
+
+@case("record.find_phone")
+def record_find_phone(ctx):
+    record = ctx["record"]
+    phone = record.phones[-1].value
+    return lambda: record.find_phone(phone)
+
+
+@case("record.add_remove_note")
+def record_add_remove_note(ctx):
+    record = ctx["record"]
+
+    def run():
+        record.add_note("Benchmark note", "call back about the project", ["tag1", "benchmark"])
+        record.remove_note_by_title("Benchmark note")
+
+    return run
+
+
+@case("record.render")
+def record_render(ctx):
+    # A detached copy: the version bump only drops the caches, nothing is reindexed
+    record = pickle.loads(pickle.dumps(ctx["record"]))
+
+    def run():
+        record._changed()
+        record.table_row()
+        str(record)
+
+    return run
+
+
+@case("record.validate_fields")
+def record_validate_fields(ctx):
+    return lambda: (Phone("+380 (66) 123-45-67"), Email("olena.shevchenko@ukr.net"), Birthday("24.08.1991"))
+
+
+# Address book operations
+
+@case("book.add_delete_contact")
+def book_add_delete_contact(ctx):
+    book = ctx["book"]
+    record = Record("Benchmark Contact")
+    record.add_phone("+380991234567")
+    record.add_note("Benchmark contact note", "meeting", ["tag0"])
+
+    def run():
+        book.add_record(record)
+        book.delete(record.name.value)
+
+    return run
+
+
+@case("book.find_contact")
+def book_find_contact(ctx):
+    names = cycle(ctx["names"])
+    return lambda: ctx["book"].find_contact(next(names))
+
+
+@case("book.find_phone")
+def book_find_phone(ctx):
+    phones = cycle(ctx["phones"])
+    return lambda: ctx["book"].find_phone(next(phones))
+
+
+def _search(field: str, value: str):
+    """Return a setup that times a search by the field."""
+    return lambda ctx: lambda: ctx["book"].find_contacts_by_field(field, value)
+
+
+case("book.search_name")(_search("name", "Olena Shevchenko 1"))
+case("book.search_phone_digits")(_search("phones", "3806712"))
+case("book.search_email_domain")(_search("email", "@ukr.net"))
+case("book.search_email_text")(_search("email", "melnyk"))
+case("book.search_birthday")(_search("birthday", "24.08"))
+case("book.search_tag")(_search("tag", "tag7"))
+case("book.search_all")(_search("all", "bohdan"))
+
+
+@case("book.search_first_page")
+def book_search_first_page(ctx):
+    return lambda: list(islice(ctx["book"].iter_find_contacts_by_field("all", "olena"), 50))
+
+
+@case("book.search_notes")
+def book_search_notes(ctx):
+    return lambda: ctx["book"].search_notes("meeting project deadline", limit=20)
+
+
+@case("book.notes_by_frequent_tag")
+def book_notes_by_frequent_tag(ctx):
+    return lambda: ctx["book"].find_notes_by_tag("tag0")
+
+
+@case("book.notes_by_rare_tag")
+def book_notes_by_rare_tag(ctx):
+    return lambda: ctx["book"].find_notes_by_tag("tag900")
+
+
+@case("book.upcoming_birthdays")
+def book_upcoming_birthdays(ctx):
+    return lambda: ctx["book"].get_upcoming_birthdays(7)
+
+
+@case("book.scan_upcoming_birthdays")
+def book_scan_upcoming_birthdays(ctx):
+    return lambda: ctx["book"].scan_upcoming_birthdays(7)
+
+
+@case("book.next_birthday")
+def book_next_birthday(ctx):
+    timeline = ctx["book"].birthday_timeline
+    return lambda: timeline.on(timeline.next_date())
+
+
+@case("book.complete_name")
+def book_complete_name(ctx):
+    prefixes = cycle(["O", "Ol", "Mar", "Ta", "Jo", "Ir", "Dmy"])
+    return lambda: ctx["book"].complete("name", next(prefixes))
+
+
+@case("book.domain_counts")
+def book_domain_counts(ctx):
+    return lambda: ctx["book"].domain_counts()
+
+
+@case("book.stats")
+def book_stats(ctx):
+    return lambda: ctx["book"].stats.as_dict()
+
+
+@case("book.rename_tag")
+def book_rename_tag(ctx):
+    book = ctx["book"]
+
+    def run():
+        book.rename_tag("tag50", "benchmark-tag")
+        book.rename_tag("benchmark-tag", "tag50")
+
+    return run
+
+
+@case("book.find_duplicates")
+def book_find_duplicates(ctx):
+    return lambda: ctx["book"].find_duplicates()
+
+
+@case("book.export_csv")
+def book_export_csv(ctx):
+    filename = os.path.join(ctx["tmpdir"], "export.csv")
+    return lambda: ctx["book"].snapshot().export_csv(filename)
+
+
+# Persistence
+
+@case("persist.dumps")
+def persist_dumps(ctx):
+    return lambda: pickle.dumps(ctx["book"])
+
+
+@case("persist.loads")
+def persist_loads(ctx):
+    data = pickle.dumps(ctx["book"])
+    return lambda: pickle.loads(data)
+
+
+@case("persist.save_file")
+def persist_save_file(ctx):
+    filename = os.path.join(ctx["tmpdir"], "addressbook.pkl")
+    return lambda: write_atomic(filename, pickle.dumps(ctx["book"]))
+
+
+# Rendering
+
+@case("render.table_1000")
+def render_table(ctx):
+    records = list(islice(ctx["book"].values(), 1000))
+    return lambda: StreamingTable(HEADERS, total_width=160).to_string(record.table_row() for record in records)
+
+
+@case("render.first_screen")
+def render_first_screen(ctx):
+    records = list(islice(ctx["book"].values(), 1000))
+    return lambda: list(islice(StreamingTable(HEADERS, total_width=160).render(
+        record.table_row() for record in records
+    ), 20))
+
+
+def build_context(size: int, seed: int, tmpdir: str) -> dict:
+    """Generate the book and pick the contacts the cases look up."""
+    book = generate_book(size, seed)
+    rnd = random.Random(seed)
+    records = list(book.values())
+    sample = rnd.sample(records, min(1000, len(records)))
+    return {
+        "book": book,
+        "record": sample[0],
+        "names": [record.name.value for record in sample],
+        "phones": [record.phones[0].value for record in sample],
+        "tmpdir": tmpdir,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=10_000, help="number of contacts (default: 10000)")
+    parser.add_argument("--seed", type=int, default=42, help="seed of the generated book (default: 42)")
+    parser.add_argument("--filter", default="", help="run only the cases whose name contains the text")
+    parser.add_argument("--repeat", type=int, default=5, help="timed rounds per case (default: 5)")
+    parser.add_argument("--output", help="write the results to a JSON file")
+    parser.add_argument("--baseline", help="compare with the results in a JSON file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="slowdown that fails the run (default: 0.2)")
+    args = parser.parse_args(argv)
+
+    names = [name for name in CASES if args.filter in name]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        start = time.perf_counter()
+        context = build_context(args.size, args.seed, tmpdir)
+        print(f"Generated {args.size} contacts in {time.perf_counter() - start:.1f} s\n")
+        results = run_cases(context, names, args.repeat)
+
+    if args.output:
+        write_results(args.output, results, size=args.size, seed=args.seed)
+        print(f"\nResults written to {args.output}")
+    if args.baseline:
+        try:
+            regressions = compare(results, args.baseline, args.threshold, size=args.size, seed=args.seed)
+        except ValueError as e:
+            print(f"\nNot compared: {e}")
+            return 2
+        if regressions:
+            print(f"\n{len(regressions)} case(s) slower than the baseline by more than {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,27 @@
 # __init__.py
 # from AddressBook import *
 from .address import *
+from .analytics import *
 from .addressbook_errors import *
 from .addressbook import *
 from .birthday import *
+from .birthday_timeline import *
+from .dedupe import *
 from .email import *
+from .email_index import *
 from .field import *
+from .keyed_list import *
 from .name import *
+from .name_index import *
 from .note import *
+from .note_index import *
 from .phone import *
+from .prefix_index import *
 from .record import *
+from .scan import *
+from .snapshot import *
+from .stats import *
 from .tag import *
+from .tag_registry import *
 
 __version__ = "0.0.1"
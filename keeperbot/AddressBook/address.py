@@ -3,6 +3,8 @@
 
 class Address(Field):
     """Class for storing an address."""
+
+    __slots__ = ()
     
     def __init__(self, value: str) -> None:
         """Initialize the Address field with a value.
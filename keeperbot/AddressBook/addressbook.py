@@ -1,14 +1,124 @@
 from collections import UserDict
-from typing import Union
+from typing import Iterator, Union
 from datetime import datetime
 from colorama import Fore, Style, init
 from .record import Record, Note
+from .note_index import NoteIndex
+from .email_index import EmailIndex
+from .dedupe import find_duplicates
+from .scan import ScanEngine
+from .analytics import BirthdayAnalytics, birthday_in_year, np
+from .snapshot import ColumnarSnapshot
+from .stats import BookStats
+from .tag_registry import TagRegistry
+from .prefix_index import PrefixIndex
+from .name_index import NameIndex
+from .birthday_timeline import BirthdayTimeline
 
 init(autoreset=True)
 
 class AddressBook(UserDict):
     """Class for storing and managing contact records."""
-    
+
+    def __init__(self, *args, **kwargs) -> None:
+        """Initialize the address book and its search indexes."""
+        # Goes first, so the other indexes see the shared tag instances
+        self.tags = TagRegistry()
+        self._note_index = NoteIndex()
+        self._email_index = EmailIndex()
+        self._stats = BookStats()
+        self._prefix_index = PrefixIndex()
+        self._timeline = BirthdayTimeline()
+        self._name_index = NameIndex()
+        self._indexes = (
+            self.tags, self._note_index, self._email_index, self._stats, self._prefix_index, self._timeline,
+            self._name_index,
+        )
+        self._birthday_analytics = None
+        if np is not None:
+            self._birthday_analytics = BirthdayAnalytics()
+            self._indexes += (self._birthday_analytics,)
+        self._scan_engine = None
+        self._snapshot = None
+        super().__init__(*args, **kwargs)
+
+    def __setitem__(self, name: str, record: Record) -> None:
+        """Store the record under the name and index it."""
+        if name in self.data and self.data[name] is not record:
+            self._unlink(self.data[name])
+        self.data[name] = record
+        record._book = self
+        self.reindex(record)
+
+    def __delitem__(self, name: str) -> None:
+        """Delete the record stored under the name and drop it from the indexes."""
+        self._unlink(self.data.pop(name))
+
+    def _unlink(self, record: Record) -> None:
+        """Remove the record from the indexes and detach it from the book."""
+        for index in self._indexes:
+            index.remove(record)
+        record._book = None
+
+    def enable_parallel_scan(self, workers: int = None, threshold: int = 50_000) -> None:
+        """Run unindexed searches in a process pool over a projection of the records.
+
+        Args:
+            workers (int, optional): The number of worker processes. Defaults to the number of CPUs.
+            threshold (int, optional): Books with fewer records are searched serially. Defaults to 50 000.
+        """
+        self.disable_parallel_scan()
+        self._scan_engine = ScanEngine(workers, threshold)
+        for record in self.data.values():
+            self._scan_engine.add(record)
+        self._indexes += (self._scan_engine,)
+
+    def disable_parallel_scan(self) -> None:
+        """Stop the parallel scan engine and search serially."""
+        if self._scan_engine is not None:
+            self._scan_engine.close()
+            self._indexes = tuple(index for index in self._indexes if index is not self._scan_engine)
+            self._scan_engine = None
+
+    def snapshot(self) -> ColumnarSnapshot:
+        """Return the columnar snapshot of the book for reports and exports.
+
+        The snapshot is built on the first call and then kept up to date
+        by copying only the records changed since the previous call.
+
+        Returns:
+            ColumnarSnapshot: The up-to-date snapshot.
+        """
+        if self._snapshot is None:
+            self._snapshot = ColumnarSnapshot(self.data.values())
+            self._indexes += (self._snapshot,)
+        return self._snapshot.refresh()
+
+    def reindex(self, record: Record) -> None:
+        """Update the indexes after the record was added or modified.
+
+        Args:
+            record (Record): The changed record.
+        """
+        for index in self._indexes:
+            index.update(record)
+
+    def __getstate__(self) -> dict:
+        """Return the state to pickle. The indexes are rebuilt on load, only the tags are kept."""
+        return {"data": self.data, "tags": self.tags}
+
+    def __setstate__(self, state: dict) -> None:
+        """Restore the pickled state and rebuild the indexes."""
+        self.__init__()
+        if state.get("tags") is not None:
+            self.tags = state["tags"]
+            self._indexes = (self.tags,) + self._indexes[1:]
+        for name, record in state.get("data", {}).items():
+            self[name] = record
+        # Sort once for the whole book, the first completion would have to do it otherwise
+        self._prefix_index.build()
+        self._name_index.build()
+
     def get_owner(self) -> Union[Record, None]:
         for record in self.data.values():
             if getattr(record, 'owner', False) == True:
@@ -26,7 +136,7 @@ class AddressBook(UserDict):
         """
         if not isinstance(record, Record) or not record.name.value:
             raise ValueError(f"{Fore.RED}Invalid record.{Style.RESET_ALL}")
-        self.data[record.name.value] = record
+        self[record.name.value] = record
 
     def find_phone(self, phone: str) -> Union[Record, None]:
         """Find a contact by phone number.
@@ -37,12 +147,20 @@ class AddressBook(UserDict):
         Returns:
             Union[str, None]: The record of the first found contact, or None if not found.
         """
-        # TODO: Refactor this method to return a list of records with the same phone number.
+        return next(self.iter_find_phone(phone), None)
+
+    def iter_find_phone(self, phone: str) -> Iterator[Record]:
+        """Iterate over all contacts that have the given phone number.
+
+        Args:
+            phone (str): The phone number to search for.
+
+        Yields:
+            Record: The records with the phone number.
+        """
         for record in self.data.values():
-            for number in record.phones:
-                if phone == number.value:
-                    return record
-        return None
+            if record.phones.has_key(phone):
+                yield record
 
     def find_contact(self, name: str) -> Union[Record, None]:
         """Find a record by name.
@@ -65,40 +183,95 @@ class AddressBook(UserDict):
             ValueError: If the record is not found or the name is invalid.
         """
         if name in self.data:
-            del self.data[name]
+            del self[name]
             return 'Contact deleted.'
         else:
             raise ValueError(
                 f"{Fore.RED}Record not found or invalid name.{Style.RESET_ALL}"
             )
 
-    def get_upcoming_birthdays(self, n_days: int=0):
+    @property
+    def stats(self) -> BookStats:
+        """The aggregates of the book, kept up to date on every change."""
+        return self._stats
+
+    @property
+    def birthday_timeline(self) -> BirthdayTimeline:
+        """The birthdays ordered by day of the year, kept up to date on every change."""
+        return self._timeline
+
+    @property
+    def birthday_analytics(self) -> BirthdayAnalytics:
+        """The NumPy birthday column for age and birthday statistics.
+
+        Raises:
+            ImportError: If NumPy is not installed.
+        """
+        if self._birthday_analytics is None:
+            raise ImportError("Birthday analytics require NumPy. Install it with 'pip install numpy'.")
+        return self._birthday_analytics
+
+    def get_upcoming_birthdays(self, n_days: int=0, today=None):
         """
         Function returns a list of dictionaries with users and
         their birthdays for n days from today.
 
+        Uses the vectorized birthday column if NumPy is installed.
+
+        Args:
+            n_days: the number of days to check for upcoming birthdays form today.
+            today: the date to count from, the current date by default.
+        Return:
+            upcoming_birthdays: a list of records with users who celebrate birthday this in n_days,
+            the nearest birthdays first.
+        """
+        if self._birthday_analytics is not None:
+            return self._birthday_analytics.upcoming(n_days, today)
+        return self.scan_upcoming_birthdays(n_days, today)
+
+    def scan_upcoming_birthdays(self, n_days: int=0, today=None):
+        """
+        Scalar version of get_upcoming_birthdays that checks the records one by one.
+
         Args:
             n_days: the number of days to check for upcoming birthdays form today.
+            today: the date to count from, the current date by default.
         Return:
-            upcoming_birthdays: a list of records with users who celebrate birthday this in n_days.
+            upcoming_birthdays: a list of records with users who celebrate birthday this in n_days,
+            the nearest birthdays first.
         """
-        today = datetime.today().date()
+        today = today or datetime.today().date()
         upcoming_birthdays = []
 
         for record in self.data.values():
             if record.birthday:
                 birthday = record.birthday.value
-                birthday_this_year = birthday.replace(year=today.year)
+                birthday_this_year = birthday_in_year(birthday, today.year)
 
                 if birthday_this_year < today:
-                    birthday_this_year = birthday_this_year.replace(year=today.year + 1)
+                    birthday_this_year = birthday_in_year(birthday, today.year + 1)
 
                 delta_days = (birthday_this_year - today).days
                 
                 if 0 <= delta_days <= n_days:
-                    upcoming_birthdays.append(record)
+                    upcoming_birthdays.append((delta_days, record.name.value, record))
 
-        return upcoming_birthdays
+        return [record for _, _, record in sorted(upcoming_birthdays, key=lambda item: item[:2])]
+
+    def iter_records(self, after: str = None) -> Iterator[Record]:
+        """Iterate over the records in name order.
+
+        Args:
+            after (str, optional): The cursor, i.e. the name of the last record already seen.
+                Iteration resumes with the first name after it. Defaults to None.
+
+        Yields:
+            Record: The records in name order.
+        """
+        for name in self._name_index.iter_after(after):
+            record = self.data.get(name)
+            if record is not None:
+                yield record
 
     def find_contacts_by_field(self, field_name: str, value: any):
         """Find a record by field name.
@@ -108,30 +281,59 @@ class AddressBook(UserDict):
         Returns:
            list: The found records.
         """
+        return list(self.iter_find_contacts_by_field(field_name, value))
+
+    def iter_find_contacts_by_field(self, field_name: str, value: any, after: str = None) -> Iterator[Record]:
+        """Iterate over the records matching the value in the given field.
+
+        The records are checked lazily in name order, so the caller can stop
+        as soon as it has enough results. Email queries in the form '@domain',
+        '*.domain', 'local@' or 'local@domain' are answered from the email index when
+        something matches them exactly, otherwise they are searched as a substring.
+        On large books other searches run on the parallel scan engine if it is enabled.
 
-        result = set()
-        for item in self.data.values():
-            if field_name == "phone" or field_name == "phones":
-                if value in item.phones or any([value in phone.__str__() for phone in item.phones]):
-                    result.add(item)
-            elif field_name == "note":
-                if value in item.notes or any([value.lower() in note.__str__().lower() for note in item.notes]):
-                    result.add(item)
-            elif field_name == "tag":
-                if item.notes:
-                    for note in item.notes:
-                        if any([value.lower() in tag.__str__().lower() for tag in note.tags]):
-                            result.add(item)
-                            break
-            elif hasattr(item, field_name):
-                field_value = getattr(item, field_name)
-                if field_value == value or value.lower() in field_value.__str__().lower():
-                    result.add(item)
-            elif field_name == "all":
-                for dict_value in item.__dict__.values():
-                    if value == dict_value or value.lower() in dict_value.__str__().lower():
-                        result.add(item)
-        return list(result)
+        Args:
+            field_name (str): The field to search for.
+            value (any): The value to search for.
+            after (str, optional): The name of the last record already seen. Defaults to None.
+
+        Yields:
+            Record: The found records.
+        """
+        indexed = self._email_index.lookup(value) if field_name == "email" else None
+        if indexed is None and self._scan_engine is not None and self._scan_engine.accepts(field_name):
+            indexed = self._scan_engine.scan(field_name, value)
+        if indexed is not None:
+            for record in sorted(indexed, key=lambda record: record.name.value):
+                if after is None or record.name.value > after:
+                    yield record
+            return
+
+        for record in self.iter_records(after):
+            if self._match_field(record, field_name, value):
+                yield record
+
+    @staticmethod
+    def _match_field(item: Record, field_name: str, value: any) -> bool:
+        """Check whether the record matches the value in the given field."""
+        if field_name == "phone" or field_name == "phones":
+            return value in item.phones or any([value in phone.__str__() for phone in item.phones])
+        elif field_name == "note":
+            return value in item.notes or any([value.lower() in note.__str__().lower() for note in item.notes])
+        elif field_name == "tag":
+            for note in item.notes:
+                if any([value.lower() in tag.__str__().lower() for tag in note.tags]):
+                    return True
+            return False
+        elif hasattr(item, field_name):
+            field_value = getattr(item, field_name)
+            return field_value == value or value.lower() in field_value.__str__().lower()
+        elif field_name == "all":
+            return any(
+                AddressBook._match_field(item, name, value)
+                for name in ("name", "phones", "email", "birthday", "address", "note", "tag")
+            )
+        return False
 
     def sort_records(self) -> None:
         """Sort the records in the address book by name."""
@@ -153,9 +355,9 @@ class AddressBook(UserDict):
             Record: The found record, or None if not found.
         """
         for record in self.data.values():
-            for note in record.notes:
-                if note.title == note_title:
-                    return note
+            note = record.find_note_by_title(note_title)
+            if note is not None:
+                return note
         return None
 
     def delete_note_by_title(self, note_title):
@@ -167,11 +369,43 @@ class AddressBook(UserDict):
         Raises:
             ValueError: If the note is not found or the title is invalid.
         """
+        record = self.find_note_owner(note_title)
+        if record is not None:
+            record.remove_note_by_title(note_title)
+
+    def find_note_owner(self, note_title) -> Union[Record, None]:
+        """Find the record that has a note with the given title.
+
+        Args:
+            note_title (str): The title to search for.
+
+        Returns:
+            Record: The found record, or None if not found.
+        """
         for record in self.data.values():
-            for note in record.notes:
-                if note.title == note_title:
-                    record.notes.remove(note)
-                    return
+            if record.find_note_by_title(note_title) is not None:
+                return record
+        return None
+
+    def domain_counts(self) -> dict[str, int]:
+        """Return the number of contacts per email domain.
+
+        Returns:
+            dict: The domain -> number of contacts mapping, taken from the email index.
+        """
+        return self._email_index.domain_counts()
+
+    def search_notes(self, query: str, limit: int = None) -> list[tuple]:
+        """Full-text search over note titles, contents and tags ranked with BM25.
+
+        Args:
+            query (str): The search query. Words in double quotes are matched as a phrase.
+            limit (int, optional): The maximum number of results. Defaults to None (all).
+
+        Returns:
+            list: The (record, note) pairs ordered from the best match.
+        """
+        return self._note_index.search(query, limit)
 
     def find_notes_by_tag(self, tag):
         """Find notes by tag.
@@ -182,17 +416,99 @@ class AddressBook(UserDict):
         Returns:
             list: The found notes.
         """
-        result = []
-        for record in self.data.values():
-            if record.notes:
-                for note in record.notes:
-                    if tag in note.tags:
-                        result.append(note)
-        return result
+        return [note for _, note in self.iter_find_notes_by_tag(tag)]
+
+    def iter_find_notes_by_tag(self, tag, after: tuple = None) -> Iterator[tuple]:
+        """Iterate over the notes with the given tag.
+
+        Args:
+            tag (str): The tag to search for.
+            after (tuple, optional): The cursor, i.e. the (contact name, note title)
+                of the last note already seen. Defaults to None.
+
+        Yields:
+            tuple: The (record, note) pairs, ordered by contact name.
+        """
+        after_name, after_title = after if after is not None else (None, None)
+        if after_name is not None and after_name in self.data:
+            # Finish the notes of the record the cursor stopped in
+            record = self.data[after_name]
+            titles = [note.title for note in record.notes]
+            start = titles.index(after_title) + 1 if after_title in titles else len(titles)
+            for note in record.notes[start:]:
+                if tag in note.tags:
+                    yield record, note
+
+        for record in self.iter_records(after_name):
+            for note in record.notes:
+                if tag in note.tags:
+                    yield record, note
+
+    def rename_tag(self, old_tag: str, new_tag: str) -> int:
+        """Rename a tag in the notes of all contacts.
+
+        The notes share one instance per tag, so the rename itself does not
+        touch the notes; only the records using the tag are marked as changed.
+        If the new tag already exists, the two tags are merged.
+
+        Args:
+            old_tag (str): The current tag.
+            new_tag (str): The new tag.
+
+        Returns:
+            int: The number of contacts whose notes use the tag.
+
+        Raises:
+            ValueError: If the tag is not found or the new tag is empty.
+        """
+        records = self.tags.rename(old_tag, new_tag)
+        for record in records:
+            record._changed()
+        return len(records)
+
+    def complete(self, field: str, prefix: str, limit: int = 20) -> list[str]:
+        """Return contact names, note titles or tags that start with the prefix, ignoring case.
+
+        Args:
+            field (str): One of name, title or tag.
+            prefix (str): The typed beginning of the value.
+            limit (int, optional): The maximum number of values. Defaults to 20.
+
+        Returns:
+            list: The values in alphabetical order.
+        """
+        return self._prefix_index.complete(field, prefix, limit)
+
+    def find_duplicates(self) -> list[list[Record]]:
+        """Find groups of records that are likely the same contact.
+
+        Returns:
+            list: The clusters of records sharing a phone or an email, or with nearly the same name.
+        """
+        return find_duplicates(self.data.values())
+
+    def merge_records(self, records: list[Record]) -> Record:
+        """Merge duplicate records into one and delete the rest.
+
+        The owner record is kept if it is in the group, otherwise the first one.
+
+        Args:
+            records (list): The duplicate records.
+
+        Returns:
+            Record: The record that was kept.
+        """
+        primary = next((record for record in records if record.owner), records[0])
+        for record in records:
+            if record is not primary:
+                self.delete(record.name.value)
+                primary.merge(record)
+        return primary
 
     def update_name(self, name, new_name):
-        self.data[new_name] = self.data.pop(name)
-        return self.data[new_name].edit_name(new_name)
+        record = self.data.pop(name)
+        self[new_name] = record
+        return record.edit_name(new_name)
 
 
 
@@ -0,0 +1,191 @@
+from datetime import date, datetime
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is an optional dependency
+    np = None
+
+UNIX_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def birthday_in_year(birthday: date, year: int) -> date:
+    """
+    Return the date of the birthday in the given year.
+
+    Birthdays on February 29 are celebrated on March 1 in non-leap years.
+
+    Args:
+        birthday (date): The date of birth.
+        year (int): The year.
+
+    Returns:
+        date: The birthday in that year.
+    """
+    try:
+        return birthday.replace(year=year)
+    except ValueError:
+        return date(year, 3, 1)
+
+
+class BirthdayAnalytics:
+    """NumPy column of contact birthdays for vectorized birthday and age queries."""
+
+    def __init__(self) -> None:
+        """
+        Initialize an empty column.
+
+        Raises:
+            ImportError: If NumPy is not installed.
+        """
+        if np is None:
+            raise ImportError("Birthday analytics require NumPy. Install it with 'pip install numpy'.")
+        self.clear()
+
+    def clear(self) -> None:
+        """Remove all records from the column."""
+        self._birthdays: dict = {}
+        self._columns = None
+
+    def add(self, record) -> None:
+        """Add the birthday of the record to the column."""
+        if record.birthday:
+            self._birthdays[record] = record.birthday.value
+            self._columns = None
+
+    def remove(self, record) -> None:
+        """Remove the birthday of the record from the column."""
+        if self._birthdays.pop(record, None) is not None:
+            self._columns = None
+
+    def update(self, record) -> None:
+        """Update the column if the birthday of the record has changed."""
+        current = record.birthday.value if record.birthday else None
+        if self._birthdays.get(record) != current:
+            self.remove(record)
+            self.add(record)
+
+    def _build(self) -> tuple:
+        """
+        Build the arrays from the collected birthdays in one pass.
+
+        Returns:
+            tuple: The records, names, birthdays and their years, months and days.
+        """
+        if self._columns is None:
+            records = list(self._birthdays)
+            ordinals = np.fromiter(
+                (birthday.toordinal() for birthday in self._birthdays.values()),
+                dtype=np.int64,
+                count=len(records),
+            )
+            birthdays = (ordinals - UNIX_EPOCH_ORDINAL).astype("datetime64[D]")
+            years = birthdays.astype("datetime64[Y]")
+            months = birthdays.astype("datetime64[M]")
+            self._columns = (
+                records,
+                np.array([record.name.value for record in records], dtype=object),
+                birthdays,
+                years.astype(np.int64) + 1970,
+                (months - years).astype(np.int64) + 1,
+                (birthdays - months).astype(np.int64) + 1,
+            )
+        return self._columns
+
+    @staticmethod
+    def _in_year(year: int, months, days):
+        """Vectorized birthday_in_year: February 29 rolls over to March 1 in non-leap years."""
+        month_start = np.datetime64(f"{year:04d}-01", "M") + (months - 1)
+        return month_start.astype("datetime64[D]") + (days - 1)
+
+    def upcoming(self, n_days: int = 0, today: date = None) -> list:
+        """
+        Return the records with a birthday within n days from today.
+
+        Args:
+            n_days (int, optional): The number of days to look ahead. Defaults to 0 (today only).
+            today (date, optional): The date to count from. Defaults to the current date.
+
+        Returns:
+            list: The records ordered by the number of days until the birthday, then by name.
+        """
+        records, names, _, _, months, days = self._build()
+        if not records:
+            return []
+        today = today or datetime.today().date()
+        start = np.datetime64(today, "D")
+
+        this_year = self._in_year(today.year, months, days)
+        next_year = self._in_year(today.year + 1, months, days)
+        upcoming = np.where(this_year < start, next_year, this_year)
+        delta = (upcoming - start).astype(np.int64)
+
+        positions = np.flatnonzero(delta <= n_days)
+        order = np.lexsort((names[positions], delta[positions]))
+        return [records[i] for i in positions[order]]
+
+    def ages(self, today: date = None):
+        """
+        Return the current age of every contact with a birthday.
+
+        Args:
+            today (date, optional): The date to count the age at. Defaults to the current date.
+
+        Returns:
+            numpy.ndarray: The ages in the order of the column.
+        """
+        _, _, _, years, months, days = self._build()
+        today = today or datetime.today().date()
+        # February 29 birthdays count from March 1 in non-leap years, as February 29 never comes
+        had_birthday = (months < today.month) | ((months == today.month) & (days <= today.day))
+        return today.year - years - (~had_birthday).astype(np.int64)
+
+    def age_distribution(self, bin_width: int = 10, today: date = None) -> dict[int, int]:
+        """
+        Return the number of contacts per age group.
+
+        Args:
+            bin_width (int, optional): The width of an age group in years. Defaults to 10.
+            today (date, optional): The date to count the age at. Defaults to the current date.
+
+        Returns:
+            dict: The first age of the group -> number of contacts, for non-empty groups.
+        """
+        counts = np.bincount(self.ages(today) // bin_width)
+        return {int(group) * bin_width: int(counts[group]) for group in np.flatnonzero(counts)}
+
+    def birthdays_per_month(self) -> list[int]:
+        """
+        Return the number of birthdays in every month.
+
+        Returns:
+            list: Twelve counts, from January to December.
+        """
+        _, _, _, _, months, _ = self._build()
+        return np.bincount(months - 1, minlength=12).tolist()
+
+    def turning_round_age(self, step: int = 10, today: date = None) -> list:
+        """
+        Return the records that turn a round age this year, e.g. 30, 40 or 50.
+
+        Args:
+            step (int, optional): The age is round when it is a multiple of the step. Defaults to 10.
+            today (date, optional): A date in the year to check. Defaults to the current date.
+
+        Returns:
+            list: The records ordered by name.
+        """
+        records, names, _, years, _, _ = self._build()
+        if not records:
+            return []
+        today = today or datetime.today().date()
+        age = today.year - years
+        positions = np.flatnonzero((age > 0) & (age % step == 0))
+        return [records[i] for i in positions[np.argsort(names[positions], kind="stable")]]
+
+    def __len__(self) -> int:
+        """Return the number of contacts with a birthday."""
+        return len(self._birthdays)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(birthdays={len(self._birthdays)})"
+
@@ -1,6 +1,7 @@
-from datetime import datetime
+from datetime import date, datetime
+from typing import Iterable
 from colorama import Style, init, Fore
-from .field import Field
+from .field import Field, ValidationResult
 
 init(autoreset=True)
 
@@ -8,10 +9,15 @@ init(autoreset=True)
 class Birthday(Field):
     """Class for storing a birthday date. It has format validation (DD.MM.YYYY)."""
 
+    __slots__ = ()
+
     BIRTHDAY_FORMAT = "%d.%m.%Y"
 
+    # (today, earliest, latest valid birthday), computed once a day instead of on every birthday
+    _bounds_cache = (None, None, None)
+
     def __init__(self, value):
-        super().__init__(self.validate(value).date())
+        super().__init__(self.parse(value))
 
     @staticmethod
     def validate(value):
@@ -19,22 +25,101 @@ class Birthday(Field):
         Check for the correctness of the birthday format.
         The age of the contact should not exceed 100 years.
         """
+        birthday = Birthday.parse(value)
+        return datetime(birthday.year, birthday.month, birthday.day)
+
+    @staticmethod
+    def parse(value, today: date = None) -> date:
+        """
+        Parse and check the birthday. The age of the contact should not exceed 100 years.
+
+        Args:
+            value (str): The birthday in the DD.MM.YYYY format.
+            today (date, optional): The current date. Defaults to date.today().
+
+        Returns:
+            date: The birthday.
+
+        Raises:
+            ValueError: If the format is wrong or the date is out of range.
+        """
+        today = today or date.today()
+        cached_today, min_date, max_date = Birthday._bounds_cache
+        if cached_today != today:
+            min_date, max_date = Birthday._bounds(today)
+            Birthday._bounds_cache = (today, min_date, max_date)
+        return Birthday._validate(value, min_date, max_date)
+
+    @staticmethod
+    def _bounds(today: date) -> tuple:
+        """
+        Return the latest invalid and the latest valid birthday for the current date.
+
+        Dates are compared without the time, so the 100-year bound itself is already invalid,
+        as it was when the current time was compared. On February 29 the bound is February 28.
+        """
         try:
-            date = datetime.strptime(value, Birthday.BIRTHDAY_FORMAT)
+            min_date = today.replace(year=today.year - 100)
+        except ValueError:
+            min_date = today.replace(year=today.year - 100, day=28)
+        return min_date, today
+
+    @staticmethod
+    def _parse_date(value) -> date:
+        """
+        Parse a date in the DD.MM.YYYY format.
+
+        Canonical values are converted straight into a date; anything else,
+        e.g. without leading zeros, goes through strptime.
+
+        Raises:
+            ValueError: If the value is not a valid date in the format.
+        """
+        if len(value) == 10 and value[2] == "." and value[5] == ".":
+            day, month, year = value[:2], value[3:5], value[6:]
+            if day.isdigit() and month.isdigit() and year.isdigit():
+                return date(int(year), int(month), int(day))
+        return datetime.strptime(value, Birthday.BIRTHDAY_FORMAT).date()
+
+    @staticmethod
+    def _validate(value, min_date: date, max_date: date) -> date:
+        """Parse the birthday and check that it lies after min_date and not after max_date."""
+        try:
+            birthday = Birthday._parse_date(value)
         except ValueError:
             raise ValueError(
                 f"{Fore.RED}Invalid date format. Use 'DD.MM.YYYY'.{Style.RESET_ALL}"
             )
 
-        current_date = datetime.now()
-        min_date = current_date.replace(year=current_date.year - 100)
-        max_date = current_date
-
-        if date < min_date or date > max_date:
+        if birthday <= min_date or birthday > max_date:
             raise ValueError(
                 f"{Fore.RED}Invalid date. Date must be between {min_date.strftime(Birthday.BIRTHDAY_FORMAT)} and {max_date.strftime(Birthday.BIRTHDAY_FORMAT)}.{Style.RESET_ALL}"
             )
-        return date
+        return birthday
+
+    @staticmethod
+    def validate_many(values: Iterable[str], now: datetime = None) -> ValidationResult:
+        """
+        Validate many birthdays at once without raising.
+        All values are checked against the same current date.
+
+        Args:
+            values (Iterable[str]): The birthdays in the DD.MM.YYYY format.
+            now (datetime, optional): The current date. Defaults to datetime.now().
+
+        Returns:
+            ValidationResult: The dates Birthday objects would store and the ValueErrors
+                their constructor would raise.
+        """
+        min_date, max_date = Birthday._bounds((now or datetime.now()).date())
+        dates, errors = [], {}
+        for i, value in enumerate(values):
+            try:
+                dates.append(Birthday._validate(value, min_date, max_date))
+            except ValueError as error:
+                errors[i] = error
+                dates.append(None)
+        return ValidationResult(dates, errors)
 
     def __repr__(self) -> str:
         """
@@ -0,0 +1,127 @@
+import threading
+from bisect import bisect_left, insort
+from datetime import date
+from typing import Callable, Union
+
+from .analytics import birthday_in_year
+
+
+class BirthdayTimeline:
+    """Birthdays of the address book ordered by day of the year.
+
+    The next birthday after any date is found with a binary search, and the
+    timeline is updated per record, so a reminder never has to scan the book.
+    The timeline may be read from a reminder thread while the book changes;
+    the listeners are called after the lock is released.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty timeline."""
+        # Called with the (month, day) keys a change touched, e.g. to reschedule a reminder
+        self.listeners: list[Callable[[tuple], None]] = []
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        """Remove all records from the timeline."""
+        with self._lock:
+            # (month, day) -> records celebrating on that day
+            self._days: dict[tuple, set] = {}
+            # The keys of self._days in calendar order
+            self._keys: list[tuple] = []
+            # record -> its (month, day) key
+            self._contributions: dict = {}
+
+    @staticmethod
+    def _key(record) -> Union[tuple, None]:
+        """Return the (month, day) of the birthday of the record, None without a birthday."""
+        if not record.birthday:
+            return None
+        birthday = record.birthday.value
+        return birthday.month, birthday.day
+
+    def _notify(self, *keys: tuple) -> None:
+        """Tell the listeners which days changed."""
+        for listener in self.listeners:
+            listener(keys)
+
+    def add(self, record) -> None:
+        """Add the birthday of the record."""
+        key = self._key(record)
+        if key is None:
+            return
+        with self._lock:
+            self._contributions[record] = key
+            records = self._days.get(key)
+            if records is None:
+                records = self._days[key] = set()
+                insort(self._keys, key)
+            records.add(record)
+        self._notify(key)
+
+    def remove(self, record) -> None:
+        """Remove the birthday of the record."""
+        with self._lock:
+            key = self._contributions.pop(record, None)
+            if key is None:
+                return
+            records = self._days[key]
+            records.discard(record)
+            if not records:
+                del self._days[key]
+                del self._keys[bisect_left(self._keys, key)]
+        self._notify(key)
+
+    def update(self, record) -> None:
+        """Move the record if its birthday has changed."""
+        if self._contributions.get(record) != self._key(record):
+            self.remove(record)
+            self.add(record)
+
+    def next_date(self, today: date = None) -> Union[date, None]:
+        """
+        Return the date of the nearest birthday on or after today.
+
+        Args:
+            today (date, optional): The date to search from. Defaults to the current date.
+
+        Returns:
+            date: The date of the next birthday, None if nobody has a birthday.
+        """
+        today = today or date.today()
+        with self._lock:
+            if not self._keys:
+                return None
+            position = bisect_left(self._keys, (today.month, today.day))
+            # February 29 is celebrated on March 1 in non-leap years, so look one key back
+            nearby = self._keys[max(position - 1, 0):position + 1]
+            first = self._keys[0]
+        for key in nearby:
+            celebrated = birthday_in_year(date(2000, *key), today.year)
+            if celebrated >= today:
+                return celebrated
+        return birthday_in_year(date(2000, *first), today.year + 1)
+
+    def on(self, day: date) -> list:
+        """
+        Return the records that celebrate their birthday on the day.
+
+        Args:
+            day (date): The day.
+
+        Returns:
+            list: The records ordered by name.
+        """
+        leap_day = day.month == 3 and day.day == 1 and birthday_in_year(date(2000, 2, 29), day.year) == day
+        with self._lock:
+            records = list(self._days.get((day.month, day.day), ()))
+            if leap_day:
+                records.extend(self._days.get((2, 29), ()))
+        return sorted(records, key=lambda record: record.name.value)
+
+    def __len__(self) -> int:
+        """Return the number of records with a birthday."""
+        return len(self._contributions)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(birthdays={len(self)}, days={len(self._keys)})"
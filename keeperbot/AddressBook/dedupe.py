@@ -0,0 +1,154 @@
+from collections import defaultdict
+from difflib import SequenceMatcher
+from itertools import combinations
+
+
+SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+# Names sharing a phonetic key must be at least this similar to count as one contact
+NAME_SIMILARITY = 0.9
+
+
+def soundex(word: str) -> str:
+    """
+    Return the American Soundex code of a word, e.g. Robert -> R163.
+
+    Args:
+        word (str): The word to encode.
+
+    Returns:
+        str: The four-character code, or an empty string if the word has no letters.
+    """
+    letters = [char for char in word.lower() if char.isalpha()]
+    if not letters:
+        return ""
+
+    code = [letters[0].upper()]
+    previous = SOUNDEX_CODES.get(letters[0], "")
+    for char in letters[1:]:
+        digit = SOUNDEX_CODES.get(char, "")
+        if digit and digit != previous:
+            code.append(digit)
+            if len(code) == 4:
+                break
+        # 'h' and 'w' do not separate letters with the same code, vowels do
+        if char not in "hw":
+            previous = digit
+    return "".join(code).ljust(4, "0")
+
+
+def name_key(name: str) -> str:
+    """
+    Return the phonetic key of a contact name, e.g. 'Jon Smyth' -> 'J500 S530'.
+
+    Args:
+        name (str): The contact name.
+
+    Returns:
+        str: The Soundex codes of the words of the name.
+    """
+    return " ".join(code for code in (soundex(word) for word in name.split()) if code)
+
+
+def blocking_keys(record) -> list[tuple[str, str]]:
+    """
+    Return the keys that identify the record as the same contact as another one.
+
+    Args:
+        record (Record): The record.
+
+    Returns:
+        list: The (kind, key) pairs for the phones and the email of the record.
+    """
+    keys = [("phone", phone.value) for phone in record.phones]
+    if record.email:
+        keys.append(("email", str(record.email).lower()))
+    return keys
+
+
+def similar_names(first: str, second: str) -> bool:
+    """
+    Check whether two names are spellings of the same name, e.g. 'Jon Smith' and 'John Smith'.
+
+    Names with different numbers, e.g. 'Office 1' and 'Office 2', are never similar.
+
+    Args:
+        first (str): The first name.
+        second (str): The second name.
+
+    Returns:
+        bool: True if the names differ at most by a small typo.
+    """
+    first, second = first.casefold(), second.casefold()
+    if [char for char in first if char.isdigit()] != [char for char in second if char.isdigit()]:
+        return False
+    matcher = SequenceMatcher(None, first, second)
+    # The quick upper bounds reject most pairs before the full comparison
+    return (
+        matcher.real_quick_ratio() >= NAME_SIMILARITY
+        and matcher.quick_ratio() >= NAME_SIMILARITY
+        and matcher.ratio() >= NAME_SIMILARITY
+    )
+
+
+def find_duplicates(records) -> list[list]:
+    """
+    Group the records that share a normalized phone or an email, or have nearly the same name.
+
+    Records are joined through the shared phones and emails directly. A shared name
+    phonetic key only makes two records candidates; they are joined if their names are
+    similar, so 'John Smith' and 'Jane Smith' stay apart. Only records of the same
+    phonetic block are compared, so the cost grows with the number of records instead
+    of the number of pairs.
+
+    Args:
+        records (Iterable[Record]): The records to check.
+
+    Returns:
+        list: The clusters of two or more records, each sorted by name.
+    """
+    parent = {}
+
+    def find(record):
+        root = record
+        while parent[root] is not root:
+            root = parent[root]
+        while parent[record] is not root:
+            parent[record], record = root, parent[record]
+        return root
+
+    blocks = {}
+    candidates = defaultdict(list)
+    for record in records:
+        parent[record] = record
+        for key in blocking_keys(record):
+            first = blocks.setdefault(key, record)
+            if first is not record:
+                parent[find(record)] = find(first)
+        key = name_key(record.name.value)
+        if key:
+            # Names with different numbers are never similar, so they are not even compared
+            digits = "".join(char for char in record.name.value if char.isdigit())
+            candidates[(key, digits)].append(record)
+
+    for block in candidates.values():
+        for first, second in combinations(block, 2):
+            if find(first) is not find(second) and similar_names(first.name.value, second.name.value):
+                parent[find(second)] = find(first)
+
+    clusters = defaultdict(list)
+    for record in parent:
+        clusters[find(record)].append(record)
+
+    result = [
+        sorted(cluster, key=lambda record: record.name.value)
+        for cluster in clusters.values()
+        if len(cluster) > 1
+    ]
+    return sorted(result, key=lambda cluster: cluster[0].name.value)
@@ -1,13 +1,18 @@
 ﻿import re
+from typing import Iterable
 
 from colorama import Fore, Style
 from .addressbook_errors import InvalidEmailError
-from .field import Field
+from .field import Field, ValidationResult
 
 
 class Email(Field):
     """Class for storing email address."""
 
+    __slots__ = ()
+
+    EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,7}\b')
+
     def __init__(self, value: str) -> None:
         """Initialize the Email field with a value.
 
@@ -53,8 +58,28 @@ class Email(Field):
         if not email:
             raise InvalidEmailError(f"{Fore.RED}Email field cannot be empty.{Style.RESET_ALL}")
 
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,7}\b'
-
-        if re.match(email_pattern, email) is None:
+        if Email.EMAIL_PATTERN.match(email) is None:
             raise InvalidEmailError(f"{Fore.RED}Invalid email address.{Style.RESET_ALL}")
 
+    @classmethod
+    def validate_many(cls, emails: Iterable[str]) -> ValidationResult:
+        """Validate many email addresses at once without raising.
+
+        Args:
+            emails (Iterable[str]): The email address values.
+
+        Returns:
+            ValidationResult: The valid addresses and the InvalidEmailErrors
+                the constructor would raise.
+        """
+        match = cls.EMAIL_PATTERN.match
+        values, errors = [], {}
+        for i, email in enumerate(emails):
+            if not email:
+                errors[i] = InvalidEmailError(f"{Fore.RED}Email field cannot be empty.{Style.RESET_ALL}")
+                email = None
+            elif match(email) is None:
+                errors[i] = InvalidEmailError(f"{Fore.RED}Invalid email address.{Style.RESET_ALL}")
+                email = None
+            values.append(email)
+        return ValidationResult(values, errors)
@@ -0,0 +1,198 @@
+from typing import Union
+
+
+class DomainNode:
+    """Node of the reversed-domain trie, e.g. com -> example -> corp."""
+
+    __slots__ = ("children", "domain", "size")
+
+    def __init__(self) -> None:
+        self.children: dict[str, "DomainNode"] = {}
+        # Full domain name if some address uses exactly this domain
+        self.domain: Union[str, None] = None
+        # Number of domains stored in this subtree
+        self.size = 0
+
+
+class EmailIndex:
+    """Index of contacts by email address, local part and domain."""
+
+    def __init__(self) -> None:
+        """Initialize an empty index."""
+        self.clear()
+
+    def clear(self) -> None:
+        """Remove all records from the index."""
+        self._by_record: dict = {}
+        self._by_address: dict[str, set] = {}
+        self._by_local: dict[str, set] = {}
+        self._by_domain: dict[str, set] = {}
+        self._trie = DomainNode()
+
+    @staticmethod
+    def split(address: str) -> tuple[str, str]:
+        """Split a lowercased email address into the local part and the domain.
+
+        Args:
+            address (str): The email address.
+
+        Returns:
+            tuple: The local part and the domain.
+        """
+        local, _, domain = address.lower().rpartition("@")
+        return local, domain
+
+    def add(self, record) -> None:
+        """Index the email of the record.
+
+        Args:
+            record (Record): The record to index.
+        """
+        if not record.email:
+            return
+        address = str(record.email).lower()
+        local, domain = self.split(address)
+        self._by_record[record] = address
+        self._by_address.setdefault(address, set()).add(record)
+        self._by_local.setdefault(local, set()).add(record)
+        if domain not in self._by_domain:
+            self._by_domain[domain] = set()
+            self._insert_domain(domain)
+        self._by_domain[domain].add(record)
+
+    def remove(self, record) -> None:
+        """Remove the record from the index.
+
+        Args:
+            record (Record): The record to remove.
+        """
+        address = self._by_record.pop(record, None)
+        if address is None:
+            return
+        local, domain = self.split(address)
+        self._discard(self._by_address, address, record)
+        self._discard(self._by_local, local, record)
+        if self._discard(self._by_domain, domain, record):
+            self._delete_domain(domain)
+
+    def update(self, record) -> None:
+        """Reindex the record after it was changed.
+
+        Args:
+            record (Record): The changed record.
+        """
+        self.remove(record)
+        self.add(record)
+
+    def find_address(self, address: str) -> set:
+        """Return the records with exactly this email address (case-insensitive)."""
+        return set(self._by_address.get(address.lower(), ()))
+
+    def find_local(self, local: str) -> set:
+        """Return the records whose email has this local part (case-insensitive)."""
+        return set(self._by_local.get(local.lower(), ()))
+
+    def find_domain(self, domain: str) -> set:
+        """Return the records whose email is exactly at this domain."""
+        return set(self._by_domain.get(domain.lower(), ()))
+
+    def find_subdomains(self, domain: str) -> set:
+        """Return the records whose email is at a subdomain of this domain.
+
+        Args:
+            domain (str): The parent domain, e.g. corp.example.com.
+
+        Returns:
+            set: The records at e.g. mail.corp.example.com, but not at corp.example.com itself.
+        """
+        node = self._trie
+        for label in reversed(domain.lower().split(".")):
+            node = node.children.get(label)
+            if node is None:
+                return set()
+
+        result = set()
+        stack = list(node.children.values())
+        while stack:
+            node = stack.pop()
+            if node.domain is not None:
+                result.update(self._by_domain[node.domain])
+            stack.extend(node.children.values())
+        return result
+
+    def lookup(self, query: str) -> Union[set, None]:
+        """Answer an email query from the index.
+
+        Supported queries are '*.corp.example.com' (subdomains), '@example.com' (domain),
+        'john@' (local part) and 'john@example.com' (exact address).
+
+        Args:
+            query (str): The query.
+
+        Returns:
+            set: The matching records, or None if the query is not one of the supported forms
+                or nothing matches it exactly. Incomplete queries such as '@gmail' or 'jo@'
+                then fall back to the substring search.
+        """
+        query = query.strip()
+        result = None
+        if query.startswith("*.") and len(query) > 2:
+            result = self.find_subdomains(query[2:])
+        elif query.count("@") == 1:
+            local, domain = self.split(query)
+            if local and domain:
+                result = self.find_address(query)
+            elif domain:
+                result = self.find_domain(domain)
+            elif local:
+                result = self.find_local(local)
+        return result or None
+
+    def domain_counts(self) -> dict[str, int]:
+        """Return the number of contacts per email domain."""
+        return {domain: len(records) for domain, records in self._by_domain.items()}
+
+    @staticmethod
+    def _discard(index: dict, key: str, record) -> bool:
+        """Remove the record from the bucket and drop the bucket if it is empty.
+
+        Returns:
+            bool: True if the bucket was dropped.
+        """
+        bucket = index.get(key)
+        if bucket is None:
+            return False
+        bucket.discard(record)
+        if not bucket:
+            del index[key]
+            return True
+        return False
+
+    def _insert_domain(self, domain: str) -> None:
+        """Add the domain to the reversed-domain trie."""
+        node = self._trie
+        node.size += 1
+        for label in reversed(domain.split(".")):
+            node = node.children.setdefault(label, DomainNode())
+            node.size += 1
+        node.domain = domain
+
+    def _delete_domain(self, domain: str) -> None:
+        """Remove the domain from the reversed-domain trie and prune empty nodes."""
+        path = [self._trie]
+        labels = list(reversed(domain.split(".")))
+        for label in labels:
+            path.append(path[-1].children[label])
+        path[-1].domain = None
+        for node in path:
+            node.size -= 1
+        for parent, label, node in zip(reversed(path[:-1]), reversed(labels), reversed(path[1:])):
+            if node.size == 0:
+                del parent.children[label]
+
+    def __len__(self) -> int:
+        """Return the number of indexed records."""
+        return len(self._by_record)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(records={len(self._by_record)}, domains={len(self._by_domain)})"
@@ -1,10 +1,29 @@
+from typing import NamedTuple, Union
 from colorama import Fore, Style
 from colorama import init
 
 
+class ValidationResult(NamedTuple):
+    """Outcome of validating a batch of values.
+
+    values holds the cleaned value for every input in the same order, None for invalid ones;
+    errors maps the position of every invalid input to the exception the field would raise.
+    """
+
+    values: list
+    errors: dict[int, Exception]
+
+    def __bool__(self) -> bool:
+        """Return True if all values are valid."""
+        return not self.errors
+
+
 class Field:
     """Base class for record fields."""
 
+    # No per-instance __dict__: a field is only its value
+    __slots__ = ("value",)
+
     def __init__(self, value: str) -> None:
         """Initialize the Field object with a value."""
         self.value = value
@@ -35,6 +54,23 @@ class Field:
             return self.value == other.value
         return self.value == other
 
+    def __getstate__(self) -> dict:
+        """Return the slot values to pickle."""
+        return {
+            name: getattr(self, name)
+            for cls in type(self).__mro__
+            for name in getattr(cls, "__slots__", ())
+            if hasattr(self, name)
+        }
+
+    def __setstate__(self, state) -> None:
+        """Restore the slot values, also from files saved before the fields had __slots__."""
+        if isinstance(state, tuple):
+            instance_state, slot_state = state
+            state = {**(instance_state or {}), **(slot_state or {})}
+        for name, value in state.items():
+            setattr(self, name, value)
+
     def validate(self) -> None:
         """Validate the value of the Field object."""
         # Add your validation logic here
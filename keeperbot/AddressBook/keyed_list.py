@@ -0,0 +1,185 @@
+from abc import ABC, abstractmethod
+from typing import Any, Iterable, Iterator, Union
+
+# Marks the slot of a removed item until the list is compacted
+_REMOVED = object()
+
+
+class KeyedList(ABC):
+    """Insertion-ordered list of items with unique keys and O(1) lookup, removal and replacement by key.
+
+    Removed items leave a hole that is skipped by iteration and by access by
+    position; removing an item compacts the holes when they make up half of
+    the slots. Subclasses define the key of an item in key_of().
+    """
+
+    __slots__ = ("_items", "_positions", "_removed")
+
+    def __init__(self, items: Iterable = ()) -> None:
+        """
+        Initialize the list.
+
+        Args:
+            items (Iterable, optional): The initial items. Later items with a key
+                that is already taken are skipped. Defaults to none.
+        """
+        self._items: list = []
+        self._positions: dict = {}
+        self._removed = 0
+        for item in items:
+            if self.key_of(item) not in self._positions:
+                self.append(item)
+
+    @staticmethod
+    @abstractmethod
+    def key_of(item) -> Any:
+        """Return the key of the item."""
+
+    def get(self, key, default=None) -> Any:
+        """Return the item with the key, or the default if there is none."""
+        position = self._positions.get(key)
+        return default if position is None else self._items[position]
+
+    def has_key(self, key) -> bool:
+        """Check whether an item with the key exists."""
+        return key in self._positions
+
+    def append(self, item) -> None:
+        """
+        Add the item at the end.
+
+        Raises:
+            KeyError: If an item with the same key exists.
+        """
+        key = self.key_of(item)
+        if key in self._positions:
+            raise KeyError(key)
+        self._positions[key] = len(self._items)
+        self._items.append(item)
+
+    def pop(self, key, *default) -> Any:
+        """
+        Remove the item with the key and return it.
+
+        Raises:
+            KeyError: If there is no item with the key and no default is given.
+        """
+        position = self._positions.pop(key, None)
+        if position is None:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        item = self._items[position]
+        if position == len(self._items) - 1:
+            # The last item leaves no hole, nor do the holes before it
+            self._items.pop()
+            while self._items and self._items[-1] is _REMOVED:
+                self._items.pop()
+                self._removed -= 1
+        else:
+            self._items[position] = _REMOVED
+            self._removed += 1
+            if self._removed * 2 > len(self._items):
+                self._compact()
+        return item
+
+    def remove(self, item) -> None:
+        """
+        Remove the item.
+
+        Raises:
+            ValueError: If the item is not in the list.
+        """
+        if self.get(self.key_of(item), _REMOVED) is not item:
+            raise ValueError(f"{item!r} is not in the list")
+        self.pop(self.key_of(item))
+
+    def replace(self, key, item) -> None:
+        """
+        Put the item in place of the item with the key, keeping its position.
+
+        Raises:
+            KeyError: If there is no item with the key, or another item has the key of the new item.
+        """
+        position = self._positions[key]
+        new_key = self.key_of(item)
+        if new_key != key:
+            if new_key in self._positions:
+                raise KeyError(new_key)
+            del self._positions[key]
+            self._positions[new_key] = position
+        self._items[position] = item
+
+    def rekey(self, old_key) -> None:
+        """
+        Update the key of an item that was changed in place, e.g. a renamed note.
+
+        Raises:
+            KeyError: If there is no item with the old key, or another item has the new key.
+        """
+        self.replace(old_key, self._items[self._positions[old_key]])
+
+    def sort(self, key=None, reverse: bool = False) -> None:
+        """Sort the items in place, like list.sort()."""
+        items = sorted(self, key=key, reverse=reverse)
+        self._items = items
+        self._positions = {self.key_of(item): position for position, item in enumerate(items)}
+        self._removed = 0
+
+    def _compact(self) -> None:
+        """Drop the holes left by removed items."""
+        self._items = [item for item in self._items if item is not _REMOVED]
+        self._positions = {self.key_of(item): position for position, item in enumerate(self._items)}
+        self._removed = 0
+
+    def __iter__(self) -> Iterator:
+        """Iterate over the items in insertion order."""
+        if not self._removed:
+            return iter(self._items)
+        return (item for item in self._items if item is not _REMOVED)
+
+    def __len__(self) -> int:
+        """Return the number of items."""
+        return len(self._positions)
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        """Return the item at the position, or a list of items for a slice."""
+        if self._removed:
+            # Reads never compact, so lookups stay free of side effects
+            return [item for item in self._items if item is not _REMOVED][index]
+        return self._items[index]
+
+    def __contains__(self, item) -> bool:
+        """Check whether an item equal to the given one is in the list, like list.__contains__()."""
+        return any(item is other or other == item for other in self)
+
+    def __eq__(self, other) -> bool:
+        """Compare the items with another keyed list or a list."""
+        if isinstance(other, (KeyedList, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({list(self)!r})"
+
+
+class PhoneList(KeyedList):
+    """Phones of a record keyed by the normalized number."""
+
+    __slots__ = ()
+
+    @staticmethod
+    def key_of(phone) -> str:
+        """Return the normalized number of the phone."""
+        return phone.value
+
+
+class NoteList(KeyedList):
+    """Notes of a record keyed by the title."""
+
+    __slots__ = ()
+
+    @staticmethod
+    def key_of(note) -> str:
+        """Return the title of the note."""
+        return note.title
@@ -5,6 +5,8 @@ from .field import Field
 class Name(Field):
     """Class for storing contact names. Mandatory field."""
 
+    __slots__ = ()
+
     def __init__(self, value: str) -> None:
         """Initialize the Name field with a value.
 
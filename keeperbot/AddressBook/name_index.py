@@ -0,0 +1,71 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import Iterator
+
+
+class NameIndex:
+    """Contact names in sorted order, for listings that resume after a name."""
+
+    def __init__(self) -> None:
+        """Initialize an empty index."""
+        self.clear()
+
+    def clear(self) -> None:
+        """Remove all records from the index."""
+        # record -> the name the record was indexed under
+        self._names: dict = {}
+        # Built on the first lookup, so bulk loads do not pay for sorted inserts
+        self._sorted = None
+
+    def add(self, record) -> None:
+        """Add the name of the record."""
+        name = record.name.value
+        self._names[record] = name
+        if self._sorted is not None:
+            insort(self._sorted, name)
+
+    def remove(self, record) -> None:
+        """Remove the name of the record."""
+        name = self._names.pop(record, None)
+        if name is not None and self._sorted is not None:
+            position = bisect_left(self._sorted, name)
+            if position < len(self._sorted) and self._sorted[position] == name:
+                del self._sorted[position]
+
+    def update(self, record) -> None:
+        """Move the record if it was renamed."""
+        if self._names.get(record) != record.name.value:
+            self.remove(record)
+            self.add(record)
+
+    def build(self) -> None:
+        """Sort the names now instead of on the first lookup."""
+        if self._sorted is None:
+            self._sorted = sorted(self._names.values())
+
+    def iter_after(self, after: str = None) -> Iterator[str]:
+        """
+        Iterate over the names in sorted order.
+
+        Every step resumes after the name yielded last, so names added or
+        removed while the caller pauses between steps are seen correctly.
+
+        Args:
+            after (str, optional): The cursor; iteration starts with the first name after it.
+                Defaults to None (from the beginning).
+
+        Yields:
+            str: The names.
+        """
+        self.build()
+        position = 0 if after is None else bisect_right(self._sorted, after)
+        while position < len(self._sorted):
+            name = self._sorted[position]
+            yield name
+            position = bisect_right(self._sorted, name)
+
+    def __len__(self) -> int:
+        """Return the number of names."""
+        return len(self._names)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(names={len(self._names)})"
@@ -6,6 +6,8 @@ from .field import Field
 class Note(Field):
     """Class for storing a note."""
 
+    __slots__ = ("title", "tags")
+
     def __init__(self, title: str, value: str = None) -> None:
         """Initialize the Name field with a value.
 
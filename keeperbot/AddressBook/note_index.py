@@ -0,0 +1,169 @@
+import math
+import re
+from heapq import nlargest
+from typing import Union
+
+
+class NoteIndex:
+    """Inverted index with BM25 ranking over note titles, contents and tags."""
+
+    K1 = 1.2
+    B = 0.75
+    TOKEN_PATTERN = re.compile(r"\w+")
+    PHRASE_PATTERN = re.compile(r'"([^"]*)"')
+
+    def __init__(self) -> None:
+        """Initialize an empty index."""
+        self.clear()
+
+    def clear(self) -> None:
+        """Remove all documents from the index."""
+        # term -> {doc id -> positions of the term in the document}
+        self._postings: dict[str, dict[int, list[int]]] = {}
+        # doc id -> (record, note)
+        self._docs: dict[int, tuple] = {}
+        self._doc_lengths: dict[int, int] = {}
+        self._doc_terms: dict[int, set[str]] = {}
+        # record -> doc ids of its notes
+        self._record_docs: dict = {}
+        self._total_length = 0
+
+    @staticmethod
+    def tokenize(text: str) -> list[str]:
+        """Split a text into lowercase word tokens.
+
+        Args:
+            text (str): The text to split.
+
+        Returns:
+            list: The tokens in text order.
+        """
+        return NoteIndex.TOKEN_PATTERN.findall(text.lower()) if text else []
+
+    def add(self, record) -> None:
+        """Index all notes of the record.
+
+        Args:
+            record (Record): The record whose notes are indexed.
+        """
+        doc_ids = []
+        for note in record.notes:
+            doc_id = id(note)
+            self._add_document(doc_id, record, note)
+            doc_ids.append(doc_id)
+        if doc_ids:
+            self._record_docs[record] = doc_ids
+
+    def remove(self, record) -> None:
+        """Remove all notes of the record from the index.
+
+        Args:
+            record (Record): The record whose notes are removed.
+        """
+        for doc_id in self._record_docs.pop(record, []):
+            self._remove_document(doc_id)
+
+    def update(self, record) -> None:
+        """Reindex the notes of the record after it was changed.
+
+        Args:
+            record (Record): The changed record.
+        """
+        self.remove(record)
+        self.add(record)
+
+    def search(self, query: str, limit: int = None) -> list[tuple]:
+        """Rank the notes matching the query with BM25.
+
+        Words in double quotes are matched as a phrase.
+
+        Args:
+            query (str): The search query.
+            limit (int, optional): The maximum number of results. Defaults to None (all).
+
+        Returns:
+            list: The (record, note) pairs ordered from the best match.
+        """
+        phrases = [self.tokenize(phrase) for phrase in self.PHRASE_PATTERN.findall(query)]
+        phrases = [phrase for phrase in phrases if phrase]
+        terms = self.tokenize(self.PHRASE_PATTERN.sub(" ", query))
+        terms += [term for phrase in phrases for term in phrase]
+        if not terms:
+            return []
+
+        candidates = self._match_phrases(phrases) if phrases else None
+        scores = self._score(set(terms), candidates)
+        if limit is None:
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        else:
+            ranked = nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [self._docs[doc_id] for doc_id, _ in ranked]
+
+    def _add_document(self, doc_id: int, record, note) -> None:
+        """Add a single note to the index."""
+        position = 0
+        terms = set()
+        # One position is skipped between the fields so phrases never span them
+        for text in (note.title, note.value, *(str(tag) for tag in note.tags)):
+            for token in self.tokenize(text):
+                self._postings.setdefault(token, {}).setdefault(doc_id, []).append(position)
+                terms.add(token)
+                position += 1
+            position += 1
+
+        self._docs[doc_id] = (record, note)
+        self._doc_terms[doc_id] = terms
+        self._doc_lengths[doc_id] = position
+        self._total_length += position
+
+    def _remove_document(self, doc_id: int) -> None:
+        """Remove a single note from the index."""
+        for term in self._doc_terms.pop(doc_id):
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(doc_id)
+        del self._docs[doc_id]
+
+    def _match_phrases(self, phrases: list[list[str]]) -> set[int]:
+        """Return the ids of the documents that contain all phrases."""
+        result = None
+        for phrase in phrases:
+            matched = set()
+            postings = [self._postings.get(term, {}) for term in phrase]
+            docs = set(postings[0]).intersection(*postings[1:])
+            for doc_id in docs:
+                following = [set(p[doc_id]) for p in postings[1:]]
+                if any(
+                    all(start + offset + 1 in positions for offset, positions in enumerate(following))
+                    for start in postings[0][doc_id]
+                ):
+                    matched.add(doc_id)
+            result = matched if result is None else result & matched
+        return result
+
+    def _score(self, terms: set[str], candidates: Union[set[int], None]) -> dict[int, float]:
+        """Compute the BM25 score of the candidate documents for the terms."""
+        total_docs = len(self._docs)
+        average_length = self._total_length / total_docs if total_docs else 0
+        scores: dict[int, float] = {}
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (total_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, positions in postings.items():
+                if candidates is not None and doc_id not in candidates:
+                    continue
+                frequency = len(positions)
+                norm = self.K1 * (1 - self.B + self.B * self._doc_lengths[doc_id] / average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.K1 + 1) / (frequency + norm)
+        return scores
+
+    def __len__(self) -> int:
+        """Return the number of indexed notes."""
+        return len(self._docs)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(notes={len(self._docs)}, terms={len(self._postings)})"
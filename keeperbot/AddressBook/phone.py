@@ -1,11 +1,19 @@
 import re
+from typing import Iterable
 from colorama import Fore, Style
-from .field import Field
+from .field import Field, ValidationResult
 
 
 class Phone(Field):
     """Class for storing phone numbers. Validates international Phone numbers."""
 
+    __slots__ = ()
+
+    # Compiled once for the class instead of on every call
+    PHONE_PATTERN = re.compile(r"^\+\d{12,15}$")
+    NON_DIGITS_PATTERN = re.compile(r"(?!^\+)[\D]")
+    FORMAT_ERROR = f"{Fore.RED}The phone number must be in international format and begin with '+' followed by 12 to 15 digits.{Style.RESET_ALL}"
+
     def __init__(self, value: str) -> None:
         """
         Initialize a Phone object.
@@ -18,9 +26,7 @@ class Phone(Field):
         """
         normalized_value = self.normalize_phone(value)
         if not self.is_valid(normalized_value):
-            raise ValueError(
-                f"{Fore.RED}The phone number must be in international format and begin with '+' followed by 12 to 15 digits.{Style.RESET_ALL}"
-            )
+            raise ValueError(Phone.FORMAT_ERROR)
         super().__init__(normalized_value)
 
     @staticmethod
@@ -34,8 +40,7 @@ class Phone(Field):
         Returns:
             bool: True if the phone number is valid, False otherwise.
         """
-        pattern = r"^\+\d{12,15}$"
-        return re.match(pattern, value) is not None
+        return Phone.PHONE_PATTERN.match(value) is not None
 
     @staticmethod
     def normalize_phone(phone_number: str) -> str:
@@ -50,7 +55,7 @@ class Phone(Field):
 
         """
         # Remove all characters except '+' at the beginning and digits
-        cleaned_number = re.sub(r"(?!^\+)[\D]", "", phone_number)
+        cleaned_number = Phone.NON_DIGITS_PATTERN.sub("", phone_number)
 
         # Check if the number starts with '+'
         if cleaned_number.startswith("+"):
@@ -61,9 +66,51 @@ class Phone(Field):
         if len(cleaned_number) >= 12:  # minimum length of international number
             return "+" + cleaned_number
         else:
-            raise ValueError(
-                f"{Fore.RED}The phone number must be in international format and begin with '+' followed by 12 to 15 digits.{Style.RESET_ALL}"
-            )
+            raise ValueError(Phone.FORMAT_ERROR)
+
+    @classmethod
+    def normalize_many(cls, phone_numbers: Iterable[str]) -> ValidationResult:
+        """
+        Normalize many phone numbers at once without raising.
+
+        Args:
+            phone_numbers (Iterable[str]): The strings that contain the phone numbers.
+
+        Returns:
+            ValidationResult: The standardized numbers and the ValueErrors
+                that normalize_phone would raise.
+        """
+        return cls._clean_many(phone_numbers, validate=False)
+
+    @classmethod
+    def validate_many(cls, phone_numbers: Iterable[str]) -> ValidationResult:
+        """
+        Normalize and validate many phone numbers at once without raising.
+
+        Args:
+            phone_numbers (Iterable[str]): The strings that contain the phone numbers.
+
+        Returns:
+            ValidationResult: The values Phone objects would store and the ValueErrors
+                their constructor would raise.
+        """
+        return cls._clean_many(phone_numbers, validate=True)
+
+    @classmethod
+    def _clean_many(cls, phone_numbers: Iterable[str], validate: bool) -> ValidationResult:
+        """Normalize the phone numbers in one pass, optionally checking the format."""
+        sub = cls.NON_DIGITS_PATTERN.sub
+        match = cls.PHONE_PATTERN.match
+        values, errors = [], {}
+        for i, phone_number in enumerate(phone_numbers):
+            cleaned_number = sub("", phone_number)
+            if not cleaned_number.startswith("+"):
+                cleaned_number = "+" + cleaned_number if len(cleaned_number) >= 12 else None
+            if cleaned_number is None or validate and match(cleaned_number) is None:
+                errors[i] = ValueError(cls.FORMAT_ERROR)
+                cleaned_number = None
+            values.append(cleaned_number)
+        return ValidationResult(values, errors)
 
     def __repr__(self) -> str:
         """
@@ -0,0 +1,139 @@
+from bisect import bisect_left, insort
+
+
+class SortedValues:
+    """Case-insensitively sorted multiset of strings for prefix lookups."""
+
+    __slots__ = ("_counts", "_sorted")
+
+    def __init__(self) -> None:
+        """Initialize an empty multiset."""
+        self._counts: dict[str, int] = {}
+        # Built on the first lookup, so bulk loads do not pay for sorted inserts
+        self._sorted = None
+
+    def add(self, value: str) -> None:
+        """Add one occurrence of the value."""
+        count = self._counts.get(value, 0)
+        self._counts[value] = count + 1
+        if not count and self._sorted is not None:
+            insort(self._sorted, value, key=str.casefold)
+
+    def discard(self, value: str) -> None:
+        """Remove one occurrence of the value, if there is any."""
+        count = self._counts.get(value, 0)
+        if count > 1:
+            self._counts[value] = count - 1
+        elif count:
+            del self._counts[value]
+            if self._sorted is not None:
+                folded = value.casefold()
+                position = bisect_left(self._sorted, folded, key=str.casefold)
+                while self._sorted[position] != value:
+                    position += 1
+                del self._sorted[position]
+
+    def build(self) -> None:
+        """Sort the values now instead of on the first lookup."""
+        if self._sorted is None:
+            self._sorted = sorted(self._counts, key=str.casefold)
+
+    def starting_with(self, prefix: str, limit: int) -> list[str]:
+        """
+        Return the values that start with the prefix, ignoring case.
+
+        Args:
+            prefix (str): The beginning of the values.
+            limit (int): The maximum number of values.
+
+        Returns:
+            list: The values in alphabetical order.
+        """
+        self.build()
+        folded = prefix.casefold()
+        start = bisect_left(self._sorted, folded, key=str.casefold)
+        result = []
+        for value in self._sorted[start:start + limit]:
+            if not value.casefold().startswith(folded):
+                break
+            result.append(value)
+        return result
+
+    def __len__(self) -> int:
+        """Return the number of distinct values."""
+        return len(self._counts)
+
+
+class PrefixIndex:
+    """Index of contact names, note titles and tags for completion by prefix."""
+
+    FIELDS = ("name", "title", "tag")
+
+    def __init__(self) -> None:
+        """Initialize an empty index."""
+        self.clear()
+
+    def clear(self) -> None:
+        """Remove all records from the index."""
+        self._values = {field: SortedValues() for field in self.FIELDS}
+        # record -> the (names, titles, tags) the record added to the index
+        self._contributions: dict = {}
+
+    @staticmethod
+    def _contribution(record) -> tuple:
+        """Return the name, the note titles and the tags of the record."""
+        return (
+            (record.name.value,),
+            tuple(note.title for note in record.notes),
+            tuple(str(tag) for note in record.notes for tag in note.tags),
+        )
+
+    def add(self, record) -> None:
+        """Add the values of the record."""
+        contribution = self._contribution(record)
+        self._contributions[record] = contribution
+        for field, values in zip(self.FIELDS, contribution):
+            for value in values:
+                self._values[field].add(value)
+
+    def remove(self, record) -> None:
+        """Remove the values of the record."""
+        contribution = self._contributions.pop(record, None)
+        if contribution is not None:
+            for field, values in zip(self.FIELDS, contribution):
+                for value in values:
+                    self._values[field].discard(value)
+
+    def update(self, record) -> None:
+        """Replace the values of the changed record if they differ."""
+        if self._contributions.get(record) != self._contribution(record):
+            self.remove(record)
+            self.add(record)
+
+    def build(self) -> None:
+        """Sort all fields now, e.g. right after loading, instead of on the first lookup."""
+        for values in self._values.values():
+            values.build()
+
+    def complete(self, field: str, prefix: str, limit: int = 20) -> list[str]:
+        """
+        Return the values of the field that start with the prefix, ignoring case.
+
+        Args:
+            field (str): One of name, title or tag.
+            prefix (str): The typed beginning of the value.
+            limit (int, optional): The maximum number of values. Defaults to 20.
+
+        Returns:
+            list: The values in alphabetical order.
+
+        Raises:
+            ValueError: If the field is not supported.
+        """
+        if field not in self._values:
+            raise ValueError(f"Unsupported field: {field}. Use name, title or tag.")
+        return self._values[field].starting_with(prefix, limit)
+
+    def __repr__(self) -> str:
+        sizes = ", ".join(f"{field}s={len(values)}" for field, values in self._values.items())
+        return f"{self.__class__.__name__}({sizes})"
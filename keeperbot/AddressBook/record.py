@@ -7,12 +7,18 @@ from .email import Email
 from .name import Name
 from .phone import Phone
 from .birthday import Birthday
+from .keyed_list import NoteList, PhoneList
 
 
 
 class Record:
     """Class for storing contact information, including name and phone number list."""
 
+    __slots__ = ("name", "phones", "birthday", "email", "address", "notes", "owner", "_book", "_version", "_row_cache", "_str_cache")
+
+    # Derived from the data on demand; not pickled
+    _TRANSIENT = ("_book", "_version", "_row_cache", "_str_cache")
+
     def __init__(self, user_name: str) -> None:
         """
         Initialize a new Record object.
@@ -22,19 +28,62 @@ class Record:
 
         """
         self.name = Name(user_name)
-        self.phones = []
+        self.phones = PhoneList()
         self.birthday = None
         self.email = None
         self.address = None
-        self.notes: list[Note] = []
+        self.notes = NoteList()
         self.owner = False
-        
+        self._book = None
+        self._reset_caches()
+
+    def _reset_caches(self) -> None:
+        """Start the version counter and drop the rendered row and string."""
+        self._version = 0
+        # (version, value) pairs, reused while the version is unchanged
+        self._row_cache = None
+        self._str_cache = None
+
+    def _changed(self) -> None:
+        """
+        Bump the version of the record, so the cached renderings are rebuilt,
+        and notify the address book that owns the record that the record was modified.
+
+        """
+        self._version += 1
+        if self._book is not None:
+            self._book.reindex(self)
+
+    def table_row(self) -> tuple:
+        """
+        Return the record as a table row.
+
+        The row is cached until the record is modified.
+
+        Returns:
+            tuple: The name, phones, email, birthday, address, note titles, tags and owner mark.
+        """
+        if self._row_cache is None or self._row_cache[0] != self._version:
+            row = (
+                str(self.name),
+                ", ".join(str(phone) for phone in self.phones),
+                str(self.email) if self.email else None,
+                str(self.birthday) if self.birthday else None,
+                str(self.address) if self.address else None,
+                ", ".join(note.title for note in self.notes),
+                ", ".join(", ".join(str(tag) for tag in note.tags) for note in self.notes),
+                "+" if self.owner else "",
+            )
+            self._row_cache = (self._version, row)
+        return self._row_cache[1]
+
     def check_owner(self):
         """
         Set status owner to the record.
         
         """
         self.owner = True
+        self._changed()
 
     def add_phone(self, phone_number: str) -> None:
         """
@@ -45,9 +94,10 @@ class Record:
 
         """
         phone = Phone(phone_number)
-        if self.find_phone(phone_number) is not None:
+        if self.phones.has_key(phone.value):
             raise ValueError(f"{Fore.RED}Phone number already exists.{Style.RESET_ALL}")
         self.phones.append(phone)
+        self._changed()
 
     def remove_phone(self, phone_number: str) -> None:
         """
@@ -61,7 +111,8 @@ class Record:
         phone_record = self.find_phone(phone_number)
 
         if phone_record:
-            self.phones.remove(phone_record)
+            self.phones.pop(phone_record.value)
+            self._changed()
             return "Phone removed"
         else:
             return f"Contact \'{self.name.value}\' has  no phone number {phone_number} in the book"
@@ -77,37 +128,48 @@ class Record:
 
         """
         if self.find_phone(old_number) is not None:
-            self.phones = [Phone(new_number) if phone.value == old_number else phone for phone in self.phones]
+            phone = Phone(new_number)
+            if phone.value != old_number and self.phones.has_key(phone.value):
+                raise ValueError(f"{Fore.RED}Phone number already exists.{Style.RESET_ALL}")
+            self.phones.replace(old_number, phone)
+            self._changed()
             return "Phone updated"
         else:
             return f"Contact \'{self.name.value}\' has  no phone number {old_number} in the book"
     
     def edit_name(self, name):
         self.name.value = name
+        self._changed()
         return 'Contact info updated.'
 
     def edit_birthday(self, date):
         self.birthday = Birthday(date)
+        self._changed()
         return 'Contact info updated.'
 
     def delete_birthday(self):
         self.birthday = None
+        self._changed()
         return 'Contact info deleted.'
     
     def edit_address(self, new_address):
         self.address = Address(new_address)
+        self._changed()
         return 'Contact info updated.'
     
     def delete_address(self):
         self.address = None
+        self._changed()
         return 'Contact info deleted.'
     
     def edit_email(self, new_email):
         self.email = Email(new_email)
+        self._changed()
         return 'Contact info updated.'
         
     def delete_email(self):
         self.email = None
+        self._changed()
         return 'Contact info deleted.'
 
 
@@ -122,10 +184,7 @@ class Record:
             Phone: The Phone object if found, None otherwise.
 
         """
-        for phone in self.phones:
-            if phone.value == phone_number:
-                return phone
-        return None
+        return self.phones.get(phone_number)
 
     def sort_phones(self) -> None:
         """Sort the phone numbers in the record."""
@@ -140,6 +199,7 @@ class Record:
 
         """
         self.birthday = Birthday(birthday)
+        self._changed()
 
     def add_email(self, email):
         """ 
@@ -148,7 +208,8 @@ class Record:
             email (str): The email to add.
         """
         self.email = Email(email)
-        
+        self._changed()
+
     def add_note(self, title, value, tags=None):
         """
         Add a note to the record.
@@ -168,6 +229,7 @@ class Record:
             for tag in tags:
                 note.tags.append(Tag(tag))
         self.notes.append(note)
+        self._changed()
         
     def remove_note_by_title(self, title):
         """
@@ -175,7 +237,8 @@ class Record:
         Args:
             title (str): The title of the note to remove.
         """
-        self.notes = [note for note in self.notes if note.title != title]
+        if self.notes.pop(title, None) is not None:
+            self._changed()
         
     def edit_note_by_title(self, title, new_title, new_value):
         """
@@ -194,7 +257,9 @@ class Record:
         
         if note:
             note.title = new_title
+            self.notes.rekey(title)
             note.value = new_value
+            self._changed()
         else:
             raise ValueError(f"{Fore.RED}Note not found.{Style.RESET_ALL}")
                 
@@ -206,10 +271,7 @@ class Record:
         Returns:
             Note: The Note object if found, None otherwise.
         """
-        for note in self.notes:
-            if note.title == title:
-                return note
-        return None
+        return self.notes.get(title)
     
     def add_tag_to_note_by_title(self, title, tags: list):
         """
@@ -224,6 +286,7 @@ class Record:
         if note:
             for tag in tags:
                 note.tags.append(Tag(tag))
+            self._changed()
         else:
             raise ValueError(f"{Fore.RED}Note not found.{Style.RESET_ALL}")
         
@@ -238,18 +301,66 @@ class Record:
         """
         note = self.find_note_by_title(title)
         if note:
-            note.tags = [t for t in note.tags if t.value != tag]
+            note.tags = [t for t in note.tags if t != tag]
+            self._changed()
         else:
             raise ValueError(f"{Fore.RED}Note not found.{Style.RESET_ALL}")
 
+    def merge(self, other: "Record") -> None:
+        """
+        Merge the phones, notes, tags and missing details of another record into this one.
+        A note whose title is taken by a note with another text is kept under a free title.
+        Args:
+            other (Record): The duplicate record to take the data from.
+        """
+        for phone in other.phones:
+            if not self.phones.has_key(phone.value):
+                self.phones.append(phone)
+
+        for note in other.notes:
+            existing = self.find_note_by_title(note.title)
+            if existing is None:
+                self.notes.append(note)
+                continue
+            for tag in note.tags:
+                if tag not in existing.tags:
+                    existing.tags.append(tag)
+            if note.value == existing.value:
+                continue
+            # Keep both texts: the first free "<title> (<other name>)", "... 2", "... 3" title
+            base = f"{note.title} ({other.name.value})"
+            title, number = base, 1
+            existing = self.find_note_by_title(title)
+            while existing is not None and existing.value != note.value:
+                number += 1
+                title = f"{base} {number}"
+                existing = self.find_note_by_title(title)
+            # A note with the same title and text is already there
+            if existing is None:
+                note.title = title
+                self.notes.append(note)
+
+        self.email = self.email or other.email
+        self.birthday = self.birthday or other.birthday
+        self.address = self.address or other.address
+        self.owner = self.owner or other.owner
+        self._changed()
+
     def __str__(self) -> str:
         """
         Return a string representation of the Record object.
+        The string is cached until the record is modified.
 
         Returns:
             str: The string representation of the Record object.
 
         """
+        if self._str_cache is None or self._str_cache[0] != self._version:
+            self._str_cache = (self._version, self._render())
+        return self._str_cache[1]
+
+    def _render(self) -> str:
+        """Build the string representation of the Record object."""
         result = [f"Contact name: {self.name.value}"]
         phones_str = "; ".join(p.value for p in self.phones)
         if phones_str:
@@ -278,15 +389,40 @@ class Record:
         """
         return f"{self.__class__.__name__}(value='{self.name.value}')"
 
+    def __getstate__(self):
+        # The owning address book links itself again when it is loaded
+        state = {name: getattr(self, name) for name in self.__slots__ if name not in Record._TRANSIENT}
+        # Plain lists keep the file independent of the container classes
+        state["phones"] = list(self.phones)
+        state["notes"] = list(self.notes)
+        return state
+
     def __setstate__(self, state):
+        if isinstance(state, tuple):
+            # Saved by the default pickling of slotted objects
+            instance_state, slot_state = state
+            state = {**(instance_state or {}), **(slot_state or {})}
         self.name = state.get("name", None)
-        self.phones = state.get("phones", [])
+        self.phones = PhoneList(state.get("phones", []))
         self.birthday = state.get("birthday", None)
         self.email = state.get('email', None)
         self.address = state.get('address', None)
-        self.notes = state.get('notes', [])
+        self.notes = NoteList(Record._unique_titles(state.get('notes', [])))
         self.owner = state.get('owner', False)
-
+        self._book = None
+        self._reset_caches()
+
+    @staticmethod
+    def _unique_titles(notes: list[Note]) -> list[Note]:
+        """Rename notes whose title is already taken, as older versions allowed duplicate titles."""
+        titles = set()
+        for note in notes:
+            title, copy = note.title, 1
+            while note.title in titles:
+                copy += 1
+                note.title = f"{title} ({copy})"
+            titles.add(note.title)
+        return notes
 
     def add_address(self, address):
         """
@@ -295,6 +431,7 @@ class Record:
             address (str): The address to add.
         """
         self.address = Address(address)
+        self._changed()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,183 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Positions of the fields in a projected row
+NAME, PHONES, EMAIL, BIRTHDAY, ADDRESS, NOTES, TAGS = range(7)
+FIELDS = {"name": NAME, "email": EMAIL, "birthday": BIRTHDAY, "address": ADDRESS}
+
+# The projected rows of a worker process, sent once when the pool starts
+_worker_rows: list = []
+
+
+def project(record) -> tuple:
+    """
+    Build a compact, picklable row with the searchable text of a record.
+
+    The text is prepared the same way as in AddressBook._match_field
+    (lowercased str() of every field), so both paths find the same records.
+
+    Args:
+        record (Record): The record to project.
+
+    Returns:
+        tuple: The row (name, phones, email, birthday, address, notes, tags).
+    """
+    return (
+        str(record.name).lower(),
+        tuple(str(phone) for phone in record.phones),
+        str(record.email).lower(),
+        str(record.birthday).lower(),
+        str(record.address).lower(),
+        tuple(str(note).lower() for note in record.notes),
+        tuple(str(tag).lower() for note in record.notes for tag in note.tags),
+    )
+
+
+def match_row(row: tuple, field_name: str, value: str) -> bool:
+    """
+    Check whether the projected row matches the value in the given field.
+
+    Args:
+        row (tuple): The projected record.
+        field_name (str): The field to search for.
+        value (str): The value to search for.
+
+    Returns:
+        bool: True if the row matches.
+    """
+    if field_name == "phone" or field_name == "phones":
+        return any(value in phone for phone in row[PHONES])
+    lowered = value.lower()
+    if field_name == "note":
+        return any(lowered in note for note in row[NOTES])
+    if field_name == "tag":
+        return any(lowered in tag for tag in row[TAGS])
+    if field_name == "all":
+        return (
+            any(value in phone for phone in row[PHONES])
+            or any(lowered in row[position] for position in FIELDS.values())
+            or any(lowered in note for note in row[NOTES])
+            or any(lowered in tag for tag in row[TAGS])
+        )
+    return lowered in row[FIELDS[field_name]]
+
+
+def load_rows(rows: list[tuple]) -> None:
+    """Keep the projected rows in the worker process. Runs once when the worker starts."""
+    global _worker_rows
+    _worker_rows = rows
+
+
+def scan_rows(start: int, stop: int, field_name: str, value: str) -> list[int]:
+    """
+    Return the positions of the matching rows of a chunk. Runs in a worker process.
+
+    Only the bounds and the query are sent per search, the rows are already in the worker.
+
+    Args:
+        start (int): The position of the first row of the chunk.
+        stop (int): The position after the last row of the chunk.
+        field_name (str): The field to search for.
+        value (str): The value to search for.
+
+    Returns:
+        list: The positions of the matching rows in the whole row list.
+    """
+    return [
+        position for position in range(start, min(stop, len(_worker_rows)))
+        if match_row(_worker_rows[position], field_name, value)
+    ]
+
+
+class ScanEngine:
+    """Runs unindexed searches over projected records in a process pool."""
+
+    FIELDS = ("all", "name", "phone", "phones", "email", "birthday", "address", "note", "tag")
+
+    def __init__(self, workers: int = None, threshold: int = 50_000) -> None:
+        """
+        Initialize the engine.
+
+        Args:
+            workers (int, optional): The number of worker processes. Defaults to the number of CPUs.
+            threshold (int, optional): The minimum number of records to scan in parallel.
+                Smaller books are searched serially. Defaults to 50 000.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.threshold = threshold
+        self._executor = None
+        self.clear()
+
+    def clear(self) -> None:
+        """Remove all records from the engine."""
+        self._rows: dict = {}
+        self._snapshot = None
+
+    def add(self, record) -> None:
+        """Project the record."""
+        self._rows[record] = project(record)
+        self._snapshot = None
+
+    def remove(self, record) -> None:
+        """Drop the projection of the record."""
+        if self._rows.pop(record, None) is not None:
+            self._snapshot = None
+
+    def update(self, record) -> None:
+        """Project the record again after it was changed."""
+        self.add(record)
+
+    def accepts(self, field_name: str) -> bool:
+        """
+        Check whether the search should run on the engine.
+
+        Args:
+            field_name (str): The field to search for.
+
+        Returns:
+            bool: True if the field is supported and the book is large enough.
+        """
+        return field_name in self.FIELDS and len(self._rows) >= self.threshold
+
+    def scan(self, field_name: str, value: str) -> list:
+        """
+        Find the records matching the value in the given field.
+
+        The rows are sent to the worker processes once, when the pool starts; a change of
+        the book restarts the pool on the next search. Per search only the chunk bounds and
+        the query are sent.
+
+        Args:
+            field_name (str): The field to search for.
+            value (str): The value to search for.
+
+        Returns:
+            list: The matching records.
+        """
+        if self._snapshot is None:
+            # The workers hold the old rows
+            self.close()
+            self._snapshot = (list(self._rows), list(self._rows.values()))
+        records, rows = self._snapshot
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=load_rows, initargs=(rows,))
+        chunk_size = max(1, -(-len(rows) // (self.workers * 4)))
+        futures = [
+            self._executor.submit(scan_rows, start, start + chunk_size, field_name, value)
+            for start in range(0, len(rows), chunk_size)
+        ]
+        return [records[position] for future in futures for position in future.result()]
+
+    def close(self) -> None:
+        """Stop the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def __len__(self) -> int:
+        """Return the number of projected records."""
+        return len(self._rows)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(workers={self.workers}, threshold={self.threshold}, records={len(self._rows)})"
@@ -0,0 +1,194 @@
+import csv
+from array import array
+from collections import Counter
+from datetime import date
+from typing import Iterator
+from .birthday import Birthday
+
+
+class ColumnarSnapshot:
+    """Read-optimized column-per-field copy of the address book for reports and exports."""
+
+    def __init__(self, records=()) -> None:
+        """
+        Build the snapshot in one pass over the records.
+
+        Args:
+            records (Iterable[Record], optional): The records to copy. Defaults to none.
+        """
+        self.clear()
+        for record in records:
+            self._append(record)
+
+    def clear(self) -> None:
+        """Drop all rows."""
+        self.names: list[str] = []
+        self.emails: list[str] = []
+        self.addresses: list[str] = []
+        # Ordinal of the birthday, 0 if it is not set
+        self.birthdays = array("l")
+        self.note_counts = array("l")
+        # Notes of row i are notes[note_offsets[i]:note_offsets[i + 1]], as 'title: content'
+        self.notes: list[str] = []
+        self.note_offsets = array("q", [0])
+        # Phones of row i are phones[phone_offsets[i]:phone_offsets[i + 1]]
+        self.phones: list[str] = []
+        self.phone_offsets = array("q", [0])
+        # Tags of row i are tag_ids[tag_offsets[i]:tag_offsets[i + 1]]
+        self.tag_ids = array("l")
+        self.tag_offsets = array("q", [0])
+        self.tags: list[str] = []
+        self._tag_index: dict[str, int] = {}
+        # 1 for live rows, 0 for rows replaced by a newer version
+        self.alive = bytearray()
+        self._rows: dict = {}
+        self._dirty: dict = {}
+
+    def _append(self, record) -> None:
+        """Append a row for the record."""
+        self._rows[record] = len(self.names)
+        self.names.append(record.name.value)
+        self.emails.append(str(record.email) if record.email else "")
+        self.addresses.append(str(record.address) if record.address else "")
+        self.birthdays.append(record.birthday.value.toordinal() if record.birthday else 0)
+        self.note_counts.append(len(record.notes))
+        self.notes.extend(f"{note.title}: {note.value}" if note.value else note.title for note in record.notes)
+        self.note_offsets.append(len(self.notes))
+        self.phones.extend(phone.value for phone in record.phones)
+        self.phone_offsets.append(len(self.phones))
+        for note in record.notes:
+            for tag in note.tags:
+                tag = str(tag)
+                tag_id = self._tag_index.get(tag)
+                if tag_id is None:
+                    tag_id = self._tag_index[tag] = len(self.tags)
+                    self.tags.append(tag)
+                self.tag_ids.append(tag_id)
+        self.tag_offsets.append(len(self.tag_ids))
+        self.alive.append(1)
+
+    def add(self, record) -> None:
+        """Mark a new record to be copied on the next refresh."""
+        self._dirty[record] = True
+
+    def update(self, record) -> None:
+        """Mark a changed record to be copied again on the next refresh."""
+        self._dirty[record] = True
+
+    def remove(self, record) -> None:
+        """Mark a deleted record to be dropped on the next refresh."""
+        self._dirty[record] = False
+
+    def refresh(self) -> "ColumnarSnapshot":
+        """
+        Apply the changes of the dirty records.
+
+        Changed rows are replaced by new rows at the end; the old rows are only
+        marked as dead. The columns are compacted when most rows are dead.
+
+        Returns:
+            ColumnarSnapshot: The snapshot itself.
+        """
+        dirty, self._dirty = self._dirty, {}
+        for record, present in dirty.items():
+            row = self._rows.pop(record, None)
+            if row is not None:
+                self.alive[row] = 0
+            if present:
+                self._append(record)
+
+        if len(self.alive) > 2 * len(self._rows) + 1024:
+            records = sorted(self._rows, key=self._rows.get)
+            self.__init__(records)
+        return self
+
+    def __len__(self) -> int:
+        """Return the number of live rows."""
+        return len(self._rows)
+
+    def iter_rows(self) -> Iterator[tuple]:
+        """
+        Iterate over the live rows ordered by name.
+
+        The physical order of the rows follows the changes (a changed record gets a new
+        row at the end), so it is never used for output.
+
+        Yields:
+            tuple: The name, phones, email, birthday, address, notes and tags of a contact.
+        """
+        for row in sorted(self._rows.values(), key=self.names.__getitem__):
+            birthday = self.birthdays[row]
+            yield (
+                self.names[row],
+                self.phones[self.phone_offsets[row]:self.phone_offsets[row + 1]],
+                self.emails[row],
+                date.fromordinal(birthday) if birthday else None,
+                self.addresses[row],
+                self.notes[self.note_offsets[row]:self.note_offsets[row + 1]],
+                [self.tags[i] for i in self.tag_ids[self.tag_offsets[row]:self.tag_offsets[row + 1]]],
+            )
+
+    def count_without(self, field: str) -> int:
+        """
+        Count the contacts that have no value in the field.
+
+        Args:
+            field (str): One of phones, email, birthday or notes.
+
+        Returns:
+            int: The number of live rows without the field.
+
+        Raises:
+            ValueError: If the field is not supported.
+        """
+        if field == "phones":
+            offsets = self.phone_offsets
+            return sum(1 for row, alive in enumerate(self.alive) if alive and offsets[row] == offsets[row + 1])
+        columns = {"email": self.emails, "birthday": self.birthdays, "notes": self.note_counts}
+        if field not in columns:
+            raise ValueError(f"Unsupported field: {field}. Use phones, email, birthday or notes.")
+        return sum(1 for value, alive in zip(columns[field], self.alive) if alive and not value)
+
+    def tag_counts(self) -> Counter:
+        """
+        Count how many notes of the live rows use every tag.
+
+        Returns:
+            Counter: The tag -> number of uses mapping.
+        """
+        counts = Counter()
+        for row, alive in enumerate(self.alive):
+            if alive:
+                counts.update(self.tag_ids[self.tag_offsets[row]:self.tag_offsets[row + 1]])
+        return Counter({self.tags[tag_id]: count for tag_id, count in counts.items()})
+
+    def export_csv(self, filename: str) -> int:
+        """
+        Write the live rows to a CSV file, one contact per row, ordered by name.
+
+        Multiple phones and tags are separated by '; ', the notes of a contact are written
+        as 'title: content' lines of one cell.
+
+        Args:
+            filename (str): The path of the CSV file.
+
+        Returns:
+            int: The number of exported contacts.
+        """
+        with open(filename, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(["Name", "Phones", "Email", "Birthday", "Address", "Notes", "Tags"])
+            for name, phones, email, birthday, address, notes, tags in self.iter_rows():
+                writer.writerow([
+                    name,
+                    "; ".join(phones),
+                    email,
+                    birthday.strftime(Birthday.BIRTHDAY_FORMAT) if birthday else "",
+                    address,
+                    "\n".join(notes),
+                    "; ".join(tags),
+                ])
+        return len(self)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(rows={len(self._rows)}, dirty={len(self._dirty)})"
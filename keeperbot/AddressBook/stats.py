@@ -0,0 +1,106 @@
+from collections import Counter
+
+
+class BookStats:
+    """Aggregates of the address book that are updated on every record change."""
+
+    def __init__(self) -> None:
+        """Initialize empty aggregates."""
+        self.clear()
+
+    def clear(self) -> None:
+        """Reset all aggregates."""
+        self.contacts = 0
+        self.phones = 0
+        self.without_phones = 0
+        self.without_emails = 0
+        self.without_birthdays = 0
+        self.notes = 0
+        self.tags = 0
+        self.tag_counts = Counter()
+        # record -> what the record added to the aggregates
+        self._contributions: dict = {}
+
+    @staticmethod
+    def _contribution(record) -> tuple:
+        """Return the number of phones, email and birthday flags, number of notes and tags of the record."""
+        return (
+            len(record.phones),
+            bool(record.email),
+            bool(record.birthday),
+            len(record.notes),
+            tuple(str(tag) for note in record.notes for tag in note.tags),
+        )
+
+    def _apply(self, contribution: tuple, sign: int) -> None:
+        """Add (sign=1) or subtract (sign=-1) the contribution of a record."""
+        phones, has_email, has_birthday, notes, tags = contribution
+        self.contacts += sign
+        self.phones += sign * phones
+        self.without_phones += sign * (phones == 0)
+        self.without_emails += sign * (not has_email)
+        self.without_birthdays += sign * (not has_birthday)
+        self.notes += sign * notes
+        self.tags += sign * len(tags)
+        if sign > 0:
+            self.tag_counts.update(tags)
+        else:
+            self.tag_counts.subtract(tags)
+            for tag in tags:
+                if self.tag_counts[tag] <= 0:
+                    del self.tag_counts[tag]
+
+    def add(self, record) -> None:
+        """Add the record to the aggregates."""
+        contribution = self._contribution(record)
+        self._contributions[record] = contribution
+        self._apply(contribution, 1)
+
+    def remove(self, record) -> None:
+        """Remove the record from the aggregates."""
+        contribution = self._contributions.pop(record, None)
+        if contribution is not None:
+            self._apply(contribution, -1)
+
+    def update(self, record) -> None:
+        """Replace the old contribution of the changed record with the new one."""
+        self.remove(record)
+        self.add(record)
+
+    def top_tags(self, count: int = 5) -> list[tuple[str, int]]:
+        """
+        Return the most used tags.
+
+        Args:
+            count (int, optional): The number of tags. Defaults to 5.
+
+        Returns:
+            list: The (tag, number of uses) pairs, the most used first.
+        """
+        return self.tag_counts.most_common(count)
+
+    def as_dict(self, top: int = 5) -> dict:
+        """
+        Return the aggregates as a plain dictionary, e.g. for JSON output.
+
+        Args:
+            top (int, optional): The number of top tags to include. Defaults to 5.
+
+        Returns:
+            dict: The aggregates.
+        """
+        return {
+            "contacts": self.contacts,
+            "phones": self.phones,
+            "phones_per_contact": round(self.phones / self.contacts, 2) if self.contacts else 0,
+            "without_phones": self.without_phones,
+            "without_emails": self.without_emails,
+            "without_birthdays": self.without_birthdays,
+            "notes": self.notes,
+            "tags": self.tags,
+            "distinct_tags": len(self.tag_counts),
+            "top_tags": dict(self.top_tags(top)),
+        }
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(contacts={self.contacts}, notes={self.notes}, tags={self.tags})"
@@ -3,35 +3,40 @@ from .field import Field
 
 
 class Tag(Field):
-    """Class for storing contact names. Mandatory field."""
+    """A tag of notes; the address book shares one Tag per value, with its id in the book's TagRegistry."""
 
-    def __init__(self, value: str) -> None:
+    # Id in the TagRegistry of the address book, None for tags that are not registered
+    __slots__ = ("id",)
+
+    def __init__(self, value: str, tag_id: int = None) -> None:
         """Initialize the tag field with a value.
 
         Args:
             value (str): The value of the Tag field.
+            tag_id (int, optional): The id of the tag in the registry. Defaults to None.
 
         Raises:
             ValueError: If the value is empty.
         """
         if not value:
-            raise ValueError(f"{Fore.RED}Name field cannot be empty.{Style.RESET_ALL}")
+            raise ValueError(f"{Fore.RED}Tag field cannot be empty.{Style.RESET_ALL}")
         
         super().__init__(value)
-        
+        self.id = tag_id
+
     def __str__(self) -> str:
-        """Return a string representation of the Name field.
+        """Return a string representation of the Tag field.
 
         Returns:
-            str: The string representation of the Name field.
+            str: The string representation of the Tag field.
         """
         return str(self.value)
 
     def __repr__(self) -> str:
-        """Return a string representation of the Name field.
+        """Return a string representation of the Tag field.
 
         Returns:
-            str: The string representation of the Name field.
+            str: The string representation of the Tag field.
         """
         return f"{self.__class__.__name__}(value='{self.value}')"
 
@@ -0,0 +1,155 @@
+from typing import Union
+from colorama import Fore, Style
+from .tag import Tag
+
+
+class TagRegistry:
+    """Book-level registry that shares one Tag instance per tag value."""
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        # Position in the list is the tag id; ids of dropped tags stay empty until they are reused
+        self._tags: list[Union[Tag, None]] = []
+        self._free: list[int] = []
+        self._by_value: dict[str, Tag] = {}
+        self.clear()
+
+    def clear(self) -> None:
+        """Forget which records use the tags. The tags themselves are kept."""
+        # tag id -> records that use the tag
+        self._records: dict[int, set] = {}
+        # record -> ids of the tags it uses
+        self._record_tags: dict = {}
+
+    def intern(self, value) -> Tag:
+        """Return the shared tag for the value, registering it if needed.
+
+        Args:
+            value (Union[str, Tag]): The tag value or a tag that may not be registered yet.
+
+        Returns:
+            Tag: The shared tag instance.
+        """
+        value = str(value)
+        tag = self._by_value.get(value)
+        if tag is None:
+            if self._free:
+                tag = Tag(value, self._free.pop())
+                self._tags[tag.id] = tag
+            else:
+                tag = Tag(value, len(self._tags))
+                self._tags.append(tag)
+            self._by_value[value] = tag
+        return tag
+
+    def get(self, value: str) -> Union[Tag, None]:
+        """Return the shared tag for the value, or None if it is not registered."""
+        return self._by_value.get(value)
+
+    def __getitem__(self, tag_id: int) -> Tag:
+        """Return the tag with the given id.
+
+        Raises:
+            KeyError: If there is no tag with the id.
+        """
+        tag = self._tags[tag_id] if 0 <= tag_id < len(self._tags) else None
+        if tag is None:
+            raise KeyError(tag_id)
+        return tag
+
+    def records_with(self, tag: Tag) -> set:
+        """Return the records that have a note with the tag."""
+        return set(self._records.get(tag.id, ()))
+
+    def add(self, record) -> None:
+        """Replace the tags of the record notes with the shared instances and count their use."""
+        tag_ids = set()
+        for note in record.notes:
+            if any(tag is not self._by_value.get(str(tag)) for tag in note.tags):
+                note.tags = [self.intern(tag) for tag in note.tags]
+            tag_ids.update(tag.id for tag in note.tags)
+        for tag_id in tag_ids:
+            self._records.setdefault(tag_id, set()).add(record)
+        if tag_ids:
+            self._record_tags[record] = tag_ids
+
+    def remove(self, record) -> None:
+        """Stop counting the tags of the record. Tags nobody uses are dropped."""
+        for tag_id in self._record_tags.pop(record, ()):
+            self._release(tag_id, record)
+
+    def update(self, record) -> None:
+        """Count the tags of the changed record again."""
+        old_tag_ids = self._record_tags.pop(record, set())
+        self.add(record)
+        for tag_id in old_tag_ids - self._record_tags.get(record, set()):
+            self._release(tag_id, record)
+
+    def _release(self, tag_id: int, record) -> None:
+        """Remove the record from the users of the tag and drop the tag if nobody uses it."""
+        records = self._records[tag_id]
+        records.discard(record)
+        if not records:
+            del self._records[tag_id]
+            del self._by_value[self._tags[tag_id].value]
+            self._tags[tag_id] = None
+            self._free.append(tag_id)
+
+    def rename(self, old_value: str, new_value: str) -> set:
+        """Rename a tag in every note at once.
+
+        If a tag with the new value already exists, the two tags are merged.
+
+        Args:
+            old_value (str): The current tag value.
+            new_value (str): The new tag value.
+
+        Returns:
+            set: The records whose notes use the renamed tag.
+
+        Raises:
+            ValueError: If the tag is not found or the new value is empty.
+        """
+        tag = self._by_value.get(old_value)
+        if tag is None:
+            raise ValueError(f"{Fore.RED}Tag {old_value} not found.{Style.RESET_ALL}")
+        if not new_value:
+            raise ValueError(f"{Fore.RED}Tag name cannot be empty.{Style.RESET_ALL}")
+        records = self.records_with(tag)
+
+        target = self._by_value.get(new_value)
+        if target is None:
+            # Every note holds the shared instance, so changing its value renames it everywhere
+            del self._by_value[old_value]
+            tag.value = new_value
+            self._by_value[new_value] = tag
+        elif target is not tag:
+            # Merge into the existing tag, the old one is dropped when the records are counted again
+            for record in records:
+                for note in record.notes:
+                    if tag in note.tags:
+                        tags = [t for t in note.tags if t is not target]
+                        note.tags = [target if t is tag else t for t in tags]
+        return records
+
+    def __len__(self) -> int:
+        """Return the number of registered tags."""
+        return len(self._by_value)
+
+    def __iter__(self):
+        """Iterate over the registered tags."""
+        return iter(self._by_value.values())
+
+    def __getstate__(self) -> dict:
+        """Return the tags to pickle. Notes refer to the same instances, so each value is stored once."""
+        return {"tags": self._tags}
+
+    def __setstate__(self, state: dict) -> None:
+        """Restore the tags. Their use by records is counted again when the book links the records."""
+        self._tags = state.get("tags", [])
+        self._free = [tag_id for tag_id, tag in enumerate(self._tags) if tag is None]
+        self._by_value = {tag.value: tag for tag in self._tags if tag is not None}
+        self.clear()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(tags={len(self._by_value)})"
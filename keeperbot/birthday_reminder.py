@@ -0,0 +1,161 @@
+import os
+import subprocess
+import threading
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Union
+
+from colorama import Fore, Style
+
+
+def call_later_in_thread(delay: float, callback: Callable[[], None]) -> threading.Timer:
+    """
+    Run the callback after a delay in a daemon timer thread.
+
+    Args:
+        delay (float): The delay in seconds.
+        callback (Callable): The function to call.
+
+    Returns:
+        threading.Timer: The started timer; cancel() stops it.
+    """
+    timer = threading.Timer(delay, callback)
+    timer.daemon = True
+    timer.start()
+    return timer
+
+
+class BirthdayReminder:
+    """
+    Announces the birthdays of the day when the day starts.
+
+    The reminder sleeps until the next birthday on the timeline of the address
+    book instead of polling, and reschedules itself when a change moves the
+    next birthday. All birthdays of a day are announced in one notification.
+    """
+
+    def __init__(
+        self,
+        book,
+        notify: Callable[[date, list], None],
+        hook: str = None,
+        clock: Callable[[], datetime] = datetime.now,
+    ) -> None:
+        """
+        Initialize the reminder.
+
+        Args:
+            book (AddressBook): The address book to watch.
+            notify (Callable): Called with the day and the records that celebrate on it.
+            hook (str, optional): A shell command to run for each notification; it gets the
+                date in KEEPERBOT_BIRTHDAY_DATE and the names, one per line, in KEEPERBOT_BIRTHDAYS.
+            clock (Callable, optional): Returns the current local time. Defaults to datetime.now.
+        """
+        self.book = book
+        self.notify = notify
+        self.hook = hook
+        self.clock = clock
+        self.wake_at = None
+        self._call_later = None
+        self._handle = None
+        self._day = None
+        self._announced = set()
+        # The timer thread and the changes of the book may reschedule at the same time.
+        # Taken before the lock of the timeline, never while the timeline holds its own
+        self._lock = threading.RLock()
+
+    def start(self, call_later: Callable = None) -> None:
+        """
+        Start watching the book.
+
+        Args:
+            call_later (Callable, optional): Schedules a callback after a delay in seconds and
+                returns a handle with cancel(), e.g. loop.call_later. Defaults to a timer thread.
+        """
+        self._call_later = call_later or call_later_in_thread
+        self.book.birthday_timeline.listeners.append(self._changed)
+        self._schedule()
+
+    def stop(self) -> None:
+        """Stop watching the book and cancel the scheduled wake-up."""
+        listeners = self.book.birthday_timeline.listeners
+        if self._changed in listeners:
+            listeners.remove(self._changed)
+        with self._lock:
+            if self._handle is not None:
+                self._handle.cancel()
+                self._handle = None
+            self.wake_at = None
+
+    def announced(self, day: date = None) -> list:
+        """
+        Return the records whose birthday was announced on the day.
+
+        Args:
+            day (date, optional): The day. Defaults to today.
+
+        Returns:
+            list: The announced records.
+        """
+        day = day or self.clock().date()
+        return list(self._announced) if day == self._day else []
+
+    def _next_due(self, today: date) -> Union[date, None]:
+        """Return the next day with birthdays that were not announced yet."""
+        timeline = self.book.birthday_timeline
+        announced = self._announced if today == self._day else ()
+        if any(record not in announced for record in timeline.on(today)):
+            return today
+        return timeline.next_date(today + timedelta(days=1))
+
+    def _schedule(self) -> None:
+        """Schedule the wake-up at the start of the next day with birthdays."""
+        with self._lock:
+            if self._handle is not None:
+                self._handle.cancel()
+                self._handle = None
+            now = self.clock()
+            self.wake_at = self._next_due(now.date())
+            if self.wake_at is not None:
+                delay = (datetime.combine(self.wake_at, time()) - now).total_seconds()
+                self._handle = self._call_later(max(delay, 0), self._wake)
+
+    def _changed(self, keys: tuple) -> None:
+        """Reschedule if a changed birthday moved the next wake-up."""
+        with self._lock:
+            if self._call_later is not None and self._next_due(self.clock().date()) != self.wake_at:
+                self._schedule()
+
+    def _wake(self) -> None:
+        """Announce the due birthdays and sleep until the next ones."""
+        with self._lock:
+            self._handle = None
+            today = self.clock().date()
+            if today != self._day:
+                self._day = today
+                self._announced = set()
+            try:
+                due = [record for record in self.book.birthday_timeline.on(today) if record not in self._announced]
+                if due:
+                    self._announced.update(due)
+                    self.notify(today, due)
+                    self._run_hook(today, due)
+            finally:
+                # A failed notification must not end the reminders of the session
+                self._schedule()
+
+    def _run_hook(self, day: date, records: list) -> None:
+        """Start the hook command without waiting for it."""
+        if not self.hook:
+            return
+        env = {
+            **os.environ,
+            "KEEPERBOT_BIRTHDAY_DATE": day.isoformat(),
+            "KEEPERBOT_BIRTHDAYS": "\n".join(record.name.value for record in records),
+        }
+        try:
+            subprocess.Popen(self.hook, shell=True, env=env)
+        except OSError as e:
+            print(f"{Fore.RED}Could not run the birthday hook: {e}{Style.RESET_ALL}")
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(wake_at={self.wake_at}, announced={len(self._announced)})"
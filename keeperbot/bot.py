@@ -1,10 +1,17 @@
-﻿import pickle
+﻿import asyncio
+import json
+import os
+import pickle
+import time
+from contextlib import nullcontext
 from functools import wraps
+from itertools import chain, islice
 from typing import Union
 
 from colorama import Fore, Style, init
 from prompt_toolkit import PromptSession
-from prompt_toolkit.completion import NestedCompleter
+from prompt_toolkit.application import run_in_terminal
+from prompt_toolkit.completion import ThreadedCompleter
 from prompt_toolkit.formatted_text import ANSI
 from tabulate import tabulate
 
@@ -12,9 +19,33 @@ from keeperbot.AddressBook.record import Record
 from keeperbot.AddressBook.addressbook import AddressBook
 from keeperbot.AddressBook.birthday import Birthday
 from keeperbot.AddressBook.note import Note
+from keeperbot.AddressBook.phone import Phone
+from keeperbot.AddressBook.tag import Tag
 
+from keeperbot import __version__
+from keeperbot.birthday_reminder import BirthdayReminder
 from keeperbot.bot_cmd import BotCmd
-from keeperbot.helpers import Application, input_error, print_execution_time
+from keeperbot.bot_completer import BotCompleter
+from keeperbot.replay import SessionRecorder
+from keeperbot.helpers import (
+    Application, AsyncSaver, CommandProfiler, LatencyRecorder, MemoryProfiler, StreamingTable, census, input_error,
+    page_blocks, print_execution_time,
+)
+from keeperbot.helpers import tracing
+
+# Address book methods that get a trace span when tracing is enabled
+TRACED_BOOK_METHODS = (
+    "add_record", "delete", "find_phone", "find_contact", "find_contacts_by_field",
+    "get_upcoming_birthdays", "find_note_by_title", "find_note_owner", "domain_counts",
+    "search_notes", "find_notes_by_tag", "rename_tag", "complete", "find_duplicates",
+    "merge_records", "snapshot", "iter_records", "iter_find_contacts_by_field", "iter_find_notes_by_tag",
+)
+
+# Commands that inspect the session are not profiled, so 'profile top' shows the user's commands
+UNPROFILED_COMMANDS = (BotCmd.PROFILE_TOP, BotCmd.PERF, BotCmd.DEBUG_MEMORY)
+
+# Classes the memory of the address book is broken down by, see 'debug memory'
+MEMORY_CLASSES = (Record, Phone, Note, Tag, str)
 
 init(autoreset=True)
 
@@ -25,18 +56,63 @@ class Bot(Application):
     """
 
     contacts_info = None
-
-    def __init__(self, app_name, filename="addressbook.pkl"):
+    contacts_file = "addressbook.pkl"
+    # AsyncSaver while the asyncio REPL runs, saves are synchronous otherwise
+    saver = None
+    # Latency histograms per command and phase, see the 'perf' command
+    latency = LatencyRecorder()
+    # Tracemalloc snapshots after loading and after every command, see 'debug memory'
+    memory = MemoryProfiler()
+    # cProfile files per command with --profile, see 'profile top'
+    profiler = CommandProfiler()
+    page_size = 50
+
+    def __init__(
+        self, app_name, filename="addressbook.pkl", perf_file=None, record_file=None, memprofile=None, profile_dir=None
+    ):
         super().__init__(app_name)
+        self.perf_file = perf_file
+        if profile_dir:
+            Bot.profiler.enable(profile_dir)
+        self.memprofile = memprofile
+        if memprofile:
+            # Started before the book is loaded, so the allocations of the book are traced too
+            Bot.memory.start()
+        # Reads the answers to the questions of commands; the replay driver answers from a recording
+        self.answer_source = input
+        self.__recorder = SessionRecorder(record_file, filename) if record_file else None
+        if tracing.enabled():
+            # Patched only when tracing, so the book pays nothing otherwise
+            tracing.instrument(AddressBook, TRACED_BOOK_METHODS, prefix="book")
         self.__owner = None
+        self.__cursor = None
         self.filename = filename
-        self.book = Bot.__load_data(self.filename)
+        with Bot.profiler.profile("load", command=False):
+            self.book = Bot.__load_data(self.filename)
+        Bot.memory.snapshot("load")
+        # Opt-in parallel scan for unindexed searches on multi-core hosts
+        scan_workers = os.environ.get("KEEPERBOT_SCAN_WORKERS")
+        if scan_workers:
+            if scan_workers.isdigit() and int(scan_workers) > 0:
+                self.book.enable_parallel_scan(int(scan_workers))
+            else:
+                print(
+                    f"{Fore.YELLOW}Ignoring KEEPERBOT_SCAN_WORKERS={scan_workers!r}: "
+                    f"use a positive number of worker processes.{Style.RESET_ALL}"
+                )
 
         self.__session = PromptSession()
-        self.__completer_dict = BotCmd.create_completer_dict()
-        self.__completer = NestedCompleter.from_nested_dict(self.__completer_dict)
+        self.__tasks = set()
+        # Wakes up only when the next birthday is due; KEEPERBOT_BIRTHDAY_HOOK runs a command for it
+        self.__reminder = BirthdayReminder(
+            self.book, self.__birthdays_due, hook=os.environ.get("KEEPERBOT_BIRTHDAY_HOOK")
+        )
+        self.__reminder_lines = []
+        # Arguments are completed from the address book; in a thread, so typing never waits for it
+        self.__completer = ThreadedCompleter(BotCompleter(self.book))
 
         Bot.contacts_info = self.book
+        Bot.contacts_file = self.filename
 
     def get_bottom_toolbar(self):
         """
@@ -46,19 +122,45 @@ class Bot(Application):
         """
         text = self.__session.default_buffer.text.strip()
         parts = text.split()
-        # this function found in BotCmd.get_commands() command sequence and return format of command
+        birthdays = self.__reminder.announced()
+        badge = f"{Fore.MAGENTA}Birthdays today: {len(birthdays)} {Style.RESET_ALL}| " if birthdays else ""
+        # looks the command up in the compiled command trie and returns its format
         if parts:
             command_name = parts[0]
             command = BotCmd.get_command_format(command_name, parts[1:])
             if command:
-                return ANSI(f"{Fore.GREEN}Format: {command}{Style.RESET_ALL}")
+                return ANSI(f"{badge}{Fore.GREEN}Format: {command}{Style.RESET_ALL}")
 
         return ANSI(
-            f"{Fore.GREEN}Format: command [subcommand] [arguments]{Style.RESET_ALL}"
+            f"{badge}{Fore.GREEN}Format: command [subcommand] [arguments]{Style.RESET_ALL}"
         )
 
-    @staticmethod
-    def __confirm(message):
+    def __birthdays_due(self, day, records):
+        """
+        This function announces the birthdays of the day: in the toolbar and in a line above the prompt.
+        It may be called from the reminder timer thread.
+        Args:
+            day: the day of the birthdays.
+            records: the contacts that celebrate on the day.
+        """
+        names = ", ".join(record.name.value for record in records)
+        line = f"{Fore.MAGENTA}Birthday reminder ({day.strftime('%d.%m.%Y')}): {names}{Style.RESET_ALL}"
+        app = self.__session.app
+        if app.is_running and app.loop is not None:
+            app.loop.call_soon_threadsafe(lambda: run_in_terminal(lambda: print(line)))
+            app.invalidate()
+        else:
+            # A command is running, the line is printed before the next prompt
+            self.__reminder_lines.append(line)
+
+    def __print_reminders(self):
+        """
+        This function prints the birthday reminders that came while a command was running.
+        """
+        while self.__reminder_lines:
+            print(self.__reminder_lines.pop(0))
+
+    def __confirm(self, message):
         """
         This function asks the user for confirmation.
         Args:
@@ -67,15 +169,35 @@ class Bot(Application):
             bool: True if the user confirms, False otherwise.
         """
         print(f"{Fore.YELLOW}{message}")
-        user_input = input("Enter 'yes' to confirm: ")
+        user_input = self.ask("Enter 'yes' to confirm: ")
         return user_input.strip().lower() == "yes"
 
+    def ask(self, prompt=""):
+        """
+        This function reads the answer to a question of a command.
+        The time spent waiting for the user is measured separately from the command.
+        Args:
+            prompt: the question to display.
+        Return:
+            str: the answer.
+        """
+        with Bot.latency.measure("wait"):
+            answer = self.answer_source(prompt)
+        if self.__recorder is not None:
+            self.__recorder.answer(prompt, answer)
+        return answer
+
     @staticmethod
     def data_saver(func):
         @wraps(func)
         def inner(*args, **kwargs):
             result = func(*args, **kwargs)
-            Bot.__save_data(Bot.contacts_info)
+            with Bot.latency.measure("save"):
+                if Bot.saver is not None:
+                    # Asyncio REPL: the write happens in the background and bursts are coalesced
+                    Bot.saver.schedule()
+                else:
+                    Bot.__save_data(Bot.contacts_info, Bot.contacts_file)
 
             return result
 
@@ -119,7 +241,7 @@ class Bot(Application):
                         record.add_phone(temp_phone)
                         break
                     except ValueError as e:
-                        temp_phone = input(f"{Fore.RED}{e}{Style.RESET_ALL}\nPlease enter a valid phone number or type 'skip' to exit: ")
+                        temp_phone = self.ask(f"{Fore.RED}{e}{Style.RESET_ALL}\nPlease enter a valid phone number or type 'skip' to exit: ")
 
             result = add_phone(phone)
             if result:
@@ -129,36 +251,129 @@ class Bot(Application):
 
         return message
 
-    def show_all(self):
+    @input_error
+    def show_all(self, args):
         """This function displays all contacts.
+        Args:
+            args: list of command arguments.
         Return:
             str: list of contacts.
         """
-        if self.book.data:
-            self.book.data = dict(sorted(self.book.data.items()))
-        return Bot.__build_table_for_records(self.book.values())
+        args, limit, page = Bot.__parse_page_options(args)
+        if args:
+            raise ValueError(
+                f"{Fore.RED}Invalid format. Use: show all [--limit N] [--page N]{Style.RESET_ALL}"
+            )
+        table = self.__show_page(
+            self.book.iter_records,
+            lambda record: record.name.value,
+            Bot.__stream_records,
+            limit,
+            page,
+        )
+        return Bot.__build_table_for_records([]) if table is None else table
+
+    @staticmethod
+    def __parse_page_options(args):
+        """
+        This function extracts the pagination options from the command arguments.
+        Args:
+            args: list of command arguments.
+        Return:
+            tuple: the remaining arguments, the page size and the page number.
+        """
+        options = {"--limit": Bot.page_size, "--page": 1}
+        rest = []
+        args = iter(args)
+        for arg in args:
+            if arg not in options:
+                rest.append(arg)
+                continue
+            value = next(args, "")
+            if not value.isdigit() or int(value) < 1:
+                raise ValueError(
+                    f"{Fore.RED}Invalid value for {arg}. Use a positive number.{Style.RESET_ALL}"
+                )
+            options[arg] = int(value)
+        return rest, options["--limit"], options["--page"]
+
+    def __show_page(self, fetch, key, render, limit, page=1):
+        """
+        This function prints one page of results and remembers the cursor for 'show more'.
+        Args:
+            fetch: callable that takes the cursor and returns an iterator of results.
+            key: callable that returns the cursor of a result.
+            render: callable that streams the table blocks for an iterator of results.
+            limit: number of results per page.
+            page: number of the page to show.
+        Return:
+            str: hint about the next page (empty if there is none) or None if the page is empty.
+        """
+        items = fetch(None)
+        after = None
+        for item in islice(items, (page - 1) * limit):
+            after = key(item)
+        return self.__render_page(items, fetch, key, render, limit, after)
+
+    def __render_page(self, items, fetch, key, render, limit, after=None):
+        """
+        This function streams up to limit results into the pager, so the first screen is shown
+        before the rest of the page is fetched. If the pager is stopped, 'show more' continues
+        after the last result on the screen, or from the start of the page (the after cursor)
+        if no result was shown.
+        """
+        items = iter(items)
+        first = next(items, None)
+        if first is None:
+            self.__cursor = None
+            return None
+
+        fetched = []
+
+        def rows():
+            for item in islice(chain([first], items), limit):
+                fetched.append(item)
+                yield item
+
+        # The first block is the header, the rest are rows and the bottom border
+        with tracing.span("render.page", limit=limit) as page:
+            shown = min(max(page_blocks(render(rows()), ask=self.ask) - 1, 0), len(fetched))
+            page.set(rows=shown, fetched=len(fetched))
+        has_more = shown < len(fetched) or (len(fetched) == limit and next(items, None) is not None)
+        if not shown:
+            # Stopped at the header: the page is shown again from its start
+            self.__cursor = (fetch, after, key, render, limit)
+        else:
+            self.__cursor = (fetch, key(fetched[shown - 1]), key, render, limit) if has_more else None
+        if self.__cursor is not None:
+            return f"{Fore.YELLOW}Type 'show more' to see the next page.{Style.RESET_ALL}"
+        return ""
+
+    def show_more(self):
+        """
+        This function displays the next page of the last listing or search.
+        Return:
+            str: table with the next page of results.
+        """
+        if self.__cursor is None:
+            return f"{Fore.YELLOW}Nothing more to show.{Style.RESET_ALL}"
+        fetch, after, key, render, limit = self.__cursor
+        table = self.__render_page(fetch(after), fetch, key, render, limit, after)
+        return f"{Fore.YELLOW}Nothing more to show.{Style.RESET_ALL}" if table is None else table
 
     @staticmethod
     def __build_table_for_records(records):
         if not records:
             return "No contacts found."
+        return "\n".join(Bot.__stream_records(records))
 
-        table_data = [
-            [
-                record.name,
-                ", ".join(str(phone) for phone in record.phones),
-                record.email,
-                record.birthday,
-                record.address,
-                ", ".join(note.title for note in record.notes),
-                ", ".join(
-                    ", ".join(str(tag) for tag in note.tags) for note in record.notes
-                ),
-                "+" if record.owner else "",
-            ]
-            for record in records
-        ]
-
+    @staticmethod
+    def __stream_records(records):
+        """
+        This function streams the table of contacts block by block.
+        Args:
+            records: iterable of records.
+        """
         headers = [
             "Name",
             "Phone",
@@ -170,7 +385,8 @@ class Bot(Application):
             "Owner",
         ]
 
-        return tabulate(table_data, headers, tablefmt="fancy_grid")
+        # Rows are cached by the records until they are modified
+        return StreamingTable(headers).render(record.table_row() for record in records)
 
     @input_error
     def show_phones(self, args):
@@ -200,6 +416,19 @@ class Bot(Application):
         else:
             raise KeyError(f"{Fore.RED}Contact {name} not found.{Style.RESET_ALL}")
 
+    def show_domains(self):
+        """This function displays the number of contacts per email domain.
+        Return:
+            str: table of domains.
+        """
+        counts = self.book.domain_counts()
+        if not counts:
+            return "No emails found."
+
+        table_data = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+        headers = ["Domain", "Contacts"]
+        return tabulate(table_data, headers, tablefmt="fancy_grid")
+
     @data_saver
     @input_error
     def add_birthday(self, args):
@@ -288,8 +517,10 @@ class Bot(Application):
             None
         """
 
-        with open(filename, "wb") as f:
-            pickle.dump(book, f)
+        with tracing.span("save", file=filename, records=len(book)) as span:
+            with open(filename, "wb") as f:
+                pickle.dump(book, f)
+                span.set(bytes=f.tell())
 
     @staticmethod
     def __load_data(filename: str) -> AddressBook:
@@ -300,23 +531,27 @@ class Bot(Application):
         Returns:
             AddressBook: The loaded book data.
         """
-        try:
-            with open(filename, "rb") as f:
-                return pickle.load(f)
-        except FileNotFoundError:
-            return AddressBook()
+        with tracing.span("load", file=filename) as span:
+            try:
+                with open(filename, "rb") as f:
+                    book = pickle.load(f)
+                    span.set(bytes=f.tell())
+            except FileNotFoundError:
+                book = AddressBook()
+            span.set(records=len(book))
+            return book
 
     @data_saver
     @input_error
     def add_owner(self):
         print("Let's start by recording your personal details.", end="\n\n")
 
-        res = input(
+        res = self.ask(
             f"Record your data: {Fore.GREEN}Yes{Style.RESET_ALL}/{Fore.RED}No{Style.RESET_ALL} "
         )
 
         if res.lower() == "Yes".lower():
-            name = input("Your name: ")
+            name = self.ask("Your name: ")
 
             record = Record(name)
             record.check_owner()
@@ -324,7 +559,7 @@ class Bot(Application):
             self.book.add_record(record)
 
             def add_owner_phone():
-                telephone = input(
+                telephone = self.ask(
                     f"{Fore.CYAN}{name}{Style.RESET_ALL}, please enter your phone: "
                 )
 
@@ -391,19 +626,25 @@ class Bot(Application):
         and then performs the search based on the provided criteria.
         """
         # Proceed with the search using the provided or collected args
+        args, limit, page = Bot.__parse_page_options(args)
         if len(args) < 2:
             raise ValueError(
-                f"{Fore.RED}Invalid format. Use: search-by [field] [value]{Style.RESET_ALL}"
+                f"{Fore.RED}Invalid format. Use: search-by [field] [value] [--limit N] [--page N]{Style.RESET_ALL}"
             )
 
         field = args[0]
         value = " ".join(args[1:])
-        # Assuming AddressBook has a method find_contacts_by_field
-        records = self.book.find_contacts_by_field(field, value)
+        # Assuming AddressBook has a method iter_find_contacts_by_field
+        table = self.__show_page(
+            lambda after: self.book.iter_find_contacts_by_field(field, value, after),
+            lambda record: record.name.value,
+            Bot.__stream_records,
+            limit,
+            page,
+        )
 
-        if records:
-            print(f"{Bot.__build_table_for_records(records)}")
-            return ""
+        if table is not None:
+            return table
         else:
             raise KeyError(
                 f"{Fore.RED}No contacts found for the specified {field}.{Style.RESET_ALL}"
@@ -423,11 +664,11 @@ class Bot(Application):
 
         record = self.book.find_contact(contact_name)
         if record:
-            title = input("Enter note title: ")
+            title = self.ask("Enter note title: ")
             if not title:
                 return None
 
-            note = input("Enter note content: \n")
+            note = self.ask("Enter note content: \n")
             record.add_note(title, note)
 
             return f"Note for {contact_name} added."
@@ -458,12 +699,12 @@ class Bot(Application):
 
             def get_new_value(title=None):
                 if not title:
-                    title = input("Enter new note title: \n")
+                    title = self.ask("Enter new note title: \n")
                     if not title:
                         print(f"{Fore.RED}Title cannot be empty. {Style.RESET_ALL}")
                         return get_new_value()
 
-                new_value = input("Enter new note content: \n")
+                new_value = self.ask("Enter new note content: \n")
                 return Note(title, new_value)
 
             new_note = get_new_value()
@@ -504,10 +745,10 @@ class Bot(Application):
             )
         note_title = " ".join(args)
 
-        note = self.book.find_note_by_title(note_title)
-        if note:
-            tags = input("Enter tags separated by space: ").split()
-            note.tags = note.tags + tags
+        record = self.book.find_note_owner(note_title)
+        if record:
+            tags = self.ask("Enter tags separated by space: ").split()
+            record.add_tag_to_note_by_title(note_title, tags)
             return f"Tags added to {note_title}."
         else:
 
@@ -526,28 +767,75 @@ class Bot(Application):
         tag, *note_title = args
         note_title = " ".join(note_title)
 
-        note = self.book.find_note_by_title(note_title)
-        if note:
-            note.tags = [t for t in note.tags if t != tag]
+        record = self.book.find_note_owner(note_title)
+        if record:
+            record.remove_tag_from_note_by_title(note_title, tag)
             return f"Tag {tag} deleted from {note_title}."
         else:
             raise KeyError(f"{Fore.RED}Note {note_title} not found. {Style.RESET_ALL}")
 
+    @data_saver
+    @input_error
+    def edit_tag(self, args):
+        """
+        This function renames a tag in all notes.
+        """
+        if len(args) != 2:
+            raise ValueError(
+                f"{Fore.RED}Invalid format. Use: edit tag [old tag] [new tag]{Style.RESET_ALL}"
+            )
+        old_tag, new_tag = args
+        count = self.book.rename_tag(old_tag, new_tag)
+        return f"Tag {old_tag} renamed to {new_tag} for {count} contact(s)."
+
     @input_error
     def get_notes_by_tag(self, args):
         """
         This function finds all notes with specified tag.
         """
 
+        args, limit, page = Bot.__parse_page_options(args)
         if len(args) != 1:
             raise ValueError(
-                f"{Fore.RED}Invalid format. Use: get-notes-by-tag [tag]{Style.RESET_ALL}"
+                f"{Fore.RED}Invalid format. Use: find notes-by-tag [tag] [--limit N] [--page N]{Style.RESET_ALL}"
             )
         tag, *_ = args
 
-        notes = self.book.find_notes_by_tag(tag)
-        if notes:
-            return Bot.__build_table_for_notes(notes)
+        notes = self.__show_page(
+            lambda after: self.book.iter_find_notes_by_tag(tag, after),
+            lambda item: (item[0].name.value, item[1].title),
+            lambda items: Bot.__stream_notes(note for _, note in items),
+            limit,
+            page,
+        )
+        if notes is not None:
+            return notes
+        else:
+            raise KeyError(f"{Fore.RED}Notes not found. {Style.RESET_ALL}")
+
+    @input_error
+    def find_notes(self, args):
+        """
+        This function finds notes by words in their title, content and tags, best matches first.
+        """
+        args, limit, page = Bot.__parse_page_options(args)
+        if len(args) < 1:
+            raise ValueError(
+                f"{Fore.RED}Invalid format. Use: find notes [query] [--limit N] [--page N]{Style.RESET_ALL}"
+            )
+        query = " ".join(args)
+
+        notes = self.__show_page(
+            lambda after: islice(
+                enumerate(self.book.search_notes(query)), 0 if after is None else after + 1, None
+            ),
+            lambda item: item[0],
+            lambda items: Bot.__stream_notes(note for _, (_, note) in items),
+            limit,
+            page,
+        )
+        if notes is not None:
+            return notes
         else:
             raise KeyError(f"{Fore.RED}Notes not found. {Style.RESET_ALL}")
 
@@ -593,14 +881,23 @@ class Bot(Application):
         Args:
             notes: list of notes.
         """
-        table_data = [
+        return "\n".join(Bot.__stream_notes(notes))
+
+    @staticmethod
+    def __stream_notes(notes):
+        """
+        This function streams the table of notes block by block.
+        Args:
+            notes: iterable of notes.
+        """
+        table_data = (
             [note.title, ", ".join(str(tag) for tag in note.tags), note.value]
             for note in notes
-        ]
+        )
 
         headers = ["Title", "Tags", "Note"]
 
-        return tabulate(table_data, headers, tablefmt="fancy_grid")
+        return StreamingTable(headers).render(table_data)
 
     @data_saver
     @input_error
@@ -717,6 +1014,249 @@ class Bot(Application):
         else:
             return f"Contact with name {name} not found"
 
+    @data_saver
+    @input_error
+    def dedupe(self, args):
+        """
+        This function finds duplicate contacts and merges each group after confirmation.
+        Args:
+            args: list of command arguments
+        """
+        if args:
+            raise ValueError(f"{Fore.RED}Invalid format. Use: dedupe{Style.RESET_ALL}")
+
+        clusters = self.book.find_duplicates()
+        if not clusters:
+            return "No duplicate contacts found."
+
+        headers = ["Name", "Phone", "Email", "Notes"]
+        kept = []
+        for number, cluster in enumerate(clusters, start=1):
+            table_data = [
+                [record.name, ", ".join(str(phone) for phone in record.phones), record.email, len(record.notes)]
+                for record in cluster
+            ]
+            print(f"Group {number} of {len(clusters)}:")
+            print(tabulate(table_data, headers, tablefmt="fancy_grid"))
+            if self.__confirm("Merge these contacts into one?"):
+                kept.append(self.book.merge_records(cluster))
+
+        if not kept:
+            return f"{Fore.YELLOW}No contacts merged.{Style.RESET_ALL}"
+        return f"Merged into: {', '.join(str(record.name) for record in kept)}."
+
+    @input_error
+    def stats(self, args):
+        """
+        This function displays the address book statistics.
+        Args:
+            args: list of command arguments
+        """
+        if args not in ([], ["--json"]):
+            raise ValueError(f"{Fore.RED}Invalid format. Use: stats [--json]{Style.RESET_ALL}")
+
+        stats = self.book.stats.as_dict()
+        stats["storage_bytes"] = os.path.getsize(self.filename) if os.path.exists(self.filename) else 0
+        if args:
+            return json.dumps(stats)
+
+        top_tags = ", ".join(f"{tag} ({count})" for tag, count in stats.pop("top_tags").items())
+        table_data = [[key.replace("_", " ").capitalize(), value] for key, value in stats.items()]
+        table_data.append(["Top tags", top_tags])
+        return tabulate(table_data, tablefmt="fancy_grid")
+
+    @input_error
+    def export(self, args):
+        """
+        This function exports all contacts to a CSV file.
+        Args:
+            args: list of command arguments
+        """
+        if len(args) != 1:
+            raise ValueError(f"{Fore.RED}Invalid format. Use: export [file name]{Style.RESET_ALL}")
+        filename = args[0]
+        try:
+            count = self.book.snapshot().export_csv(filename)
+        except OSError as e:
+            raise ValueError(f"{Fore.RED}Could not write {filename}: {e.strerror or e}{Style.RESET_ALL}")
+        return f"{count} contact(s) exported to {filename}."
+
+    @input_error
+    def perf(self, args):
+        """
+        This function displays the latency percentiles of the commands run in this session.
+        Args:
+            args: list of command arguments
+        """
+        if args not in ([], ["--json"]):
+            raise ValueError(f"{Fore.RED}Invalid format. Use: perf [--json]{Style.RESET_ALL}")
+        if args:
+            return json.dumps(Bot.latency.as_dict())
+
+        rows = Bot.latency.rows()
+        if not rows:
+            return "No commands measured yet."
+        headers = ["Command", "Phase", "Count", "p50, ms", "p95, ms", "p99, ms", "Max, ms"]
+        return tabulate(rows, headers, tablefmt="fancy_grid")
+
+    @input_error
+    def debug_memory(self, args):
+        """
+        This function displays the memory of the address book by class and the allocations
+        that changed since the book was loaded and since the previous 'debug memory'.
+        '--stop' stops tracing the allocations.
+        Args:
+            args: list of command arguments
+        """
+        if args == ["--stop"]:
+            if not Bot.memory.tracing:
+                return f"{Fore.YELLOW}Allocations are not traced.{Style.RESET_ALL}"
+            Bot.memory.stop()
+            return "Allocation tracing stopped."
+        as_json = "--json" in args
+        args = [arg for arg in args if arg != "--json"]
+        if args and (len(args) != 2 or args[0] != "--top" or not args[1].isdigit() or int(args[1]) < 1):
+            raise ValueError(
+                f"{Fore.RED}Invalid format. Use: debug memory [--top N] [--json] or debug memory --stop"
+                f"{Style.RESET_ALL}"
+            )
+        top = int(args[1]) if args else 10
+
+        counts = census(self.book, MEMORY_CLASSES)
+        started = not Bot.memory.tracing
+        if started:
+            # Without --memprofile tracing starts now; this snapshot is the baseline of later calls
+            Bot.memory.start()
+        Bot.memory.snapshot("debug memory")
+        history = list(Bot.memory.history)
+        growth = Bot.memory.diff("baseline", top)
+        recent = Bot.memory.diff("previous", top)
+        if as_json:
+            return json.dumps({
+                "census": counts,
+                "baseline": history[0],
+                "current": history[-1],
+                "growth": growth,
+                "since_previous": recent,
+            })
+
+        table_data = [
+            [
+                name, info["count"], round(info["bytes"] / 1024, 1),
+                "-" if info["alive"] is None else info["alive"],
+                "-" if info["alive"] is None else info["alive"] - info["count"],
+            ]
+            for name, info in counts.items()
+        ]
+        lines = [tabulate(table_data, ["Class", "In book", "Size, KiB", "Alive", "Not in book"], tablefmt="fancy_grid")]
+        if started:
+            lines.append("Allocation tracing started; run commands and 'debug memory' again to see what grew.")
+            return "\n".join(lines)
+
+        first, last = history[0], history[-1]
+        lines.append(
+            f"Traced: {last['current'] / 2 ** 20:.1f} MiB, peak {last['peak'] / 2 ** 20:.1f} MiB, "
+            f"{(last['current'] - first['current']) / 2 ** 20:+.2f} MiB since {first['label']} "
+            f"({len(history) - 1} point(s) later)"
+        )
+        headers = ["Allocated at", "Change, KiB", "Blocks", "Size, KiB"]
+        for title, rows in (
+            (f"Changed since {first['label']}:", growth), ("Changed since the previous 'debug memory':", recent)
+        ):
+            if rows:
+                lines.append(title)
+                lines.append(tabulate(
+                    [[location, round(size_diff / 1024, 1), count_diff, round(size / 1024, 1)]
+                     for location, size_diff, count_diff, size in rows],
+                    headers, tablefmt="fancy_grid",
+                ))
+        return "\n".join(lines)
+
+    @input_error
+    def profile_top(self, args):
+        """
+        This function displays the hottest functions of the last profiled commands.
+        Args:
+            args: list of command arguments
+        """
+        if len(args) > 1 or (args and (not args[0].isdigit() or int(args[0]) < 1)):
+            raise ValueError(f"{Fore.RED}Invalid format. Use: profile top [N]{Style.RESET_ALL}")
+        if not Bot.profiler.enabled:
+            return "Profiling is off. Start the bot with --profile DIR to profile every command."
+        commands, rows = Bot.profiler.top(int(args[0]) if args else 5)
+        if not rows:
+            return "No commands profiled yet."
+        table_data = [[function, calls, round(own, 3), round(cumulative, 3)] for function, calls, own, cumulative in rows]
+        return (
+            f"Hottest functions of the last {len(commands)} command(s): {', '.join(commands)}\n"
+            f"Profiles in {Bot.profiler.directory}\n"
+            + tabulate(table_data, ["Function", "Calls", "Own, ms", "Cumulative, ms"], tablefmt="fancy_grid")
+        )
+
+    def __greet(self, args):
+        return f"{Fore.GREEN} Hi {self.__owner.name if self.__owner else ''}! How can I help you?"
+
+    def __farewell(self, args):
+        return f"{Fore.YELLOW}Good bye{' ' + str(self.__owner.name) if self.__owner else ''}!{Style.RESET_ALL}"
+
+    # BotCmd -> (handler, color of the printed result); None if the handler prints by itself
+    __handlers = {
+        BotCmd.HELLO: (__greet, ""),
+        BotCmd.HELP: (lambda self, args: BotCmd.show_help(), None),
+        BotCmd.CLOSE: (__farewell, ""),
+        BotCmd.EXIT: (__farewell, ""),
+        BotCmd.ADD_CONTACT: (add_contact, Fore.GREEN),
+        BotCmd.ADD_EMAIL: (add_email, Fore.GREEN),
+        BotCmd.ADD_ADDRESS: (add_address, Fore.GREEN),
+        BotCmd.ADD_BIRTHDAY: (add_birthday, Fore.GREEN),
+        BotCmd.ADD_NOTE: (add_note, Fore.GREEN),
+        BotCmd.ADD_TAG: (add_tags, Fore.GREEN),
+
+        BotCmd.SHOW_ALL_CONTACTS: (show_all, ""),
+        BotCmd.SHOW_BIRTHDAY: (show_birthday, None),
+        BotCmd.SHOW_BIRTHDAYS: (show_birthdays, None),
+        BotCmd.SHOW_PHONES: (show_phones, Fore.GREEN),
+        BotCmd.SHOW_NOTES: (get_notes, ""),
+        BotCmd.SHOW_DOMAINS: (lambda self, args: self.show_domains(), ""),
+        BotCmd.SHOW_MORE: (lambda self, args: self.show_more(), ""),
+
+        BotCmd.EDIT_INFO: (edit_contact_info, Fore.GREEN),
+        BotCmd.EDIT_PHONE: (edit_contact_phone, Fore.GREEN),
+        BotCmd.EDIT_NOTE: (edit_note, Fore.GREEN),
+        BotCmd.EDIT_TAG: (edit_tag, Fore.GREEN),
+
+        BotCmd.DELETE_CONTACT: (delete_contact, Fore.GREEN),
+        BotCmd.DELETE_PHONE: (delete_contact_phone, Fore.GREEN),
+        BotCmd.DELETE_INFO: (delete_contact_info, Fore.GREEN),
+        BotCmd.DELETE_NOTE: (delete_note, Fore.GREEN),
+        BotCmd.DELETE_TAG: (delete_tag, Fore.GREEN),
+
+        BotCmd.FIND_NOTES: (find_notes, ""),
+        BotCmd.FIND_NOTES_BY_TAG: (get_notes_by_tag, ""),
+        BotCmd.FIND_NOTES_BY_TITLE: (get_note_by_title, Fore.GREEN),
+
+        **{
+            command: (lambda self, args, field=command.get_command_name(): self.search_by([field, *args]), Fore.GREEN)
+            for command in (
+                BotCmd.SEARCH_BY_ALL,
+                BotCmd.SEARCH_BY_NAME,
+                BotCmd.SEARCH_BY_PHONE,
+                BotCmd.SEARCH_BY_EMAIL,
+                BotCmd.SEARCH_BY_ADDRESS,
+                BotCmd.SEARCH_BY_BIRTHDAY,
+                BotCmd.SEARCH_BY_NOTE,
+                BotCmd.SEARCH_BY_TAG,
+            )
+        },
+
+        BotCmd.STATS: (stats, ""),
+        BotCmd.PERF: (perf, ""),
+        BotCmd.DEBUG_MEMORY: (debug_memory, ""),
+        BotCmd.PROFILE_TOP: (profile_top, ""),
+        BotCmd.EXPORT: (export, Fore.GREEN),
+        BotCmd.DEDUPE: (dedupe, Fore.GREEN),
+    }
+
     def handle_command(self, command: BotCmd, args) -> bool:
         """
         This function handles the user command.
@@ -726,85 +1266,27 @@ class Bot(Application):
         Return:
             bool: True if the command was handled successfully, False otherwise.
         """
-        match command:
-            case BotCmd.HELLO:
-                print(
-                    f"{Fore.GREEN} Hi {self.__owner.name if self.__owner else ''}! How can I help you?"
-                )
-            case BotCmd.HELP:
-                BotCmd.show_help()
-            case BotCmd.CLOSE | BotCmd.EXIT:
-                print(
-                    f"{Fore.YELLOW}Good bye{' ' + str(self.__owner.name) if self.__owner else ''}!{Style.RESET_ALL}"
-                )
-                return False
-            case BotCmd.ADD_CONTACT:
-                print(f"{Fore.GREEN}{self.add_contact(args)}")
-            case BotCmd.ADD_EMAIL:
-                print(f"{Fore.GREEN}{self.add_email(args)}")
-            case BotCmd.ADD_ADDRESS:
-                print(f"{Fore.GREEN}{self.add_address(args)}")
-            case BotCmd.ADD_BIRTHDAY:
-                print(f"{Fore.GREEN}{self.add_birthday(args)}")
-            case BotCmd.ADD_NOTE:
-                print(f"{Fore.GREEN}{self.add_note(args)}")
-            case BotCmd.ADD_TAG:
-                print(f"{Fore.GREEN}{self.add_tags(args)}")
-
-            case BotCmd.SHOW_ALL_CONTACTS:
-                print(self.show_all())
-            case BotCmd.SHOW_BIRTHDAY:
-                self.show_birthday(args)
-            case BotCmd.SHOW_BIRTHDAYS:
-                self.show_birthdays(args)
-            case BotCmd.SHOW_PHONES:
-                print(f"{Fore.GREEN}{self.show_phones(args)}")
-            case BotCmd.SHOW_NOTES:
-                print(f"{self.get_notes(args)}")
-
-            case BotCmd.EDIT_INFO:
-                print(f"{Fore.GREEN}{self.edit_contact_info(args)}")
-            case BotCmd.EDIT_PHONE:
-                print(f"{Fore.GREEN}{self.edit_contact_phone(args)}")
-            case BotCmd.EDIT_NOTE:
-                print(f"{Fore.GREEN}{self.edit_note(args)}")
-
-            case BotCmd.DELETE_CONTACT:
-                print(f"{Fore.GREEN}{self.delete_contact(args)}")
-            case BotCmd.DELETE_PHONE:
-                print(f"{Fore.GREEN}{self.delete_contact_phone(args)}")
-            case BotCmd.DELETE_INFO:
-                print(f"{Fore.GREEN}{self.delete_contact_info(args)}")
-            case BotCmd.DELETE_NOTE:
-                print(f"{Fore.GREEN}{self.delete_note(args)}")
-            case BotCmd.DELETE_TAG:
-                print(f"{Fore.GREEN}{self.delete_tag(args)}")
-
-            case BotCmd.FIND_NOTES_BY_TAG:
-                print(f"{self.get_notes_by_tag(args)}")
-            case BotCmd.FIND_NOTES_BY_TITLE:
-                print(f"{Fore.GREEN}{self.get_note_by_title(args)}")
-
-            case (
-                BotCmd.SEARCH_BY_ALL
-                | BotCmd.SEARCH_BY_NAME
-                | BotCmd.SEARCH_BY_PHONE
-                | BotCmd.SEARCH_BY_EMAIL
-                | BotCmd.SEARCH_BY_ADDRESS
-                | BotCmd.SEARCH_BY_BIRTHDAY
-                | BotCmd.SEARCH_BY_NOTE
-                | BotCmd.SEARCH_BY_TAG
-            ):
-                args = [command.get_command_name(), *args]
-                print(f"{Fore.GREEN}{self.search_by(args)}")
-
-        return True
+        handler, color = self.__handlers.get(command, (None, None))
+        if handler is not None:
+            profile = nullcontext() if command in UNPROFILED_COMMANDS else Bot.profiler.profile(str(command))
+            with profile:
+                with Bot.latency.measure("handler"):
+                    result = handler(self, args)
+                if color is not None:
+                    with Bot.latency.measure("render"), tracing.span("render"):
+                        print(f"{color}{result}")
+        return command not in (BotCmd.CLOSE, BotCmd.EXIT)
+
+    def __start(self):
+        """
+        This function greets the user and asks for the owner details on the first start.
+        """
+        with Bot.profiler.profile("startup", command=False):
+            self.__greet_owner()
 
-    @data_saver
-    @print_execution_time
-    def run(self):
+    def __greet_owner(self):
         """
-        This function runs the application.
+        This function shows the help and the book size and greets the owner, recording the owner first if needed.
         """
         BotCmd.show_help()
 
@@ -821,42 +1303,145 @@ class Bot(Application):
             )
         print(f"How can I help you today?")
 
-        # get all commands for loop usage
-        commands = BotCmd.get_commands()
+    def execute(self, user_input: str) -> bool:
+        """
+        This function resolves and executes one line of user input.
+        Args:
+            user_input: the entered line.
+        Return:
+            bool: False if the user asked to exit, True otherwise.
+        """
+        start = time.perf_counter_ns()
+        parts = user_input.split()
+        if not parts:
+            return True
+        if self.__recorder is not None:
+            self.__recorder.command(user_input)
+
+        node, args = BotCmd.resolve(parts)
+        if node is None:
+            print(f"{Fore.RED}Unknown command: {parts[0]}")
+        elif node.id is not None:
+            Bot.latency.command = str(node.id)
+            Bot.latency.record(Bot.latency.command, "parse", time.perf_counter_ns() - start)
+            try:
+                with tracing.span("command", command=Bot.latency.command, args=len(args)):
+                    return self.handle_command(node.id, args)
+            finally:
+                Bot.memory.record(Bot.latency.command)
+                Bot.latency.record(Bot.latency.command, "total", time.perf_counter_ns() - start)
+                Bot.latency.command = "-"
+        else:
+            print(f"{Fore.RED}{node.name} {node.format}")
+        return True
 
-        while True:
-            user_input = self.__session.prompt(
-                "> ", completer=self.__completer, bottom_toolbar=self.get_bottom_toolbar
-            )
-            parts = user_input.split()
-            if not parts:
-                continue
+    @data_saver
+    @print_execution_time
+    def run(self):
+        """
+        This function runs the application.
+        """
+        self.__start()
+        self.__reminder.start()
+        try:
+            while True:
+                self.__print_reminders()
+                user_input = self.__session.prompt(
+                    "> ", completer=self.__completer, bottom_toolbar=self.get_bottom_toolbar
+                )
+                if not self.execute(user_input):
+                    break
+        finally:
+            self.__reminder.stop()
+            self.book.disable_parallel_scan()
+            self.__dump_latency()
+            self.__dump_memory()
+            if self.__recorder is not None:
+                self.__recorder.close()
+
+    def spawn(self, coro) -> asyncio.Task:
+        """
+        This function runs a coroutine in the background of the asyncio REPL.
+        The task is cancelled when the application exits.
+        Args:
+            coro: the coroutine to run.
+        Return:
+            asyncio.Task: the started task.
+        """
+        task = asyncio.get_running_loop().create_task(coro)
+        self.__tasks.add(task)
+        task.add_done_callback(self.__tasks.discard)
+        return task
 
-            command = parts[0]
-            args = parts[1:]
-
-            if command in commands:
-                cmd_details = commands[command]
-                if (
-                    "subcommands" in cmd_details
-                    and args
-                    and args[0] in cmd_details["subcommands"]
-                ):
-                    subcommand = args[0]
-                    subcmd_details = cmd_details["subcommands"][subcommand]
-                    if not self.handle_command(subcmd_details["id"], args[1:]):
-                        break
-                else:
-                    if "id" in cmd_details:
-                        if not self.handle_command(cmd_details["id"], args):
-                            break
-                    elif "format" in cmd_details:
-                        print(
-                            f"{Fore.RED}{command} {cmd_details['format']}"
-                        )
-                    else:
-                        print(
-                            f"{Fore.RED}Unknown subcommand: {args[0] if args else {command}}"
-                        )
-            else:
-                print(f"{Fore.RED}Unknown command: {command}")
+    def __dump_book(self):
+        """
+        This function pickles the address book for the background saver; it runs in the saver thread.
+        Return:
+            bytes: the pickled book.
+        """
+        with Bot.latency.measure("save", command="background"), tracing.span("save.dump") as span:
+            data = pickle.dumps(self.book)
+            span.set(records=len(self.book), bytes=len(data))
+            return data
+
+    def __dump_latency(self):
+        """
+        This function writes the latency histograms to the perf file, if one was given.
+        """
+        if self.perf_file:
+            try:
+                Bot.latency.dump(self.perf_file, version=__version__)
+            except OSError as e:
+                print(f"{Fore.RED}Could not write {self.perf_file}: {e}{Style.RESET_ALL}")
+
+    def __dump_memory(self):
+        """
+        This function writes the memory history, growth and census to the memprofile file, if one was given,
+        and stops tracing the allocations.
+        """
+        if self.memprofile:
+            Bot.memory.snapshot("exit")
+            try:
+                Bot.memory.dump(self.memprofile, version=__version__, census=census(self.book, MEMORY_CLASSES))
+            except OSError as e:
+                print(f"{Fore.RED}Could not write {self.memprofile}: {e}{Style.RESET_ALL}")
+        if Bot.memory.tracing:
+            Bot.memory.stop()
+
+    @print_execution_time
+    async def run_async(self):
+        """
+        This function runs the application on an asyncio event loop.
+
+        Commands are executed on the loop thread between prompts, saves are
+        pickled and written by a worker thread and background tasks keep
+        running while the user types. A command waits until the book is
+        pickled, so it never changes the book while it is being saved.
+        """
+        Bot.saver = AsyncSaver(self.__dump_book, self.filename)
+        try:
+            self.__start()
+            self.__reminder.start(asyncio.get_running_loop().call_later)
+            while True:
+                self.__print_reminders()
+                user_input = await self.__session.prompt_async(
+                    "> ", completer=self.__completer, bottom_toolbar=self.get_bottom_toolbar
+                )
+                await Bot.saver.hold()
+                if not self.execute(user_input):
+                    break
+        finally:
+            self.__reminder.stop()
+            self.book.disable_parallel_scan()
+            await Bot.saver.hold()
+            self.__dump_latency()
+            self.__dump_memory()
+            if self.__recorder is not None:
+                self.__recorder.close()
+            for task in list(self.__tasks):
+                task.cancel()
+            await asyncio.gather(*self.__tasks, return_exceptions=True)
+            # The last changes are on disk before the application exits
+            Bot.saver.schedule()
+            await Bot.saver.close()
+            Bot.saver = None
@@ -1,7 +1,21 @@
 ﻿from enum import Enum, auto
-from typing import Union
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Union
 from colorama import Fore
 
+
+class CommandNode(NamedTuple):
+    """Immutable node of the compiled command trie."""
+
+    name: str
+    id: Union["BotCmd", None]
+    description: str
+    format: str
+    subcommands: Mapping[str, "CommandNode"]
+    # What the arguments are completed from: name, title or tag of the address book
+    complete: Union[str, None] = None
+
+
 class BotCmd(Enum):
     """
     Enum for available commands.
@@ -23,10 +37,13 @@ class BotCmd(Enum):
     SHOW_BIRTHDAYS = auto()
     SHOW_PHONES = auto()
     SHOW_NOTES = auto()
+    SHOW_MORE = auto()
+    SHOW_DOMAINS = auto()
 
     EDIT_INFO = auto()
     EDIT_PHONE = auto()
     EDIT_NOTE = auto()
+    EDIT_TAG = auto()
 
     DELETE_CONTACT = auto()
     DELETE_PHONE = auto()
@@ -34,6 +51,7 @@ class BotCmd(Enum):
     DELETE_NOTE = auto()
     DELETE_TAG = auto()
 
+    FIND_NOTES = auto()
     FIND_NOTES_BY_TAG = auto()
     FIND_NOTES_BY_TITLE = auto()
 
@@ -47,6 +65,13 @@ class BotCmd(Enum):
     SEARCH_BY_NOTE = auto()
     SEARCH_BY_TAG = auto()
 
+    DEDUPE = auto()
+    EXPORT = auto()
+    STATS = auto()
+    PERF = auto()
+    DEBUG_MEMORY = auto()
+    PROFILE_TOP = auto()
+
     @staticmethod
     def get_commands():
         """
@@ -91,30 +116,35 @@ class BotCmd(Enum):
                     },
                     "email": {
                         "id": BotCmd.ADD_EMAIL,
+                        "complete": "name",
                         "description": "Add/replace an email for the specified contact",
                         "format": "[name] [email]",
                         "subcommands": {},
                     },
                     "address": {
                         "id": BotCmd.ADD_ADDRESS,
+                        "complete": "name",
                         "description": "Add/replace an address for the specified contact",
                         "format": "[name] [address]",
                         "subcommands": {},
                     },
                     "birthday": {
                         "id": BotCmd.ADD_BIRTHDAY,
+                        "complete": "name",
                         "description": "Add/replace a birthday for the specified contact",
                         "format": "[name] [DD.MM.YYYY]",
                         "subcommands": {},
                     },
                     "note": {
                         "id": BotCmd.ADD_NOTE,
+                        "complete": "name",
                         "description": "Add note for the specified contact",
                         "format": "[contact name]",
                         "subcommands": {},
                     },
                     "tags": {
                         "id": BotCmd.ADD_TAG,
+                        "complete": "title",
                         "description": "Add tag to note",
                         "format": "[note title]",
                         "subcommands": {},
@@ -123,26 +153,36 @@ class BotCmd(Enum):
             },
             "edit": {
                 "description": "Edit contact information",
-                "format": "[info, phone, note]",
+                "format": "[info, phone, note, tag]",
                 "subcommands": {
                     "info": {
                         "id": BotCmd.EDIT_INFO,
+                        "complete": "name",
                         "description": "Edit contact information",
                         "format": "[name] [name, birthday, email, address] [new value]",
                         "subcommands": {},
                     },
                     "phone": {
                         "id": BotCmd.EDIT_PHONE,
+                        "complete": "name",
                         "description": "Edit contact phone number",
                         "format": "[name] [old phone] [new phone]",
                         "subcommands": {},
                     },
                     "note": {
                         "id": BotCmd.EDIT_NOTE,
+                        "complete": "name",
                         "description": "Edit note by title",
                         "format": "[contact name] [note title]",
                         "subcommands": {},
                     },
+                    "tag": {
+                        "id": BotCmd.EDIT_TAG,
+                        "complete": "tag",
+                        "description": "Rename tag in all notes, merges it if the new tag exists",
+                        "format": "[old tag] [new tag]",
+                        "subcommands": {},
+                    },
                 },
             },
             "delete": {
@@ -151,30 +191,35 @@ class BotCmd(Enum):
                 "subcommands": {
                     "contact": {
                         "id": BotCmd.DELETE_CONTACT,
+                        "complete": "name",
                         "description": "Delete contact",
                         "format": "contact [name]",
                         "subcommands": {},
                     },
                     "phone": {
                         "id": BotCmd.DELETE_PHONE,
+                        "complete": "name",
                         "description": "Delete contact phone number",
                         "format": "[name] [phone]",
                         "subcommands": {},
                     },
                     "info": {
                         "id": BotCmd.DELETE_INFO,
+                        "complete": "name",
                         "description": "Delete contact info",
                         "format": "[name] [birthday, email, address]",
                         "subcommands": {},
                     },
                     "note": {
                         "id": BotCmd.DELETE_NOTE,
+                        "complete": "name",
                         "description": "Delete note by title",
                         "format": "[contact name] [note title]",
                         "subcommands": {},
                     },
                     "tag": {
                         "id": BotCmd.DELETE_TAG,
+                        "complete": "tag",
                         "description": "Delete tag",
                         "format": "[tag name] [note title]",
                         "subcommands": {},
@@ -183,16 +228,17 @@ class BotCmd(Enum):
             },
             "show": {
                 "description": "Show information about a contact",
-                "format": "[all, birthday, birthdays, phones, notes]",
+                "format": "[all, birthday, birthdays, phones, notes, domains, more]",
                 "subcommands": {
                     "all": {
                         "id": BotCmd.SHOW_ALL_CONTACTS,
                         "description": "Show all contacts in the address book",
-                        "format": "",
+                        "format": "[--limit N] [--page N]",
                         "subcommands": {},
                     },
                     "birthday": {
                         "id": BotCmd.SHOW_BIRTHDAY,
+                        "complete": "name",
                         "description": "Show the birthday for the specified contact",
                         "format": "[name]",
                         "subcommands": {},
@@ -205,30 +251,52 @@ class BotCmd(Enum):
                     },
                     "phones": {
                         "id": BotCmd.SHOW_PHONES,
+                        "complete": "name",
                         "description": "Show phones for the specified contact",
                         "format": "[name]",
                         "subcommands": {},
                     },
                     "notes": {
                         "id": BotCmd.SHOW_NOTES,
+                        "complete": "name",
                         "description": "Show all notes phones for the specified contact",
                         "format": "[name]",
                         "subcommands": {},
                     },
+                    "domains": {
+                        "id": BotCmd.SHOW_DOMAINS,
+                        "description": "Show the number of contacts per email domain",
+                        "format": "",
+                        "subcommands": {},
+                    },
+                    "more": {
+                        "id": BotCmd.SHOW_MORE,
+                        "description": "Show the next page of the last listing or search",
+                        "format": "",
+                        "subcommands": {},
+                    },
                 },
             },
             "find": {
                 "description": "Find information about a contact",
-                "format": "[notes-by-tag, notes-by-title]",
+                "format": "[notes, notes-by-tag, notes-by-title]",
                 "subcommands": {
+                    "notes": {
+                        "id": BotCmd.FIND_NOTES,
+                        "description": "Find notes by words in title, content and tags, best matches first",
+                        "format": "[query] [--limit N] [--page N]",
+                        "subcommands": {},
+                    },
                     "notes-by-tag": {
                         "id": BotCmd.FIND_NOTES_BY_TAG,
+                        "complete": "tag",
                         "description": "Find all notes by tag",
-                        "format": "",
+                        "format": "[tag] [--limit N] [--page N]",
                         "subcommands": {},
                     },
                     "notes-by-title": {
                         "id": BotCmd.FIND_NOTES_BY_TITLE,
+                        "complete": "title",
                         "description": "Find notes by title",
                         "format": "[note title]",
                         "subcommands": {},
@@ -242,87 +310,169 @@ class BotCmd(Enum):
                     "all": {
                         "id": BotCmd.SEARCH_BY_ALL,
                         "description": "Search by all fields for all contacts",
-                        "format": "[text]",
+                        "format": "[text] [--limit N] [--page N]",
                         "subcommands": {},
                     },
                     "name": {
                         "id": BotCmd.SEARCH_BY_NAME,
+                        "complete": "name",
                         "description": "Search by name for all contacts",
-                        "format": "[text]",
+                        "format": "[text] [--limit N] [--page N]",
                         "subcommands": {},
                     },
                     "phone": {
                         "id": BotCmd.SEARCH_BY_PHONE,
                         "description": "Search by phone for all contacts",
-                        "format": "[phone]",
+                        "format": "[phone] [--limit N] [--page N]",
                         "subcommands": {},
                     },
                     "email": {
                         "id": BotCmd.SEARCH_BY_EMAIL,
-                        "description": "Search by email for all contacts",
-                        "format": "[email]",
+                        "description": "Search by email for all contacts, use @domain, *.domain, name@ or name@domain for exact matches",
+                        "format": "[email] [--limit N] [--page N]",
                         "subcommands": {},
                     },
                     "address": {
                         "id": BotCmd.SEARCH_BY_ADDRESS,
                         "description": "Search by address for all contacts",
-                        "format": "[address]",
+                        "format": "[address] [--limit N] [--page N]",
                         "subcommands": {},
                     },
                     "birthday": {
                         "id": BotCmd.SEARCH_BY_BIRTHDAY,
                         "description": "Search by birthday for all contacts",
-                        "format": "[DD.MM.YYYY]",
+                        "format": "[DD.MM.YYYY] [--limit N] [--page N]",
                         "subcommands": {},
                     },
                     "note": {
                         "id": BotCmd.SEARCH_BY_NOTE,
+                        "complete": "title",
                         "description": "Search by note for all contacts",
-                        "format": "[note title]",
+                        "format": "[note title] [--limit N] [--page N]",
                         "subcommands": {},
                     },
                     "tag": {
                         "id": BotCmd.SEARCH_BY_TAG,
+                        "complete": "tag",
                         "description": "Search by tag for all contacts",
-                        "format": "[tag name]",
+                        "format": "[tag name] [--limit N] [--page N]",
                         "subcommands": {},
                     },
                 },
             },
+            "stats": {
+                "id": BotCmd.STATS,
+                "description": "Show address book statistics, --json for monitoring scripts",
+                "format": "[--json]",
+                "subcommands": {},
+            },
+            "perf": {
+                "id": BotCmd.PERF,
+                "description": "Show latency percentiles per command and phase, --json for scripts",
+                "format": "[--json]",
+                "subcommands": {},
+            },
+            "debug": {
+                "description": "Inspect the running bot",
+                "format": "[memory]",
+                "subcommands": {
+                    "memory": {
+                        "id": BotCmd.DEBUG_MEMORY,
+                        "description": "Show memory by class and what grew since the book was loaded, --stop to stop tracing",
+                        "format": "[--top N] [--json] | --stop",
+                        "subcommands": {},
+                    },
+                },
+            },
+            "profile": {
+                "description": "Inspect the profiles written with --profile",
+                "format": "[top]",
+                "subcommands": {
+                    "top": {
+                        "id": BotCmd.PROFILE_TOP,
+                        "description": "Show the hottest functions of the last N profiled commands (default 5)",
+                        "format": "[N]",
+                        "subcommands": {},
+                    },
+                },
+            },
+            "export": {
+                "id": BotCmd.EXPORT,
+                "description": "Export all contacts to a CSV file",
+                "format": "[file name]",
+                "subcommands": {},
+            },
+            "dedupe": {
+                "id": BotCmd.DEDUPE,
+                "description": "Find contacts that share a phone, an email or a similar name and merge them",
+                "format": "",
+                "subcommands": {},
+            },
         }
 
+    @staticmethod
+    def compile_commands(commands=None) -> Mapping[str, CommandNode]:
+        """
+        This function compiles the command spec into an immutable trie.
+
+        Args:
+            commands (dict, optional): the spec to compile. Defaults to get_commands().
+        Return:
+            Mapping: command name -> CommandNode.
+        """
+        commands = BotCmd.get_commands() if commands is None else commands
+        return MappingProxyType({
+            name: CommandNode(
+                name,
+                details.get("id"),
+                details.get("description", ""),
+                details.get("format", ""),
+                BotCmd.compile_commands(details.get("subcommands") or {}),
+                details.get("complete"),
+            )
+            for name, details in commands.items()
+        })
+
+    @staticmethod
+    def resolve(parts: list[str]) -> tuple[Union[CommandNode, None], list[str]]:
+        """
+        This function finds the deepest command node matching the words of the input.
+
+        Args:
+            parts (list): the words of the user input.
+        Return:
+            tuple: the node (None if the first word is not a command) and the remaining arguments.
+        """
+        node = COMMAND_TRIE.get(parts[0]) if parts else None
+        depth = 1
+        while node is not None and depth < len(parts) and parts[depth] in node.subcommands:
+            node = node.subcommands[parts[depth]]
+            depth += 1
+        return node, list(parts[depth:])
+
     @staticmethod
     def show_help() -> None:
         """
         This function displays help for available commands.
         """
         print(f"{Fore.CYAN}Available commands (tab to complete):")
-        for cmd, details in BotCmd.get_commands().items():
+        for cmd, details in COMMAND_TRIE.items():
             print(
-                f"{Fore.YELLOW}{cmd} {Fore.WHITE} {details['format']}: {Fore.LIGHTBLACK_EX}{details['description']}"
+                f"{Fore.YELLOW}{cmd} {Fore.WHITE} {details.format}: {Fore.LIGHTBLACK_EX}{details.description}"
             )
-            if "subcommands" in details and details["subcommands"]:
-                for subcmd, subdetails in details["subcommands"].items():
-                    print(
-                        f"  {Fore.GREEN}{subcmd} {Fore.WHITE}{subdetails['format']}: {Fore.LIGHTBLACK_EX} {subdetails['description']}"
-                    )
+            for subcmd, subdetails in details.subcommands.items():
+                print(
+                    f"  {Fore.GREEN}{subcmd} {Fore.WHITE}{subdetails.format}: {Fore.LIGHTBLACK_EX} {subdetails.description}"
+                )
 
     @staticmethod
     def get_command_format(command, args) -> str:
-        commands = BotCmd.get_commands()
-        if command in commands:
-            cmd_details = commands[command]
-            if (
-                "subcommands" in cmd_details
-                and args
-                and args[0] in cmd_details["subcommands"]
-            ):
-                subcommand = args[0]
-                subcmd_details = cmd_details["subcommands"][subcommand]
-                return f"{command} {subcmd_details['format']}"
-            else:
-                return f"{command} {cmd_details['format']}"
-        return None
+        node = COMMAND_TRIE.get(command)
+        if node is None:
+            return None
+        if args and args[0] in node.subcommands:
+            return f"{command} {node.subcommands[args[0]].format}"
+        return f"{command} {node.format}"
 
     @staticmethod
     def create_completer_dict(commands=None) -> dict:
@@ -332,51 +482,20 @@ class BotCmd(Enum):
         Return:
             dict: nested dictionary for the completer.
         """
-        commands = BotCmd.get_commands() if commands is None else commands
-        completer_dict = {}
-        for cmd, details in commands.items():
-            if "subcommands" in details and details["subcommands"]:
-                completer_dict[cmd] = BotCmd.create_completer_dict(details["subcommands"])
-            else:
-                completer_dict[cmd] = None
-        return completer_dict
-
-    @staticmethod
-    def get_command_name(command) -> Union[str, None]:
-        """
-        This function returns the command name
-        from get_commands() and all fields subcommands for the given command enum.
-        Args:
-            command (BotCmd): command id.
-        Return:
-            str: command name.
-        """
-        commands = BotCmd.get_commands()
-        for cmd, details in commands.items():
-            if "id" in details and command == details["id"]:
-                return cmd
-            if "subcommands" in details:
-                for subcmd, subdetails in details["subcommands"].items():
-                    if "id" in subdetails and command == subdetails["id"]:
-                        return subcmd
+        commands = COMMAND_TRIE if commands is None else commands
+        return {
+            cmd: BotCmd.create_completer_dict(node.subcommands) if node.subcommands else None
+            for cmd, node in commands.items()
+        }
 
     def get_command_name(self) -> Union[str, None]:
         """
-        This function returns the command name
-        from get_commands() and all fields subcommands for the given command enum.
-        Args:
-            command (BotCmd): command id.
+        This function returns the name of the command or subcommand for the command enum.
+        Can also be called as BotCmd.get_command_name(command).
         Return:
             str: command name.
         """
-        commands = BotCmd.get_commands()
-        for cmd, details in commands.items():
-            if "id" in details and self == details["id"]:
-                return cmd
-            if "subcommands" in details:
-                for subcmd, subdetails in details["subcommands"].items():
-                    if "id" in subdetails and self == subdetails["id"]:
-                        return subcmd
+        return COMMAND_NAMES.get(self)
 
     def __str__(self):
         return self.name.lower()
@@ -389,3 +508,20 @@ class BotCmd(Enum):
 
     def __hash__(self) -> int:
         return super().__hash__()
+
+
+def _command_names(trie: Mapping[str, CommandNode]) -> dict:
+    """Map every command id to the name of its command or subcommand, top level first."""
+    names = {}
+    for name, node in trie.items():
+        if node.id is not None:
+            names.setdefault(node.id, name)
+    for node in trie.values():
+        for command_id, name in _command_names(node.subcommands).items():
+            names.setdefault(command_id, name)
+    return names
+
+
+# Compiled once at import; the toolbar, the completer and the dispatch only look them up
+COMMAND_TRIE = BotCmd.compile_commands()
+COMMAND_NAMES = MappingProxyType(_command_names(COMMAND_TRIE))
@@ -0,0 +1,49 @@
+import re
+from typing import Iterable
+
+from prompt_toolkit.completion import CompleteEvent, Completer, Completion, NestedCompleter
+from prompt_toolkit.document import Document
+
+from keeperbot.bot_cmd import BotCmd
+
+WORD = re.compile(r"\S+")
+
+
+class BotCompleter(Completer):
+    """
+    Completes command words from the command trie, and contact names, note titles
+    and tags in the arguments from the prefix index of the address book.
+    """
+
+    def __init__(self, book, limit: int = 20) -> None:
+        """
+        Initialize the completer.
+
+        Args:
+            book (AddressBook): The address book to complete the arguments from.
+            limit (int, optional): The maximum number of suggested values. Defaults to 20.
+        """
+        self.book = book
+        self.limit = limit
+        self.commands = NestedCompleter.from_nested_dict(BotCmd.create_completer_dict())
+
+    def get_completions(self, document: Document, complete_event: CompleteEvent) -> Iterable[Completion]:
+        """
+        Yield the completions for the text before the cursor.
+
+        The arguments are completed as a whole, so names with spaces are suggested
+        after the first word was typed, e.g. 'show phones John S' -> 'John Smith'.
+        """
+        text = document.text_before_cursor
+        words = list(WORD.finditer(text))
+        node, args = BotCmd.resolve([word.group() for word in words])
+
+        # Still typing a command word
+        if node is None or node.complete is None or (not args and not text[-1:].isspace()):
+            yield from self.commands.get_completions(document, complete_event)
+            return
+
+        command_end = words[len(words) - len(args) - 1].end()
+        prefix = text[command_end:].lstrip()
+        for value in self.book.complete(node.complete, prefix, self.limit):
+            yield Completion(value, start_position=-len(prefix))
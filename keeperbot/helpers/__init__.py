@@ -2,5 +2,11 @@
 """Top-level package for Helpers library."""
 from .helpers import print_header, print_footer, print_execution_time, input_error
 from .application import Application
+from .latency import LatencyHistogram, LatencyRecorder
+from .memory import MemoryProfiler, census
+from .pager import page_blocks
+from .profiler import CommandProfiler
+from .saver import AsyncSaver
+from .table import StreamingTable, display_width
 
 __version__ = "0.1.2"
@@ -1,6 +1,8 @@
 import time
 import ast
+import inspect
 import os
+import threading
 from functools import wraps
 from colorama import Fore, Style, init
 from keeperbot.AddressBook.addressbook_errors import InvalidEmailError
@@ -64,30 +66,43 @@ def print_footer(_text):
 def print_execution_time(func):
     """
     Decorator that measures and prints the execution time of the decorated function.
+    A coroutine function is timed until the coroutine finishes.
     Args:
-        func (callable): The function to be decorated.
+        func (callable): The function or coroutine function to be decorated.
     Returns:
         callable: The decorated function that measures and prints the execution time.
     """
 
+    if inspect.iscoroutinefunction(func):
+
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            start_time = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                print(
+                    f"{Fore.MAGENTA}{func.__name__} executed in {time.perf_counter() - start_time:.6f} seconds"
+                )
+
+        return async_wrapper
+
+    # Nesting depth per thread, so recursive and concurrent calls do not share a start time
+    local = threading.local()
+
     @wraps(func)
     def wrapper(*args, **kwargs):
-        if not hasattr(wrapper, "start_time"):
-            wrapper.start_time = time.time()
-            wrapper.call_depth = 0
-
-        wrapper.call_depth += 1
-        result = func(*args, **kwargs)
-        wrapper.call_depth -= 1
-
-        if wrapper.call_depth == 0:
-            end_time = time.time()
-            print(
-                f"{Fore.MAGENTA}{func.__name__} executed in {end_time - wrapper.start_time:.6f} seconds"
-            )
-            del wrapper.start_time
-
-        return result
+        depth = getattr(local, "depth", 0)
+        local.depth = depth + 1
+        start_time = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            local.depth = depth
+            if depth == 0:
+                print(
+                    f"{Fore.MAGENTA}{func.__name__} executed in {time.perf_counter() - start_time:.6f} seconds"
+                )
 
     return wrapper
 
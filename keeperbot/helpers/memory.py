@@ -0,0 +1,209 @@
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from collections import deque
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+from typing import Iterable
+
+# Never followed nor counted: they lead from the data to the whole program
+_OPAQUE = (type, ModuleType, FunctionType, MethodType, BuiltinFunctionType)
+# Atomic objects the garbage collector does not track, so they cannot be counted process-wide
+_UNTRACKED = (str, bytes, int, float, bool)
+
+
+def census(root, classes: Iterable[type], package: str = None) -> dict:
+    """
+    Count the objects reachable from root by class.
+
+    Objects of the package and builtin containers are followed, other objects
+    (e.g. locks or dates) are counted but not followed. Shared objects, such
+    as interned strings, are counted once.
+
+    Args:
+        root: The object to start from, e.g. the address book.
+        classes (Iterable[type]): The classes to report, e.g. Record and str.
+        package (str, optional): The top-level package whose objects are followed.
+            Defaults to the package of the root.
+
+    Returns:
+        dict: class name -> {"count", "bytes", "alive"} for the classes, "other" and "total".
+            bytes are the shallow sizes; alive counts all instances in the process, so
+            alive - count are instances kept by something else than the root (e.g. caches).
+            alive is None for classes the garbage collector does not track, such as str.
+    """
+    package = package or type(root).__module__.split(".")[0]
+    names = {cls: cls.__name__ for cls in classes}
+    result = {name: {"count": 0, "bytes": 0, "alive": None} for name in [*names.values(), "other", "total"]}
+
+    seen = set()
+    stack = [root]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _OPAQUE):
+            continue
+        seen.add(id(obj))
+        size = sys.getsizeof(obj)
+        for name in (names.get(type(obj), "other"), "total"):
+            result[name]["count"] += 1
+            result[name]["bytes"] += size
+        module = type(obj).__module__
+        if module == "builtins" or module.split(".")[0] == package:
+            stack.extend(gc.get_referents(obj))
+
+    tracked = {cls: name for cls, name in names.items() if not issubclass(cls, _UNTRACKED)}
+    if tracked:
+        alive = dict.fromkeys(tracked.values(), 0)
+        for obj in gc.get_objects():
+            name = tracked.get(type(obj))
+            if name is not None:
+                alive[name] += 1
+        for name, count in alive.items():
+            result[name]["alive"] = count
+    return result
+
+
+class MemoryProfiler:
+    """Traced memory recorded at points of the session, e.g. after every command.
+
+    Points are cheap and only hold the traced size, so memory that grows with
+    every command stands out in the history. Snapshots of all traced
+    allocations are slow on large heaps and taken on request; only the first
+    (the baseline), the previous and the last one are kept.
+    """
+
+    FILTERS = (
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    )
+
+    def __init__(self, frames: int = 1, history: int = 1000) -> None:
+        """
+        Initialize the profiler; tracing starts with start().
+
+        Args:
+            frames (int, optional): The stack frames stored per allocation. Defaults to 1.
+            history (int, optional): The number of points to keep. Defaults to 1000.
+        """
+        self.frames = frames
+        self.history = deque(maxlen=history)
+        self.baseline = None
+        self.previous = None
+        self.last = None
+
+    @property
+    def tracing(self) -> bool:
+        """Whether allocations are traced."""
+        return tracemalloc.is_tracing()
+
+    def start(self) -> None:
+        """Start tracing allocations and a new history; allocations made before are not seen."""
+        if not tracemalloc.is_tracing():
+            self.history.clear()
+            tracemalloc.start(self.frames)
+
+    def stop(self) -> None:
+        """Stop tracing and forget the snapshots; the history is kept."""
+        tracemalloc.stop()
+        self.baseline = self.previous = self.last = None
+
+    def record(self, label: str) -> dict:
+        """
+        Add a point with the traced memory to the history, without a snapshot.
+
+        Args:
+            label (str): What happened before, e.g. the command name.
+
+        Returns:
+            dict: The history point {"label", "time", "current", "peak"}, sizes in bytes,
+                or None if allocations are not traced.
+        """
+        if not tracemalloc.is_tracing():
+            return None
+        current, peak = tracemalloc.get_traced_memory()
+        point = {"label": label, "time": round(time.time(), 3), "current": current, "peak": peak}
+        self.history.append(point)
+        return point
+
+    def snapshot(self, label: str) -> dict:
+        """
+        Take a snapshot of the traced allocations and add a point to the history.
+
+        Args:
+            label (str): What happened before, e.g. load or the command name.
+
+        Returns:
+            dict: The history point {"label", "time", "current", "peak", "blocks"}, sizes in bytes,
+                or None if allocations are not traced.
+        """
+        if not tracemalloc.is_tracing():
+            return None
+        snapshot = tracemalloc.take_snapshot().filter_traces(self.FILTERS)
+        current, peak = tracemalloc.get_traced_memory()
+        point = {
+            "label": label,
+            "time": round(time.time(), 3),
+            "current": current,
+            "peak": peak,
+            "blocks": len(snapshot.traces),
+        }
+        self.history.append(point)
+        if self.baseline is None:
+            self.baseline = snapshot
+        self.previous, self.last = self.last, snapshot
+        return point
+
+    def diff(self, since: str = "baseline", limit: int = 10, key: str = "lineno") -> list[list]:
+        """
+        Return the allocations that changed the most between two snapshots.
+
+        Args:
+            since (str, optional): baseline or previous. Defaults to baseline.
+            limit (int, optional): The number of rows. Defaults to 10.
+            key (str, optional): Group by lineno, filename or traceback. Defaults to lineno.
+
+        Returns:
+            list: [location, size change, count change, size] rows, sizes in bytes,
+                largest change (growth or release) first.
+        """
+        reference = self.baseline if since == "baseline" else self.previous
+        if reference is None or self.last is None or reference is self.last:
+            return []
+        rows = []
+        for stat in self.last.compare_to(reference, key):
+            if stat.size_diff == 0 and stat.count_diff == 0:
+                continue
+            frame = stat.traceback[0]
+            location = f"{os.sep.join(frame.filename.split(os.sep)[-2:])}:{frame.lineno}"
+            rows.append([location, stat.size_diff, stat.count_diff, stat.size])
+            if len(rows) == limit:
+                break
+        return rows
+
+    def dump(self, filename: str, limit: int = 25, **meta) -> None:
+        """
+        Write the history and the largest growth since the baseline to a JSON file.
+
+        Args:
+            filename (str): The path of the file.
+            limit (int, optional): The number of growth rows. Defaults to 25.
+            **meta: Extra top-level fields, e.g. the version or a census.
+        """
+        data = {
+            **meta,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "history": list(self.history),
+            "growth": [
+                {"location": location, "size_diff": size_diff, "count_diff": count_diff, "size": size}
+                for location, size_diff, count_diff, size in self.diff("baseline", limit)
+            ],
+        }
+        with open(filename, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=2)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(tracing={self.tracing}, points={len(self.history)})"
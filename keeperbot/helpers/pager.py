@@ -0,0 +1,47 @@
+import shutil
+import sys
+from typing import Callable, Iterable
+
+from colorama import Fore, Style
+
+MORE_PROMPT = f"{Fore.YELLOW}-- More -- Enter: next screen, q: stop{Style.RESET_ALL} "
+
+
+def page_blocks(blocks: Iterable[str], height: int = None, ask: Callable[[str], str] = None, interactive: bool = None) -> int:
+    """
+    Print blocks of text one screen at a time.
+
+    The output starts as soon as the first screen is ready; the rest of the
+    blocks are produced only when the user asks for the next screen.
+
+    Args:
+        blocks (Iterable[str]): The blocks to print; a block is never split between screens
+            unless it is taller than the screen.
+        height (int, optional): The number of lines per screen. Defaults to the terminal height.
+        ask (Callable, optional): Reads the answer to the more prompt. Defaults to input().
+        interactive (bool, optional): Whether to stop after each screen. Defaults to
+            True when the output is a terminal.
+
+    Returns:
+        int: The number of printed blocks.
+    """
+    if interactive is None:
+        interactive = sys.stdout.isatty()
+    height = height or max(shutil.get_terminal_size().lines - 1, 2)
+
+    printed = 0
+    used = 0
+    for block in blocks:
+        lines = block.count("\n") + 1
+        if interactive and used and used + lines > height:
+            try:
+                answer = (ask or input)(MORE_PROMPT)
+            except EOFError:
+                return printed
+            if answer.strip().lower() in ("q", "quit"):
+                return printed
+            used = 0
+        print(block)
+        used += lines
+        printed += 1
+    return printed
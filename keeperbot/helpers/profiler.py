@@ -0,0 +1,123 @@
+import cProfile
+import os
+import pstats
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Iterator
+
+from colorama import Fore, Style
+
+
+class CommandProfiler:
+    """cProfile profiles of single commands, one .pstats file per command.
+
+    Disabled until enable() is called; profile() then costs nothing. The files
+    of the latest commands are remembered for top().
+    """
+
+    def __init__(self, keep: int = 100) -> None:
+        """
+        Initialize a disabled profiler.
+
+        Args:
+            keep (int, optional): The number of latest profiles top() can combine. Defaults to 100.
+        """
+        self.directory = None
+        self.session = None
+        self.recent = deque(maxlen=keep)
+        self._count = 0
+        self._active = False
+
+    @property
+    def enabled(self) -> bool:
+        """Whether profiles are written."""
+        return self.directory is not None
+
+    def enable(self, directory: str) -> None:
+        """
+        Write the profiles to a directory, created if needed.
+
+        The files of one session share a time stamp prefix, so sessions do not overwrite each other.
+
+        Args:
+            directory (str): The directory of the .pstats files.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.session = time.strftime("%Y%m%d-%H%M%S")
+        self._count = 0
+        self.recent.clear()
+
+    def disable(self) -> None:
+        """Stop writing profiles."""
+        self.directory = None
+
+    @contextmanager
+    def profile(self, label: str, command: bool = True) -> Iterator[None]:
+        """
+        Profile the block and write the profile to a .pstats file.
+
+        A block inside a profiled block is part of the outer profile. A file that
+        cannot be written is reported and skipped.
+
+        Args:
+            label (str): The name of the profile, e.g. the command name or load.
+            command (bool, optional): Whether the block is a command that top() combines.
+                Defaults to True.
+        """
+        if self.directory is None or self._active:
+            yield
+            return
+        profiler = cProfile.Profile()
+        self._active = True
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            self._active = False
+            if command:
+                self._count += 1
+                name = f"{self.session}-{self._count:04d}-{label}.pstats"
+            else:
+                name = f"{self.session}-{label}.pstats"
+            filename = os.path.join(self.directory, name)
+            try:
+                profiler.dump_stats(filename)
+            except OSError as e:
+                print(f"{Fore.YELLOW}Could not write profile {filename}: {e}{Style.RESET_ALL}")
+            else:
+                if command:
+                    self.recent.append((label, filename))
+
+    def top(self, commands: int = 5, limit: int = 20) -> tuple[list[str], list[list]]:
+        """
+        Combine the profiles of the latest commands and return their hottest functions.
+
+        Args:
+            commands (int, optional): The number of latest commands. Defaults to 5.
+            limit (int, optional): The number of functions. Defaults to 20.
+
+        Returns:
+            tuple: The labels of the combined commands, oldest first, and
+                [function, calls, own time, cumulative time] rows, times in milliseconds,
+                the largest own time first.
+        """
+        latest = list(self.recent)[-commands:]
+        if not latest:
+            return [], []
+        stats = pstats.Stats(*(filename for _, filename in latest))
+        rows = []
+        for (filename, line, function), (_, calls, own, cumulative, _) in stats.stats.items():
+            if filename == "~":
+                # Builtins, e.g. <built-in method builtins.sorted>
+                location = function
+            else:
+                location = f"{os.sep.join(filename.split(os.sep)[-2:])}:{line}({function})"
+            rows.append([location, calls, own * 1000, cumulative * 1000])
+        rows.sort(key=lambda row: row[2], reverse=True)
+        return [label for label, _ in latest], rows[:limit]
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(directory={self.directory!r}, profiles={self._count})"
@@ -0,0 +1,100 @@
+import asyncio
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from colorama import Fore, Style
+
+from . import tracing
+
+
+def write_atomic(filename: str, data: bytes) -> None:
+    """
+    Write the data to the file so that readers never see a half-written file.
+
+    Args:
+        filename (str): The path of the file.
+        data (bytes): The new content.
+    """
+    with tracing.span("save.write", file=filename, bytes=len(data)):
+        temp_name = f"{filename}.tmp"
+        with open(temp_name, "wb") as file:
+            file.write(data)
+        os.replace(temp_name, filename)
+
+
+class AsyncSaver:
+    """Saves data from an asyncio loop without blocking it on disk writes.
+
+    The data is serialized and written by a worker thread. The data must not
+    change while it is serialized, so the loop awaits hold() before it runs
+    the next change. Saves requested while one is pending are coalesced into
+    a single write.
+    """
+
+    def __init__(self, dump: Callable[[], bytes], filename: str, delay: float = 0.2) -> None:
+        """
+        Initialize the saver.
+
+        Args:
+            dump (Callable): Returns the serialized data.
+            filename (str): The path of the file to write.
+            delay (float, optional): Seconds to wait for more changes before saving. Defaults to 0.2.
+        """
+        self.dump = dump
+        self.filename = filename
+        self.delay = delay
+        self.saves = 0
+        self._dirty = False
+        self._task = None
+        self._dumping = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="saver")
+
+    def schedule(self) -> None:
+        """Request a save. Must be called on the loop thread."""
+        self._dirty = True
+        if self._task is None or self._task.done():
+            # In a fresh context, so the save is not traced as part of the command that requested it
+            self._task = contextvars.Context().run(asyncio.get_running_loop().create_task, self._save_pending())
+
+    async def _save_pending(self) -> None:
+        """Write the data until no new changes were requested during the write."""
+        loop = asyncio.get_running_loop()
+        while self._dirty:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            self._dirty = False
+            with tracing.span("save.background", file=self.filename):
+                # The dump and write spans are children of this one although they run in the worker thread
+                run = contextvars.copy_context().run
+                self._dumping = loop.run_in_executor(self._executor, run, self.dump)
+                try:
+                    data = await self._dumping
+                finally:
+                    self._dumping = None
+                try:
+                    await loop.run_in_executor(self._executor, run, write_atomic, self.filename, data)
+                    self.saves += 1
+                except OSError as e:
+                    print(f"{Fore.RED}Could not save {self.filename}: {e}{Style.RESET_ALL}")
+
+    async def hold(self) -> None:
+        """Wait until the data is not being serialized, so it may be changed."""
+        if self._dumping is not None:
+            # wait() neither raises the error of the dump nor cancels it
+            await asyncio.wait({self._dumping})
+
+    async def flush(self) -> None:
+        """Wait until all requested saves are written."""
+        while self._task is not None and not self._task.done():
+            await asyncio.shield(self._task)
+
+    async def close(self) -> None:
+        """Write the pending changes without the delay and stop the worker thread."""
+        self.delay = 0
+        await self.flush()
+        self._executor.shutdown(wait=True)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(filename='{self.filename}', saves={self.saves}, pending={self._dirty})"
@@ -0,0 +1,166 @@
+import re
+import shutil
+import textwrap
+from itertools import chain, islice
+from typing import Iterable, Iterator
+from wcwidth import wcswidth, wcwidth
+
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*m")
+
+
+def display_width(text: str) -> int:
+    """
+    Return the number of terminal columns the text takes.
+
+    Wide characters (e.g. CJK, emoji) take two columns, color codes none.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        int: The width of the text.
+    """
+    if "\x1b" in text:
+        text = ANSI_ESCAPE.sub("", text)
+    if text.isascii():
+        return len(text)
+    width = wcswidth(text)
+    return width if width >= 0 else len(text)
+
+
+def wrap_cell(text: str, width: int) -> list[str]:
+    """
+    Split the text into lines that are at most width columns wide.
+
+    Args:
+        text (str): The cell text, possibly with line breaks.
+        width (int): The width of the column.
+
+    Returns:
+        list: The lines of the cell.
+    """
+    lines = []
+    for line in text.split("\n") or [""]:
+        if display_width(line) <= width:
+            lines.append(line)
+            continue
+        if line.isascii():
+            # Prefer breaking at spaces; a character is one column here
+            lines.extend(textwrap.wrap(line, width) or [""])
+            continue
+        current, current_width = [], 0
+        for char in line:
+            char_width = max(wcwidth(char), 0)
+            if current and current_width + char_width > width:
+                lines.append("".join(current))
+                current, current_width = [], 0
+            current.append(char)
+            current_width += char_width
+        lines.append("".join(current))
+    return lines
+
+
+class StreamingTable:
+    """Renders rows as a fancy_grid table line by line, without looking at all rows first.
+
+    Column widths are taken from the first rows (a bounded sample) and capped by
+    a budget per column and by the terminal width. Longer cells of later rows
+    are wrapped instead of widening the table.
+    """
+
+    def __init__(self, headers: list[str], sample: int = 50, max_width: int = 40, total_width: int = None) -> None:
+        """
+        Initialize the renderer.
+
+        Args:
+            headers (list): The column headers.
+            sample (int, optional): The number of first rows to measure. Defaults to 50.
+            max_width (int, optional): The maximum width of a column. Defaults to 40.
+            total_width (int, optional): The maximum width of the table. Defaults to the terminal width.
+        """
+        self.headers = [str(header) for header in headers]
+        self.sample = sample
+        self.max_width = max_width
+        self.total_width = total_width or shutil.get_terminal_size().columns
+
+    @staticmethod
+    def _cells(row) -> list[str]:
+        """Convert the values of a row to text, None becomes an empty cell."""
+        return ["" if value is None else str(value) for value in row]
+
+    def _widths(self, rows: list[list[str]]) -> list[int]:
+        """Compute the column widths from the header and the sampled rows."""
+        widths = [display_width(header) for header in self.headers]
+        for row in rows:
+            for column, cell in enumerate(row):
+                widths[column] = max(widths[column], max(map(display_width, cell.split("\n"))))
+        widths = [min(width, self.max_width) for width in widths]
+
+        # Shrink the widest columns until the table fits into the terminal
+        overhead = 3 * len(widths) + 1
+        minimum = [min(display_width(header), 8) for header in self.headers]
+        while sum(widths) + overhead > self.total_width:
+            column = max(range(len(widths)), key=lambda i: widths[i] - minimum[i])
+            if widths[column] <= minimum[column]:
+                break
+            widths[column] -= 1
+        return widths
+
+    def _border(self, widths: list[int], left: str, fill: str, middle: str, right: str) -> str:
+        """Build a horizontal border line."""
+        return left + middle.join(fill * (width + 2) for width in widths) + right
+
+    def _row_lines(self, cells: list, widths: list[int], numeric: list[bool]) -> list[str]:
+        """Build the lines of one row, wrapping the cells that do not fit."""
+        wrapped = [wrap_cell(cell, width) for cell, width in zip(cells, widths)]
+        height = max(map(len, wrapped))
+        lines = []
+        for line in range(height):
+            parts = []
+            for column, width in enumerate(widths):
+                text = wrapped[column][line] if line < len(wrapped[column]) else ""
+                padding = " " * (width - display_width(text))
+                parts.append(f" {padding}{text} " if numeric[column] else f" {text}{padding} ")
+            lines.append("│" + "│".join(parts) + "│")
+        return lines
+
+    def render(self, rows: Iterable) -> Iterator[str]:
+        """
+        Render the table.
+
+        Args:
+            rows (Iterable): The rows; values are converted with str().
+
+        Yields:
+            str: The top border with the header first, then one block per row with
+                its separator or the bottom border. Blocks may span several lines.
+        """
+        rows = iter(rows)
+        sampled = list(islice(rows, self.sample))
+        numeric = [
+            bool(sampled) and all(isinstance(row[column], (int, float)) for row in sampled)
+            for column in range(len(self.headers))
+        ]
+        sampled = [self._cells(row) for row in sampled]
+        widths = self._widths(sampled)
+
+        yield "\n".join([
+            self._border(widths, "╒", "═", "╤", "╕"),
+            *self._row_lines(self.headers, widths, numeric),
+            self._border(widths, "╞", "═", "╪", "╡"),
+        ])
+
+        separator = self._border(widths, "├", "─", "┼", "┤")
+        bottom = self._border(widths, "╘", "═", "╧", "╛")
+        previous = None
+        for cells in chain(sampled, (self._cells(row) for row in rows)):
+            if previous is not None:
+                yield "\n".join([*previous, separator])
+            previous = self._row_lines(cells, widths, numeric)
+        if previous is not None:
+            yield "\n".join(previous)
+        yield bottom
+
+    def to_string(self, rows: Iterable) -> str:
+        """Render the whole table into one string."""
+        return "\n".join(self.render(rows))
@@ -0,0 +1,261 @@
+import contextvars
+import inspect
+import itertools
+import json
+import logging
+import os
+import time
+import uuid
+from collections.abc import Sized
+from functools import wraps
+from logging.handlers import RotatingFileHandler
+from typing import Iterable
+
+TRACE_ENV = "KEEPERBOT_TRACE"
+
+# The id of the innermost open span of the current thread or task
+_parent = contextvars.ContextVar("keeperbot_trace_parent", default=None)
+_ids = itertools.count(1)
+# None while tracing is disabled; every entry point checks it first
+_logger = None
+_session = None
+
+
+class Span:
+    """A traced operation, written as one JSON line when it ends."""
+
+    __slots__ = ("name", "id", "parent", "attrs", "start", "_started", "_token")
+
+    def __init__(self, name: str, attrs: dict) -> None:
+        """
+        Initialize the span.
+
+        Args:
+            name (str): The operation, e.g. command or save.
+            attrs (dict): Extra fields, e.g. record counts or bytes written.
+        """
+        self.name = name
+        self.attrs = attrs
+        self.id = None
+        self.parent = None
+
+    def set(self, **attrs) -> None:
+        """Add fields to the span, e.g. the number of results once they are known."""
+        self.attrs.update(attrs)
+
+    def __enter__(self) -> "Span":
+        self.id = next(_ids)
+        self.parent = _parent.get()
+        self._token = _parent.set(self.id)
+        self.start = time.time()
+        self._started = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        duration = time.perf_counter_ns() - self._started
+        _parent.reset(self._token)
+        self._write(duration, exc_type)
+        return False
+
+    def _write(self, duration: int, exc_type=None) -> None:
+        """Write the span line, duration in nanoseconds."""
+        logger = _logger
+        if logger is not None:
+            line = {
+                "trace": _session,
+                "id": self.id,
+                "parent": self.parent,
+                "name": self.name,
+                "start": round(self.start, 6),
+                "duration_ms": duration / 1e6,
+                **self.attrs,
+            }
+            if exc_type is not None:
+                line["error"] = exc_type.__name__
+            logger.info(json.dumps(line, default=str))
+
+
+class _NoSpan:
+    """The span returned while tracing is disabled; does nothing."""
+
+    __slots__ = ()
+
+    def set(self, **attrs) -> None:
+        pass
+
+    def __enter__(self) -> "_NoSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+NO_SPAN = _NoSpan()
+
+
+def span(name: str, **attrs):
+    """
+    Start a span for a with block.
+
+    Args:
+        name (str): The operation.
+        **attrs: Extra fields of the span.
+
+    Returns:
+        Span: The span, or a shared no-op span if tracing is disabled.
+    """
+    if _logger is None:
+        return NO_SPAN
+    return Span(name, attrs)
+
+
+def _traced_iter(span_name: str, iterator):
+    """
+    Yield from the iterator in one span that ends when the iterator is exhausted or closed.
+
+    The duration is the time spent in the iterator, not the pauses of the caller between
+    rows (e.g. the pager waiting for a key), and the span is not the parent of the spans
+    the caller opens meanwhile. The number of rows yielded is added to the span.
+    """
+    current = None
+    rows = 0
+    duration = 0
+    exc_type = None
+    try:
+        while True:
+            started = time.perf_counter_ns()
+            if current is None:
+                current = Span(span_name, {})
+                current.id = next(_ids)
+                current.parent = _parent.get()
+                current.start = time.time()
+            token = _parent.set(current.id)
+            try:
+                row = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                _parent.reset(token)
+                duration += time.perf_counter_ns() - started
+            rows += 1
+            yield row
+    except BaseException as e:
+        # GeneratorExit (the caller stopped early) is not an error
+        if not isinstance(e, GeneratorExit):
+            exc_type = type(e)
+        raise
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+        if current is not None:
+            current.set(rows=rows)
+            current._write(duration, exc_type)
+
+
+def traced(name: str = None):
+    """
+    Decorator that traces every call of the function.
+
+    The number of results is added to the span if the function returns a sized value.
+    A generator function is traced while it is iterated, see _traced_iter.
+
+    Args:
+        name (str, optional): The span name. Defaults to the qualified name of the function.
+    """
+
+    def decorate(func):
+        span_name = name or func.__qualname__
+
+        if inspect.isgeneratorfunction(func):
+
+            @wraps(func)
+            def generator_wrapper(*args, **kwargs):
+                if _logger is None:
+                    return func(*args, **kwargs)
+                return _traced_iter(span_name, func(*args, **kwargs))
+
+            generator_wrapper.__traced__ = True
+            return generator_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _logger is None:
+                return func(*args, **kwargs)
+            with Span(span_name, {}) as current:
+                result = func(*args, **kwargs)
+                if isinstance(result, Sized):
+                    current.set(results=len(result))
+                return result
+
+        wrapper.__traced__ = True
+        return wrapper
+
+    return decorate
+
+
+def instrument(cls, methods: Iterable[str], prefix: str = None) -> None:
+    """
+    Trace the methods of a class, e.g. of a library class that cannot import this module.
+
+    Calling it again for the same methods does nothing.
+
+    Args:
+        cls (type): The class.
+        methods (Iterable[str]): The names of the methods.
+        prefix (str, optional): The span name prefix. Defaults to the class name.
+    """
+    prefix = prefix or cls.__name__
+    for method in methods:
+        func = getattr(cls, method)
+        if not getattr(func, "__traced__", False):
+            setattr(cls, method, traced(f"{prefix}.{method}")(func))
+
+
+def enable(filename: str, max_bytes: int = 10 * 1024 * 1024, backups: int = 3) -> None:
+    """
+    Write spans to a JSONL file that is rotated when it grows too large.
+
+    Args:
+        filename (str): The path of the trace file.
+        max_bytes (int, optional): The size at which the file is rotated. Defaults to 10 MiB.
+        backups (int, optional): The number of rotated files to keep. Defaults to 3.
+    """
+    global _logger, _session
+    disable()
+    logger = logging.getLogger("keeperbot.trace")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    handler = RotatingFileHandler(filename, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    _session = uuid.uuid4().hex[:12]
+    _logger = logger
+
+
+def enable_from_env() -> bool:
+    """
+    Enable tracing if KEEPERBOT_TRACE names a trace file.
+
+    Returns:
+        bool: Whether tracing is enabled.
+    """
+    filename = os.environ.get(TRACE_ENV)
+    if filename:
+        enable(filename)
+    return enabled()
+
+
+def disable() -> None:
+    """Stop tracing and close the trace file."""
+    global _logger
+    logger, _logger = _logger, None
+    if logger is not None:
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+            handler.close()
+
+
+def enabled() -> bool:
+    """Return whether spans are written."""
+    return _logger is not None
@@ -1,13 +1,49 @@
+import argparse
+import asyncio
 import sys
 import os
 from colorama import Fore
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from keeperbot.bot import Bot
+from keeperbot.helpers import tracing
 
-def main():
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="keeperbot", description="Intelligent CLI contact manager")
+    parser.add_argument("--file", default="addressbook.pkl", help="address book file (default: addressbook.pkl)")
+    parser.add_argument(
+        "--async", dest="use_async", action="store_true",
+        help="run the prompt on an asyncio loop; saves are written in the background",
+    )
+    parser.add_argument("--trace", metavar="FILE", help=f"write trace spans to a JSONL file (or set {tracing.TRACE_ENV})")
+    parser.add_argument("--record", metavar="FILE", help="record the session for python -m keeperbot.replay")
+    parser.add_argument("--perf-file", metavar="FILE", help="write the command latency percentiles to a JSON file on exit")
+    parser.add_argument(
+        "--memprofile", metavar="FILE",
+        help="trace allocations from startup and write the memory growth and census to a JSON file on exit",
+    )
+    parser.add_argument(
+        "--profile", metavar="DIR", help="write a cProfile .pstats file per command, for startup and for loading to DIR",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.trace:
+        tracing.enable(args.trace)
+    else:
+        tracing.enable_from_env()
     try:
-        Bot("Welcome to the KeeperBot!").run()
+        bot = Bot(
+            "Welcome to the KeeperBot!", filename=args.file, perf_file=args.perf_file, record_file=args.record,
+            memprofile=args.memprofile, profile_dir=args.profile,
+        )
+        if args.use_async:
+            asyncio.run(bot.run_async())
+        else:
+            bot.run()
     except EOFError:
         print(f"\n{Fore.RED}Input ended unexpectedly. Exiting the application.")
     except KeyboardInterrupt:
@@ -15,4 +51,4 @@ def main():
 
 # Run the application
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
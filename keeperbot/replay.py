@@ -0,0 +1,225 @@
+"""
+Record REPL sessions and replay them headlessly for load tests.
+
+A session file is JSON lines: a header, then every entered command line and
+every answer to a question of a command, with the seconds since the start.
+
+Usage:
+    python -m keeperbot.replay SESSION --book addressbook.pkl [--rate 1.0] [--repeat 1]
+"""
+import argparse
+import contextlib
+import gc
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import deque
+from typing import Iterable
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prompt_toolkit.application import create_app_session
+from prompt_toolkit.input import DummyInput
+from prompt_toolkit.output import DummyOutput
+from tabulate import tabulate
+
+from keeperbot import __version__
+from keeperbot.helpers import LatencyHistogram
+
+
+class SessionRecorder:
+    """Appends the commands and answers of a session to a JSONL file."""
+
+    def __init__(self, filename: str, book_file: str = None) -> None:
+        """
+        Open the session file and write the header.
+
+        Args:
+            filename (str): The session file; an existing file is replaced.
+            book_file (str, optional): The address book the session ran against.
+        """
+        self.filename = filename
+        self._start = time.perf_counter()
+        self._file = open(filename, "w", encoding="utf-8")
+        self._write({
+            "type": "session",
+            "version": __version__,
+            "book": book_file,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        })
+
+    def _write(self, event: dict) -> None:
+        """Write one event; flushed at once, so a crashed session is still recorded."""
+        if self._file is not None:
+            self._file.write(json.dumps(event, ensure_ascii=False) + "\n")
+            self._file.flush()
+
+    def _elapsed(self) -> float:
+        """Return the seconds since the start of the session."""
+        return round(time.perf_counter() - self._start, 6)
+
+    def command(self, line: str) -> None:
+        """Record an entered command line."""
+        self._write({"type": "command", "t": self._elapsed(), "line": line})
+
+    def answer(self, prompt: str, text: str) -> None:
+        """Record the answer to a question of a command."""
+        self._write({"type": "answer", "t": self._elapsed(), "prompt": prompt, "text": text})
+
+    def close(self) -> None:
+        """Close the session file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(filename='{self.filename}')"
+
+
+def load_session(filename: str) -> list[dict]:
+    """
+    Read the commands of a session file.
+
+    Args:
+        filename (str): The session file.
+
+    Returns:
+        list: {"t", "line", "answers"} per command, the answers in the order they were given.
+            Answers given before the first command (e.g. the owner details) are skipped.
+    """
+    commands = []
+    with open(filename, encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            if event["type"] == "command":
+                commands.append({"t": event["t"], "line": event["line"], "answers": []})
+            elif event["type"] == "answer" and commands:
+                commands[-1]["answers"].append(event["text"])
+    return commands
+
+
+class _Answers:
+    """Answers the questions of the replayed command from the recording."""
+
+    def __init__(self) -> None:
+        self.pending = deque()
+
+    def __call__(self, prompt: str = "") -> str:
+        if not self.pending:
+            # More questions than recorded answers: behave like closed input
+            raise EOFError(prompt)
+        return self.pending.popleft()
+
+
+def replay(commands: Iterable[dict], book_file: str, rate: float = None, log=print) -> dict:
+    """
+    Execute the recorded commands against a copy of the address book, without a terminal.
+
+    Args:
+        commands (Iterable[dict]): The commands, see load_session.
+        book_file (str): The address book; it is copied, the original is not changed.
+        rate (float, optional): Replay speed relative to the recording, e.g. 2.0 for twice as fast.
+            Defaults to None: as fast as possible.
+        log (Callable, optional): Prints the report. Defaults to print.
+
+    Returns:
+        dict: The number of commands, errors, wall time, throughput, latency percentiles in ms
+            and the maximum delay behind the schedule in ms.
+    """
+    # Imported here: the recorder above is used by the bot itself
+    from keeperbot.bot import Bot
+
+    commands = list(commands)
+    latency = LatencyHistogram()
+    errors = 0
+    lag = 0.0
+    with tempfile.TemporaryDirectory() as tmpdir:
+        copy = os.path.join(tmpdir, os.path.basename(book_file) or "addressbook.pkl")
+        if os.path.exists(book_file):
+            shutil.copyfile(book_file, copy)
+
+        # No terminal: the prompt gets dummy input and output, the printed results go nowhere
+        with (
+            open(os.devnull, "w") as devnull,
+            contextlib.redirect_stdout(devnull),
+            create_app_session(input=DummyInput(), output=DummyOutput()),
+        ):
+            bot = Bot("Replay", filename=copy)
+            answers = _Answers()
+            bot.answer_source = answers
+            start = time.perf_counter()
+            offset = commands[0]["t"] if commands else 0
+            for command in commands:
+                if rate:
+                    delay = start + (command["t"] - offset) / rate - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    else:
+                        lag = max(lag, -delay)
+                answers.pending = deque(command["answers"])
+                began = time.perf_counter_ns()
+                try:
+                    # An exit command ends nothing here, so repeated sessions keep going
+                    bot.execute(command["line"])
+                except Exception:
+                    errors += 1
+                latency.record(time.perf_counter_ns() - began)
+            wall = time.perf_counter() - start
+            del bot
+            # The bot prints its footer when it is collected
+            gc.collect()
+
+    report = {
+        "commands": latency.count,
+        "errors": errors,
+        "wall_s": wall,
+        "throughput": latency.count / wall if wall else 0.0,
+        **latency.as_dict(),
+        "max_lag_ms": lag * 1000,
+    }
+    log(
+        f"{report['commands']} command(s) in {wall:.2f} s, {report['throughput']:.1f} commands/s, "
+        f"{errors} error(s)"
+    )
+    log(
+        f"latency: p50 {report['p50_ms']:.2f} ms, p95 {report['p95_ms']:.2f} ms, "
+        f"p99 {report['p99_ms']:.2f} ms, max {report['max_ms']:.2f} ms"
+    )
+    if rate:
+        log(f"max delay behind the recorded schedule: {report['max_lag_ms']:.1f} ms")
+    # The phases of every command were recorded by the bot itself
+    rows = [row for row in Bot.latency.rows() if row[1] != "wait"]
+    log(tabulate(rows, ["Command", "Phase", "Count", "p50, ms", "p95, ms", "p99, ms", "Max, ms"], tablefmt="simple"))
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m keeperbot.replay", description="Replay a recorded session")
+    parser.add_argument("session", help="session file written with keeperbot --record")
+    parser.add_argument("--book", default="addressbook.pkl", help="address book to replay against (copied)")
+    parser.add_argument("--rate", type=float, help="speed relative to the recording, e.g. 2 (default: full speed)")
+    parser.add_argument("--repeat", type=int, default=1, help="replay the session several times in a row")
+    parser.add_argument("--json", action="store_true", help="print the report as one JSON line")
+    args = parser.parse_args(argv)
+
+    commands = load_session(args.session)
+    if args.repeat > 1:
+        # Later copies start where the previous one ended
+        span = commands[-1]["t"] if commands else 0
+        commands = [
+            {**command, "t": command["t"] + round_number * span}
+            for round_number in range(args.repeat)
+            for command in commands
+        ]
+    report = replay(commands, args.book, args.rate, log=(lambda line: None) if args.json else print)
+    if args.json:
+        print(json.dumps(report))
+
+
+if __name__ == "__main__":
+    main()
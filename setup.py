@@ -12,6 +12,9 @@ setup(
         'tabulate==0.9.0',
         'wcwidth==0.2.13',
     ],
+    extras_require={
+        'analytics': ['numpy'],
+    },
     entry_points={
         'console_scripts': [
             'keeperbot = keeperbot.main:main',